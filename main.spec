@@ -15,7 +15,8 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[
-        *collect_data_files("endfield_essence_recognizer"),
+        # 基准测试和评估使用的画面只在开发时使用，不打包
+        *collect_data_files("endfield_essence_recognizer", excludes=["fixtures/**"]),
         (
             "frontend/dist",
             "endfield_essence_recognizer/webui_dist",
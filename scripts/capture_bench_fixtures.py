@@ -0,0 +1,90 @@
+"""在游戏中截取真实的详情面板画面（`AREA` 区域），加入 `fixtures/bench`。
+
+需要在 Windows 上以 1920×1080 分辨率运行终末地并打开基质界面。在游戏中选中一个基质后
+按回车截图，脚本先用识别器给出标注；标注正确时直接回车保存，有误时输入正确的标注。
+
+截取的画面在清单中标记为 `"source": "captured"`，重新运行 generate_bench_fixtures.py
+时会保留，generate_eval_corpus.py 也会从中裁剪评估样本。
+"""
+
+import json
+
+from endfield_essence_recognizer import create_recognizers, supported_window_titles
+from endfield_essence_recognizer.bench import (
+    BENCH_FIXTURE_FORMAT_VERSION,
+    bench_fixture_dir,
+)
+from endfield_essence_recognizer.essence_scanner import (
+    AREA,
+    RESOLUTION,
+    recognize_essence_in_frame,
+)
+from endfield_essence_recognizer.image import Frame, save_image
+from endfield_essence_recognizer.window import WindowDriver
+
+if __name__ == "__main__":
+    driver = WindowDriver(supported_window_titles)
+    if not driver.activate():
+        raise SystemExit("Endfield window not found")
+    if driver.client_size() != RESOLUTION:
+        raise SystemExit(
+            f"The game must run at {RESOLUTION[0]}x{RESOLUTION[1]}, "
+            f"got {driver.client_size()}"
+        )
+    text_recognizer, icon_recognizer = create_recognizers(cache=False)
+    text_recognizer.load_templates()
+    icon_recognizer.load_templates()
+
+    manifest_path = bench_fixture_dir / "manifest.json"
+    if manifest_path.is_file():
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    else:
+        manifest = {"version": BENCH_FIXTURE_FORMAT_VERSION, "frames": []}
+    frames = manifest["frames"]
+    captured = sum(1 for frame in frames if frame.get("source") == "captured")
+
+    while input("Select an essence in the game and press Enter (q to quit): ") != "q":
+        image = driver.screenshot(AREA)
+        stats, deprecated_str, locked_str, _attribute_scores = (
+            recognize_essence_in_frame(
+                Frame(image, AREA), text_recognizer, icon_recognizer
+            )
+        )
+        labels = [*stats, locked_str, deprecated_str]
+        print("Recognized:", " ".join(str(label) for label in labels))
+        answer = input(
+            "Enter to accept, or type the 3 stats, lock and deprecate labels "
+            "separated by spaces (s to discard): "
+        ).split()
+        if answer == ["s"]:
+            continue
+        if answer:
+            if len(answer) != 5:
+                print("Expected 5 labels, discarded")
+                continue
+            labels = answer
+        if None in labels:
+            print("Incomplete labels, discarded")
+            continue
+
+        filename = f"captured_{captured:02d}.png"
+        save_image(image, bench_fixture_dir / filename)
+        frames.append(
+            {
+                "file": filename,
+                "region": AREA,
+                "stats": labels[:3],
+                "locked": labels[3],
+                "deprecated": labels[4],
+                "source": "captured",
+            }
+        )
+        captured += 1
+        # 每张截图后立即写入清单，中途退出也不会丢失
+        manifest_path.write_text(
+            json.dumps(manifest, ensure_ascii=False, indent=2) + "\n",
+            encoding="utf-8",
+        )
+        print(f"Saved {filename}")
+
+    print(f"{captured} captured bench fixtures in {bench_fixture_dir}")
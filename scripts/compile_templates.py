@@ -0,0 +1,12 @@
+from endfield_essence_recognizer import create_recognizers
+from endfield_essence_recognizer.compiled_templates import (
+    packaged_compiled_templates_dir,
+)
+
+if __name__ == "__main__":
+    for recognizer in create_recognizers():
+        recognizer.compile_templates(packaged_compiled_templates_dir)
+        print(
+            f"Compiled templates: {recognizer.templates_dir} -> "
+            f"{packaged_compiled_templates_dir / recognizer.templates_dir.name}"
+        )
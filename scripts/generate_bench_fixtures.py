@@ -0,0 +1,63 @@
+"""用模拟器渲染基准测试使用的详情面板画面，写入 `fixtures/bench`。
+
+真实截取的详情面板由 capture_bench_fixtures.py 加入该目录，重新生成时会保留。
+"""
+
+import json
+
+from endfield_essence_recognizer.bench import (
+    BENCH_FIXTURE_FORMAT_VERSION,
+    bench_fixture_dir,
+)
+from endfield_essence_recognizer.essence_scanner import AREA
+from endfield_essence_recognizer.image import save_image
+from endfield_essence_recognizer.simulator import SimulatorDriver, generate_inventory
+
+FIXTURE_COUNT = 12
+"""渲染的画面数量"""
+
+if __name__ == "__main__":
+    inventory = generate_inventory(
+        FIXTURE_COUNT, seed=0, locked_ratio=0.5, deprecated_ratio=0.5
+    )
+    driver = SimulatorDriver(inventory, click_latency=0.0)
+    output_dir = bench_fixture_dir
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    # 保留真实截取的画面，只重新生成合成画面
+    manifest_path = output_dir / "manifest.json"
+    captured_frames = []
+    if manifest_path.is_file():
+        captured_frames = [
+            frame
+            for frame in json.loads(manifest_path.read_text(encoding="utf-8"))["frames"]
+            if frame.get("source") == "captured"
+        ]
+
+    frames = []
+    for index, essence in enumerate(inventory):
+        driver.select(index)
+        filename = f"panel_{index:02d}.png"
+        save_image(driver.screenshot(AREA), output_dir / filename)
+        frames.append(
+            {
+                "file": filename,
+                "region": AREA,
+                "stats": list(essence.stats),
+                "locked": essence.locked_str,
+                "deprecated": essence.deprecated_str,
+                "source": "synthetic",
+            }
+        )
+
+    manifest = {
+        "version": BENCH_FIXTURE_FORMAT_VERSION,
+        "frames": frames + captured_frames,
+    }
+    manifest_path.write_text(
+        json.dumps(manifest, ensure_ascii=False, indent=2) + "\n", encoding="utf-8"
+    )
+    print(
+        f"Generated {len(frames)} bench fixtures "
+        f"(kept {len(captured_frames)} captured) -> {output_dir}"
+    )
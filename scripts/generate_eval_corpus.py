@@ -0,0 +1,149 @@
+"""从基准测试画面中裁剪出各槽位的 ROI，写入识别器评估使用的标注集 `fixtures/corpus`。
+
+除原始 ROI 外，还生成两类样本，使评估能反映 margin 和拒识能力：
+
+- 扰动样本（标注不变）：高斯噪声、亚像素平移、几像素的截图偏移、亮度变化
+- 负样本（标注为 null，应识别为未知）：面板空白处的截图，以及其他槽位的截图
+
+基准测试画面中由 capture_bench_fixtures.py 从游戏中截取的画面，裁剪出的样本标记为
+`"source": "captured"`，评估结果按来源分别统计准确率。
+"""
+
+import json
+
+import cv2
+import numpy as np
+
+from endfield_essence_recognizer.bench import load_bench_fixtures
+from endfield_essence_recognizer.essence_scanner import AREA
+from endfield_essence_recognizer.evaluation import (
+    CORPUS_FORMAT_VERSION,
+    corpus_dir,
+    evaluation_slots,
+)
+from endfield_essence_recognizer.image import Frame, Scope, save_image
+
+NOISE_SIGMA = 8.0
+"""高斯噪声的标准差"""
+SUBPIXEL_SHIFT = (0.5, 0.5)
+"""亚像素平移量 (dx, dy)"""
+PIXEL_SHIFTS = [(2, 0), (-2, 1), (0, -2), (3, 2)]
+"""截图偏移量 (dx, dy)，按画面序号轮流使用"""
+BRIGHTNESS_CHANGES = [(0.8, 0), (1.15, 10)]
+"""亮度变化 (对比度系数, 亮度偏移)，按画面序号轮流使用"""
+BLANK_TOP = 40
+"""空白样本在画面中的顶部位置（面板标题上方没有文字和图标）"""
+WRONG_SLOTS = {
+    "stats_0": "stats_1",
+    "stats_1": "stats_2",
+    "stats_2": "stats_0",
+    "deprecate_button": "lock_button",
+    "lock_button": "deprecate_button",
+}
+"""错位样本：在每个槽位中放入的其他槽位截图"""
+
+
+def shift_roi(roi: Scope, dx: int, dy: int) -> Scope:
+    (x1, y1), (x2, y2) = roi
+    return (x1 + dx, y1 + dy), (x2 + dx, y2 + dy)
+
+
+if __name__ == "__main__":
+    output_dir = corpus_dir
+    (output_dir / "rois").mkdir(parents=True, exist_ok=True)
+    for old_file in (output_dir / "rois").glob("*.png"):
+        old_file.unlink()
+
+    rng = np.random.default_rng(0)
+    slots = evaluation_slots()
+    samples = []
+
+    source = "synthetic"
+
+    def add(name: str, slot: str, label: str | None, image: np.ndarray) -> None:
+        filename = f"rois/{name}.png"
+        save_image(image, output_dir / filename)
+        samples.append(
+            {"file": filename, "slot": slot, "label": label, "source": source}
+        )
+
+    for index, fixture in enumerate(load_bench_fixtures()):
+        source = fixture.source
+        frame = Frame(fixture.image, AREA)
+        subpixel_frame = Frame(
+            cv2.warpAffine(
+                fixture.image,
+                np.float32([[1, 0, SUBPIXEL_SHIFT[0]], [0, 1, SUBPIXEL_SHIFT[1]]]),
+                (fixture.image.shape[1], fixture.image.shape[0]),
+                flags=cv2.INTER_LINEAR,
+                borderMode=cv2.BORDER_REPLICATE,
+            ),
+            AREA,
+        )
+        dx, dy = PIXEL_SHIFTS[index % len(PIXEL_SHIFTS)]
+        alpha, beta = BRIGHTNESS_CHANGES[index % len(BRIGHTNESS_CHANGES)]
+        labels = {
+            **{f"stats_{k}": stat for k, stat in enumerate(fixture.stats)},
+            "deprecate_button": fixture.deprecated,
+            "lock_button": fixture.locked,
+        }
+
+        for slot, (_kind, roi, slot_labels) in slots.items():
+            label = labels[slot]
+            roi_image = frame.crop(roi)
+            add(f"{slot}_{index:02d}", slot, label, roi_image)
+
+            # 扰动样本
+            noise = rng.normal(0.0, NOISE_SIGMA, roi_image.shape)
+            add(
+                f"{slot}_{index:02d}_noise",
+                slot,
+                label,
+                np.clip(roi_image + noise, 0, 255).astype(np.uint8),
+            )
+            add(f"{slot}_{index:02d}_subpixel", slot, label, subpixel_frame.crop(roi))
+            add(
+                f"{slot}_{index:02d}_shift",
+                slot,
+                label,
+                frame.crop(shift_roi(roi, dx, dy)),
+            )
+            add(
+                f"{slot}_{index:02d}_brightness",
+                slot,
+                label,
+                cv2.convertScaleAbs(roi_image, alpha=alpha, beta=beta),
+            )
+
+            # 负样本：空白处
+            (_x1, y1), _ = roi
+            blank_roi = shift_roi(roi, 0, AREA[0][1] + BLANK_TOP - y1)
+            add(f"{slot}_{index:02d}_blank", slot, None, frame.crop(blank_roi))
+
+            # 负样本：其他槽位的截图（裁剪或补边到本槽位的尺寸）
+            other_slot = WRONG_SLOTS[slot]
+            _other_kind, other_roi, _other_labels = slots[other_slot]
+            other_label = labels[other_slot]
+            (x1, y1), (x2, y2) = roi
+            height, width = y2 - y1, x2 - x1
+            other_image = frame.crop(other_roi)[:height, :width]
+            other_image = cv2.copyMakeBorder(
+                other_image,
+                0,
+                height - other_image.shape[0],
+                0,
+                width - other_image.shape[1],
+                cv2.BORDER_REPLICATE,
+            )
+            add(
+                f"{slot}_{index:02d}_wrong",
+                slot,
+                other_label if other_label in slot_labels else None,
+                other_image,
+            )
+
+    manifest = {"version": CORPUS_FORMAT_VERSION, "samples": samples}
+    (output_dir / "manifest.json").write_text(
+        json.dumps(manifest, ensure_ascii=False, indent=2) + "\n", encoding="utf-8"
+    )
+    print(f"Generated {len(samples)} corpus samples -> {output_dir}")
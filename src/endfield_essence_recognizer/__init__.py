@@ -9,6 +9,7 @@ from endfield_essence_recognizer.version import __version__ as __version__
 if TYPE_CHECKING:
     import threading
 
+    from endfield_essence_recognizer.driver import GameDriver
     from endfield_essence_recognizer.essence_scanner import EssenceScanner
     from endfield_essence_recognizer.recognizer import Recognizer
 
@@ -29,6 +30,13 @@ screenshot_template_dir = (
 
 supported_window_titles = ["Endfield"]
 """支持的窗口标题列表"""
+subcommands = {
+    "replay": "endfield_essence_recognizer.replay",
+    "simulate": "endfield_essence_recognizer.simulator",
+    "bench": "endfield_essence_recognizer.bench",
+    "evaluate": "endfield_essence_recognizer.evaluation",
+}
+"""命令行子命令及其实现模块，模块需提供 `main(argv)` 函数"""
 
 # 全局变量
 essence_scanner_thread: EssenceScanner | None = None
@@ -44,21 +52,45 @@ icon_recognizer: Recognizer | None = None
 def on_bracket_left():
     """处理 "[" 键按下事件 - 仅识别不操作"""
     from endfield_essence_recognizer.essence_scanner import recognize_once
-    from endfield_essence_recognizer.window import get_active_support_window
+    from endfield_essence_recognizer.window import WindowDriver
 
-    window = get_active_support_window(supported_window_titles)
-    if window is None:
+    driver = WindowDriver(supported_window_titles)
+    if not driver.is_active():
         logger.debug("终末地窗口不在前台，忽略 '[' 键。")
         return
     else:
         logger.info("检测到 '[' 键，开始识别基质")
-        recognize_once(window, text_recognizer, icon_recognizer)  # type: ignore
+        recognize_once(driver, text_recognizer, icon_recognizer)  # type: ignore
+
+
+def create_scan_driver() -> GameDriver:
+    """构造扫描使用的驱动，启用录制时包装为录像驱动。"""
+    from endfield_essence_recognizer.config import config
+    from endfield_essence_recognizer.recording import (
+        RecordingDriver,
+        new_recording_path,
+    )
+    from endfield_essence_recognizer.window import WindowDriver
+
+    driver: GameDriver = WindowDriver(supported_window_titles)
+    if config.record_scan:
+        driver = RecordingDriver(
+            driver,
+            new_recording_path(),
+            {
+                "config": config.model_dump(),
+                "scan_mode": config.scan_mode,
+                "incremental": config.incremental_scan,
+            },
+        )
+    return driver
 
 
 def toggle_scan():
     """切换基质扫描状态"""
     import winsound
 
+    from endfield_essence_recognizer.config import config
     from endfield_essence_recognizer.essence_scanner import EssenceScanner
 
     global essence_scanner_thread
@@ -68,7 +100,12 @@ def toggle_scan():
         essence_scanner_thread = EssenceScanner(
             text_recognizer=cast("Recognizer", text_recognizer),
             icon_recognizer=cast("Recognizer", icon_recognizer),
-            supported_window_titles=supported_window_titles,
+            driver=create_scan_driver(),
+            scan_mode=config.scan_mode,
+            incremental=config.incremental_scan,
+            badge_skip=config.badge_skip,
+            resume=config.resume_scan,
+            trace=config.trace_scan,
         )
         essence_scanner_thread.start()
         with importlib.resources.as_file(
@@ -116,11 +153,56 @@ def on_exit():
     window.destroy()
 
 
+def create_recognizers(cache: bool = True) -> tuple[Recognizer, Recognizer]:
+    """
+    构造文本识别器和图标识别器。
+
+    Args:
+        cache: 是否启用识别结果缓存，基准测试模板匹配本身时关闭
+    """
+    from endfield_essence_recognizer.game_data.weapon import (
+        all_attribute_stats,
+        all_secondary_stats,
+        all_skill_stats,
+    )
+    from endfield_essence_recognizer.recognizer import Recognizer
+
+    text_recognizer = Recognizer(
+        labels=all_attribute_stats + all_secondary_stats + all_skill_stats,
+        templates_dir=generated_template_dir,
+        engine="batched",
+        cache_size=256 if cache else 0,
+        track_alignment=True,
+        # preprocess_roi=preprocess_text_roi,
+        # preprocess_template=preprocess_text_template,
+    )
+    icon_recognizer = Recognizer(
+        labels=["已弃用", "未弃用", "已锁定", "未锁定"],
+        templates_dir=screenshot_template_dir,
+        cache_size=64 if cache else 0,
+    )
+    return text_recognizer, icon_recognizer
+
+
+def run_subcommand(argv: list[str]) -> None:
+    """运行命令行子命令，不启动界面和热键。"""
+    import importlib
+
+    module = importlib.import_module(subcommands[argv[0]])
+    module.main(argv[1:])
+
+
 def main():
     """主函数"""
 
     global text_recognizer, icon_recognizer, essence_scanner_thread
 
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] in subcommands:
+        run_subcommand(sys.argv[1:])
+        return
+
     # 打印欢迎信息
     message = """
 ==================================================
@@ -148,24 +230,10 @@ def main():
 
     config.load_and_update()
 
-    # 构造识别器实例
-    from endfield_essence_recognizer.game_data.weapon import (
-        all_attribute_stats,
-        all_secondary_stats,
-        all_skill_stats,
-    )
-    from endfield_essence_recognizer.recognizer import Recognizer
-
-    text_recognizer = Recognizer(
-        labels=all_attribute_stats + all_secondary_stats + all_skill_stats,
-        templates_dir=generated_template_dir,
-        # preprocess_roi=preprocess_text_roi,
-        # preprocess_template=preprocess_text_template,
-    )
-    icon_recognizer = Recognizer(
-        labels=["已弃用", "未弃用", "已锁定", "未锁定"],
-        templates_dir=screenshot_template_dir,
-    )
+    # 构造识别器实例，提前加载模板，避免首次识别时卡顿
+    text_recognizer, icon_recognizer = create_recognizers()
+    text_recognizer.load_templates()
+    icon_recognizer.load_templates()
 
     # 注册热键
     import keyboard
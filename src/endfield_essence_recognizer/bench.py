@@ -0,0 +1,414 @@
+"""性能基准测试。
+
+在 Linux 上也能运行，测量识别热路径的延迟分位数和吞吐量：
+
+- 模板加载：`Recognizer.load_templates`
+- 单个 ROI 识别：按属性槽位和按钮分别测量 `recognize_roi`（不使用识别缓存）
+- 完整识别：对详情面板画面调用 `recognize_essence_in_frame`
+- 品质判定：`judge_essence_quality`
+- 游戏数据导入：在新的解释器中导入游戏数据并加载武器信息
+- 后端接口：直接调用 `server.py` 中的接口处理函数
+
+测试使用 `fixtures/bench` 中的详情面板画面，其中有模拟器渲染的合成画面，
+也有在游戏中截取的真实画面（scripts/capture_bench_fixtures.py）。结果输出为 JSON，
+可以用 `--compare` 与另一次提交的结果对比：
+
+    eer bench --output bench.json
+    eer bench --compare bench.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib.resources
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+import cv2
+import numpy as np
+
+from endfield_essence_recognizer.image import Frame, load_image
+from endfield_essence_recognizer.log import logger
+from endfield_essence_recognizer.version import __version__
+
+bench_fixture_dir = Path(
+    str(importlib.resources.files("endfield_essence_recognizer") / "fixtures/bench")
+)
+"""基准测试画面目录（由 scripts/generate_bench_fixtures.py 生成，不打包进发布版本）"""
+BENCH_FIXTURE_FORMAT_VERSION = 1
+"""基准测试画面清单的格式版本"""
+BENCH_RESULT_FORMAT_VERSION = 1
+"""基准测试结果的格式版本，结果格式变化时递增"""
+DEFAULT_REPEAT = 200
+"""每项测试默认的测量次数"""
+DEFAULT_IMPORT_REPEAT = 5
+"""游戏数据导入测试的测量次数（每次启动一个新的解释器）"""
+BENCH_INVENTORY_RECORDS = 5000
+"""后端接口测试使用的基质库存记录数"""
+
+
+@dataclass
+class BenchFixture:
+    image: np.ndarray
+    """详情面板画面（`AREA` 区域）"""
+    stats: list[str]
+    """三个属性标签"""
+    locked: str
+    """锁定状态"""
+    deprecated: str
+    """弃用状态"""
+    source: str = "synthetic"
+    """画面来源：synthetic 为模拟器渲染，captured 为游戏中截取"""
+
+
+@dataclass
+class BenchResult:
+    n: int
+    """测量次数"""
+    mean_ms: float
+    p50_ms: float
+    p90_ms: float
+    p99_ms: float
+    min_ms: float
+    max_ms: float
+    ops_per_s: float
+    """按平均耗时换算的每秒次数"""
+
+    @classmethod
+    def from_samples(cls, samples: list[float]) -> BenchResult:
+        """由每次测量的耗时（秒）计算统计量。"""
+        values = np.asarray(samples) * 1000
+        p50, p90, p99 = np.percentile(values, [50, 90, 99])
+        mean = float(values.mean())
+        return cls(
+            n=len(values),
+            mean_ms=round(mean, 4),
+            p50_ms=round(float(p50), 4),
+            p90_ms=round(float(p90), 4),
+            p99_ms=round(float(p99), 4),
+            min_ms=round(float(values.min()), 4),
+            max_ms=round(float(values.max()), 4),
+            ops_per_s=round(1000 / mean, 2) if mean > 0 else 0.0,
+        )
+
+
+def measure(func: Callable[[], Any], repeat: int, warmup: int = 1) -> BenchResult:
+    """预热后重复调用函数，统计每次调用的耗时。"""
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return BenchResult.from_samples(samples)
+
+
+def measure_each(
+    func: Callable[[Any], Any], items: list[Any], repeat: int
+) -> BenchResult:
+    """轮流对每个输入调用函数，共测量 repeat 次。"""
+    for item in items:
+        func(item)
+    samples = []
+    for k in range(repeat):
+        item = items[k % len(items)]
+        start = time.perf_counter()
+        func(item)
+        samples.append(time.perf_counter() - start)
+    return BenchResult.from_samples(samples)
+
+
+def load_bench_fixtures(directory: Path = bench_fixture_dir) -> list[BenchFixture]:
+    """读取基准测试画面及其标注。"""
+    manifest = json.loads((directory / "manifest.json").read_text(encoding="utf-8"))
+    if manifest.get("version") != BENCH_FIXTURE_FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported bench fixture version: {manifest.get('version')}"
+        )
+    return [
+        BenchFixture(
+            image=load_image(directory / entry["file"]),
+            stats=entry["stats"],
+            locked=entry["locked"],
+            deprecated=entry["deprecated"],
+            source=entry.get("source", "synthetic"),
+        )
+        for entry in manifest["frames"]
+    ]
+
+
+def bench_load_templates(repeat: int) -> dict[str, BenchResult]:
+    from endfield_essence_recognizer import create_recognizers
+
+    results = {}
+    for index, name in enumerate(("text", "icon")):
+
+        def load(index: int = index) -> None:
+            create_recognizers()[index].load_templates()
+
+        results[f"recognizer.load_templates.{name}"] = measure(load, repeat)
+    return results
+
+
+def bench_recognition(
+    fixtures: list[BenchFixture], repeat: int
+) -> dict[str, BenchResult]:
+    from endfield_essence_recognizer import create_recognizers
+    from endfield_essence_recognizer.essence_scanner import (
+        AREA,
+        DEPRECATE_BUTTON_LABELS,
+        DEPRECATE_BUTTON_ROI,
+        LOCK_BUTTON_LABELS,
+        LOCK_BUTTON_ROI,
+        STATS_SLOTS,
+        recognize_essence_in_frame,
+    )
+
+    text_recognizer, icon_recognizer = create_recognizers(cache=False)
+    text_recognizer.load_templates()
+    icon_recognizer.load_templates()
+    frames = [Frame(fixture.image, AREA) for fixture in fixtures]
+
+    results = {}
+    slots = [
+        (f"stats_{k}", text_recognizer, roi, labels)
+        for k, (roi, labels) in enumerate(STATS_SLOTS)
+    ] + [
+        (
+            "deprecate_button",
+            icon_recognizer,
+            DEPRECATE_BUTTON_ROI,
+            DEPRECATE_BUTTON_LABELS,
+        ),
+        ("lock_button", icon_recognizer, LOCK_BUTTON_ROI, LOCK_BUTTON_LABELS),
+    ]
+    for name, recognizer, roi, labels in slots:
+        rois = [np.ascontiguousarray(frame.crop(roi)) for frame in frames]
+        results[f"recognize_roi.{name}"] = measure_each(
+            lambda image, r=recognizer, labels=labels: r.recognize_roi(image, labels),
+            rois,
+            repeat,
+        )
+
+    results["recognize_essence"] = measure_each(
+        lambda frame: recognize_essence_in_frame(
+            frame, text_recognizer, icon_recognizer
+        ),
+        frames,
+        repeat,
+    )
+
+    cached_text, cached_icon = create_recognizers()
+    cached_text.load_templates()
+    cached_icon.load_templates()
+    results["recognize_essence.cached"] = measure_each(
+        lambda frame: recognize_essence_in_frame(frame, cached_text, cached_icon),
+        frames,
+        repeat,
+    )
+    return results
+
+
+def bench_judge(fixtures: list[BenchFixture], repeat: int) -> dict[str, BenchResult]:
+    from endfield_essence_recognizer.essence_scanner import judge_essence_quality
+
+    stats = [list(fixture.stats) for fixture in fixtures]
+    return {
+        "judge_essence_quality": measure_each(
+            lambda s: judge_essence_quality(s, {}, set()), stats, repeat
+        )
+    }
+
+
+def bench_game_data_import(repeat: int) -> dict[str, BenchResult]:
+    code = (
+        "import time\n"
+        "start = time.perf_counter()\n"
+        "from endfield_essence_recognizer.game_data.weapon import weapon_info_dict\n"
+        "len(weapon_info_dict)\n"
+        "print(time.perf_counter() - start)\n"
+    )
+    samples = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+        samples.append(float(output.stdout.strip().splitlines()[-1]))
+    return {"game_data.import": BenchResult.from_samples(samples)}
+
+
+def bench_server(repeat: int) -> dict[str, BenchResult]:
+    from endfield_essence_recognizer import inventory, server
+    from endfield_essence_recognizer.inventory import InventoryRecord, InventoryStore
+
+    rng = np.random.default_rng(0)
+    loop = asyncio.new_event_loop()
+    previous_store = inventory._store
+    with tempfile.TemporaryDirectory() as directory:
+        store = InventoryStore(Path(directory) / "inventory.sqlite3")
+        for k in range(BENCH_INVENTORY_RECORDS):
+            store.add(
+                InventoryRecord(
+                    fingerprint=rng.bytes(32),
+                    attribute=f"attribute_{k % 5}",
+                    secondary=f"secondary_{k % 12}",
+                    skill=f"skill_{k % 14}",
+                    locked="已锁定" if k % 3 == 0 else "未锁定",
+                    deprecated="未弃用",
+                    page=k // 45 + 1,
+                    row=k % 45 // 9,
+                    col=k % 9,
+                )
+            )
+        store.flush()
+        inventory._store = store
+        try:
+            handlers = {
+                "server.get_config": server.get_config,
+                "server.get_version": server.get_version,
+                "server.get_inventory": lambda: server.get_inventory(
+                    attribute="attribute_1"
+                ),
+                "server.get_inventory_summary": server.get_inventory_summary,
+            }
+            results = {
+                name: measure(lambda h=handler: loop.run_until_complete(h()), repeat)
+                for name, handler in handlers.items()
+            }
+        finally:
+            inventory._store = previous_store
+            store.close()
+            loop.close()
+    return results
+
+
+def _git_commit() -> str | None:
+    try:
+        output = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.stdout.strip()
+
+
+def run_benchmarks(
+    repeat: int = DEFAULT_REPEAT,
+    import_repeat: int = DEFAULT_IMPORT_REPEAT,
+    only: list[str] | None = None,
+) -> dict[str, Any]:
+    """
+    运行基准测试，返回可序列化为 JSON 的结果。
+
+    测量期间关闭本包的日志输出，避免日志写入影响计时。
+
+    Args:
+        repeat: 每项测试的测量次数
+        import_repeat: 游戏数据导入测试的测量次数
+        only: 只运行名称以这些前缀开头的测试组
+    """
+    fixtures = load_bench_fixtures()
+    groups: dict[str, Callable[[], dict[str, BenchResult]]] = {
+        "recognizer": lambda: bench_load_templates(max(repeat // 10, 5)),
+        "recognize": lambda: bench_recognition(fixtures, repeat),
+        "judge": lambda: bench_judge(fixtures, repeat),
+        "game_data": lambda: bench_game_data_import(import_repeat),
+        "server": lambda: bench_server(repeat),
+    }
+
+    results: dict[str, dict[str, Any]] = {}
+    skipped: dict[str, str] = {}
+    logger.disable("endfield_essence_recognizer")
+    try:
+        for group, run in groups.items():
+            if only and not any(group.startswith(prefix) for prefix in only):
+                continue
+            try:
+                results.update({name: asdict(r) for name, r in run().items()})
+            except Exception as e:
+                skipped[group] = f"{type(e).__name__}: {e}"
+    finally:
+        logger.enable("endfield_essence_recognizer")
+
+    return {
+        "version": BENCH_RESULT_FORMAT_VERSION,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "commit": _git_commit(),
+        "package_version": __version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+        "repeat": repeat,
+        "fixtures": len(fixtures),
+        "fixture_sources": dict(Counter(fixture.source for fixture in fixtures)),
+        "results": results,
+        "skipped": skipped,
+    }
+
+
+def format_comparison(current: dict[str, Any], baseline: dict[str, Any]) -> str:
+    """对比两次基准测试的 P50 耗时。"""
+    lines = [f"{'测试':<36} {'基线 P50':>12} {'当前 P50':>12} {'比值':>8}"]
+    for name, result in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            lines.append(f"{name:<36} {'-':>12} {result['p50_ms']:>10.3f}ms {'-':>8}")
+            continue
+        ratio = (
+            result["p50_ms"] / base["p50_ms"] if base["p50_ms"] > 0 else float("inf")
+        )
+        lines.append(
+            f"{name:<36} {base['p50_ms']:>10.3f}ms {result['p50_ms']:>10.3f}ms "
+            f"{ratio:>7.2f}x"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(
+        prog="eer bench", description="测量识别热路径的延迟分位数和吞吐量"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=DEFAULT_REPEAT, help="每项测试的测量次数"
+    )
+    parser.add_argument(
+        "--import-repeat",
+        type=int,
+        default=DEFAULT_IMPORT_REPEAT,
+        help="游戏数据导入测试的测量次数",
+    )
+    parser.add_argument(
+        "--only", nargs="*", default=None, help="只运行这些测试组（按名称前缀匹配）"
+    )
+    parser.add_argument(
+        "--output", type=Path, default=None, help="结果 JSON 的保存路径"
+    )
+    parser.add_argument(
+        "--compare", type=Path, default=None, help="与之对比的基线结果 JSON"
+    )
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.repeat, args.import_repeat, args.only)
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output is not None:
+        args.output.write_text(text + "\n", encoding="utf-8")
+        logger.info(f"基准测试结果已保存到 {args.output}")
+    else:
+        print(text)
+    for group, reason in report["skipped"].items():
+        logger.warning(f"跳过测试组 {group}：{reason}")
+    if args.compare is not None:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        logger.info(f"与基线对比:\n{format_comparison(report, baseline)}")
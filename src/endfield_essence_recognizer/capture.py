@@ -0,0 +1,255 @@
+"""屏幕截图后端。
+
+`screenshot_window` 通过当前的截图后端获取屏幕像素：
+
+- `Win32CaptureBackend`：默认后端，复用 GDI 设备上下文和 DIB 位图，稳态截图不分配内存
+- `ArrayCaptureBackend`：从 NumPy 数组提供画面，不依赖 pywin32，可在 Linux 上测试和基准测试截图路径
+"""
+
+from __future__ import annotations
+
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from cv2.typing import MatLike
+
+    from endfield_essence_recognizer.image import Scope
+
+
+class CaptureBackend(ABC):
+    """截图后端接口。"""
+
+    @abstractmethod
+    def grab(self, scope: Scope, copy: bool = False) -> MatLike:
+        """
+        截取屏幕指定区域，返回 BGR 格式的 numpy 图像。
+
+        Args:
+            scope: 屏幕区域，格式为 ((left, top), (right, bottom))
+            copy: 是否返回独立的副本。为 False 时返回的数组可能是后端内部缓冲区的视图，
+                会在下一次相同尺寸的截图（包括其他线程的截图）时被覆盖
+        """
+
+    def close(self) -> None:
+        """释放后端持有的资源。"""
+
+
+def _check_scope(scope: Scope) -> tuple[int, int, int, int]:
+    (left, top), (right, bottom) = scope
+    width, height = right - left, bottom - top
+    if width <= 0 or height <= 0:
+        raise ValueError(f"Try to screenshot with invalid rect: {scope}")
+    return left, top, width, height
+
+
+class _DibSection:
+    """选入内存设备上下文的 32 位自顶向下 DIB 位图，像素内存直接映射为 numpy 数组。"""
+
+    def __init__(self, gdi32, screen_dc: int, width: int, height: int) -> None:
+        import ctypes
+        from ctypes import wintypes
+
+        class BITMAPINFOHEADER(ctypes.Structure):
+            _fields_ = [
+                ("biSize", wintypes.DWORD),
+                ("biWidth", wintypes.LONG),
+                ("biHeight", wintypes.LONG),
+                ("biPlanes", wintypes.WORD),
+                ("biBitCount", wintypes.WORD),
+                ("biCompression", wintypes.DWORD),
+                ("biSizeImage", wintypes.DWORD),
+                ("biXPelsPerMeter", wintypes.LONG),
+                ("biYPelsPerMeter", wintypes.LONG),
+                ("biClrUsed", wintypes.DWORD),
+                ("biClrImportant", wintypes.DWORD),
+            ]
+
+        header = BITMAPINFOHEADER()
+        header.biSize = ctypes.sizeof(BITMAPINFOHEADER)
+        header.biWidth = width
+        header.biHeight = -height  # 负数表示自顶向下
+        header.biPlanes = 1
+        header.biBitCount = 32
+        header.biCompression = 0  # BI_RGB
+
+        bits = ctypes.c_void_p()
+        self._gdi32 = gdi32
+        self.dc: int = gdi32.CreateCompatibleDC(screen_dc)
+        self.bitmap: int = gdi32.CreateDIBSection(
+            screen_dc, ctypes.byref(header), 0, ctypes.byref(bits), None, 0
+        )
+        if not self.dc or not self.bitmap or not bits.value:
+            self.close()
+            raise RuntimeError(f"Failed to create DIB section of {width}x{height}")
+        self._old_bitmap: int = gdi32.SelectObject(self.dc, self.bitmap)
+
+        # 32 位 DIB 每行天然 4 字节对齐，没有填充
+        buffer = (ctypes.c_uint8 * (width * height * 4)).from_address(bits.value)
+        self.pixels: np.ndarray = np.ctypeslib.as_array(buffer).reshape(
+            (height, width, 4)
+        )
+
+    def close(self) -> None:
+        if getattr(self, "_old_bitmap", None):
+            self._gdi32.SelectObject(self.dc, self._old_bitmap)
+        if self.bitmap:
+            self._gdi32.DeleteObject(self.bitmap)
+        if self.dc:
+            self._gdi32.DeleteDC(self.dc)
+        self.bitmap = 0
+        self.dc = 0
+
+
+class Win32CaptureBackend(CaptureBackend):
+    """
+    基于 GDI BitBlt 的截图后端。
+
+    屏幕设备上下文在后端生命周期内只获取一次，
+    每种截图尺寸对应一个常驻的 DIB 位图（像素内存即输出缓冲区），
+    因此稳态下每次截图只有一次 BitBlt，不创建 GDI 对象也不分配内存。
+    """
+
+    SRCCOPY = 0x00CC0020
+    MAX_POOLED_SIZES = 16
+    """最多缓存的截图尺寸数量"""
+
+    def __init__(self) -> None:
+        import ctypes
+
+        self._user32 = ctypes.WinDLL("user32")
+        self._gdi32 = ctypes.WinDLL("gdi32")
+        for name in ("CreateCompatibleDC", "CreateDIBSection", "SelectObject"):
+            getattr(self._gdi32, name).restype = ctypes.c_void_p
+        self._gdi32.CreateCompatibleDC.argtypes = [ctypes.c_void_p]
+        self._gdi32.CreateDIBSection.argtypes = [
+            ctypes.c_void_p,
+            ctypes.c_void_p,
+            ctypes.c_uint,
+            ctypes.POINTER(ctypes.c_void_p),
+            ctypes.c_void_p,
+            ctypes.c_uint32,
+        ]
+        self._gdi32.SelectObject.argtypes = [ctypes.c_void_p, ctypes.c_void_p]
+        self._gdi32.DeleteObject.argtypes = [ctypes.c_void_p]
+        self._gdi32.DeleteDC.argtypes = [ctypes.c_void_p]
+        self._gdi32.BitBlt.argtypes = (
+            [ctypes.c_void_p]
+            + [ctypes.c_int] * 4
+            + [
+                ctypes.c_void_p,
+                ctypes.c_int,
+                ctypes.c_int,
+                ctypes.c_uint32,
+            ]
+        )
+        self._user32.GetDC.restype = ctypes.c_void_p
+        self._user32.GetDC.argtypes = [ctypes.c_void_p]
+        self._user32.ReleaseDC.argtypes = [ctypes.c_void_p, ctypes.c_void_p]
+
+        self._lock = threading.Lock()
+        self._screen_dc: int = self._user32.GetDC(None)
+        self._sections: OrderedDict[tuple[int, int], _DibSection] = OrderedDict()
+        self._retired: list[_DibSection] = []
+        """被移出缓存的 DIB 位图，之前返回的视图可能仍在使用，直到 close 时才释放"""
+
+    def _get_section(self, width: int, height: int) -> _DibSection:
+        key = (width, height)
+        section = self._sections.get(key)
+        if section is None:
+            section = _DibSection(self._gdi32, self._screen_dc, width, height)
+            self._sections[key] = section
+            if len(self._sections) > self.MAX_POOLED_SIZES:
+                _key, evicted = self._sections.popitem(last=False)
+                self._retired.append(evicted)
+        else:
+            self._sections.move_to_end(key)
+        return section
+
+    def grab(self, scope: Scope, copy: bool = False) -> MatLike:
+        left, top, width, height = _check_scope(scope)
+        with self._lock:
+            section = self._get_section(width, height)
+            if not self._gdi32.BitBlt(
+                section.dc,
+                0,
+                0,
+                width,
+                height,
+                self._screen_dc,
+                left,
+                top,
+                self.SRCCOPY,
+            ):
+                raise RuntimeError(f"BitBlt failed for rect: {scope}")
+            self._gdi32.GdiFlush()
+            # 丢弃 alpha 通道；需要副本时在锁内复制，避免被其他线程的截图覆盖
+            pixels = section.pixels[:, :, :3]
+            return pixels.copy() if copy else pixels
+
+    def close(self) -> None:
+        with self._lock:
+            for section in [*self._sections.values(), *self._retired]:
+                section.close()
+            self._sections.clear()
+            self._retired.clear()
+            if self._screen_dc:
+                self._user32.ReleaseDC(None, self._screen_dc)
+                self._screen_dc = 0
+
+
+class ArrayCaptureBackend(CaptureBackend):
+    """
+    从 numpy 数组提供画面的截图后端。
+
+    `screen` 表示以 `origin` 为左上角的整块屏幕画面，截图时直接返回其中的视图。
+    """
+
+    def __init__(
+        self, screen: MatLike | None = None, origin: tuple[int, int] = (0, 0)
+    ) -> None:
+        self.screen: MatLike | None = screen
+        self.origin: tuple[int, int] = origin
+        self.grab_count: int = 0
+
+    def set_screen(self, screen: MatLike) -> None:
+        """替换当前屏幕画面。"""
+        self.screen = screen
+
+    def grab(self, scope: Scope, copy: bool = False) -> MatLike:
+        left, top, width, height = _check_scope(scope)
+        if self.screen is None:
+            raise RuntimeError("No screen image is set")
+        x0, y0 = left - self.origin[0], top - self.origin[1]
+        screen_height, screen_width = self.screen.shape[:2]
+        if x0 < 0 or y0 < 0 or x0 + width > screen_width or y0 + height > screen_height:
+            raise ValueError(f"Rect {scope} is out of screen image")
+        self.grab_count += 1
+        pixels = self.screen[y0 : y0 + height, x0 : x0 + width, :3]
+        return pixels.copy() if copy else pixels
+
+
+_backend: CaptureBackend | None = None
+_backend_lock = threading.Lock()
+
+
+def get_capture_backend() -> CaptureBackend:
+    """获取当前截图后端，首次调用时创建默认的 `Win32CaptureBackend`。"""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = Win32CaptureBackend()
+        return _backend
+
+
+def set_capture_backend(backend: CaptureBackend | None) -> None:
+    """替换当前截图后端并释放旧后端，传入 None 时恢复为默认后端。"""
+    global _backend
+    with _backend_lock:
+        if _backend is not None and _backend is not backend:
+            _backend.close()
+        _backend = backend
@@ -0,0 +1,151 @@
+"""扫描断点。
+
+扫描过程中记录当前页、本页新出现的行、最后完成的位置、宝藏摘要和网格签名，
+扫描被中断后可以直接滚动到断点所在页，确认网格一致后从下一个基质继续。
+"""
+
+from __future__ import annotations
+
+import base64
+import os
+import time
+from typing import ClassVar
+
+import cv2
+import numpy as np
+from cv2.typing import MatLike
+from pydantic import BaseModel
+
+from endfield_essence_recognizer.image import to_gray_image
+from endfield_essence_recognizer.log import logger
+from endfield_essence_recognizer.path import ROOT_DIR
+
+checkpoint_path = ROOT_DIR / "scan_checkpoint.json"
+"""扫描断点文件路径"""
+GRID_SIGNATURE_SIZE = (64, 32)
+"""网格签名的采样尺寸 (宽, 高)"""
+GRID_SIGNATURE_THRESHOLD = 6.0
+"""网格签名的平均灰度差不超过此值认为是同一页"""
+
+
+def grid_signature(grid_image: MatLike) -> str:
+    """网格签名：缩小到很小尺寸的灰度图，Base64 编码。"""
+    small = cv2.resize(
+        to_gray_image(grid_image), GRID_SIGNATURE_SIZE, interpolation=cv2.INTER_AREA
+    )
+    return base64.b64encode(small.tobytes()).decode("ascii")
+
+
+def grid_signature_distance(a: str, b: str) -> float:
+    """两个网格签名之间的平均灰度差，无法比较时返回无穷大。"""
+    try:
+        pixels_a = np.frombuffer(base64.b64decode(a), dtype=np.uint8)
+        pixels_b = np.frombuffer(base64.b64decode(b), dtype=np.uint8)
+    except ValueError:
+        return float("inf")
+    if pixels_a.shape != pixels_b.shape:
+        return float("inf")
+    return float(np.abs(pixels_a.astype(np.int16) - pixels_b).mean())
+
+
+class TreasureSummaryEntry(BaseModel):
+    stats: tuple[str, str, str]
+    weapons: list[dict]
+    count: int
+
+
+class ScanCheckpoint(BaseModel):
+    _VERSION: ClassVar[int] = 0
+
+    version: int = _VERSION
+
+    page: int
+    """断点所在页（从 1 开始，等于从第一页开始的滚动次数加一）"""
+    new_rows: list[int]
+    """断点所在页中新出现的行"""
+    last_cell: tuple[int, int] | None = None
+    """本页最后完成的位置 (行, 列)，本页还没有完成任何基质时为 None"""
+    grid_signature: str
+    """断点所在页开始扫描时的网格签名"""
+    treasure_summary: list[TreasureSummaryEntry] = []
+    """宝藏摘要"""
+    scanned_stats: list[tuple[str, str, str]] = []
+    """已扫描过的宝藏属性组合"""
+    saved_at: float = 0.0
+    """保存时间（Unix 时间戳）"""
+
+    @classmethod
+    def from_summary(
+        cls,
+        page: int,
+        new_rows: list[int],
+        grid_signature: str,
+        treasure_summary: dict[tuple[str, str, str], dict],
+        scanned_stats_set: set[tuple[str, str, str]],
+    ) -> ScanCheckpoint:
+        return cls(
+            page=page,
+            new_rows=new_rows,
+            grid_signature=grid_signature,
+            treasure_summary=[
+                TreasureSummaryEntry(
+                    stats=stats, weapons=entry["weapons"], count=entry["count"]
+                )
+                for stats, entry in treasure_summary.items()
+            ],
+            scanned_stats=sorted(scanned_stats_set),
+        )
+
+    def restore_summary(
+        self,
+        treasure_summary: dict[tuple[str, str, str], dict],
+        scanned_stats_set: set[tuple[str, str, str]],
+    ) -> None:
+        """把断点中的宝藏摘要恢复到扫描器中。"""
+        for entry in self.treasure_summary:
+            treasure_summary[entry.stats] = {
+                "weapons": entry.weapons,
+                "count": entry.count,
+            }
+        scanned_stats_set.update(self.scanned_stats)
+
+    def matches_grid(self, grid_image: MatLike) -> bool:
+        """当前网格是否与断点所在页开始扫描时的网格一致。"""
+        distance = grid_signature_distance(
+            grid_signature(grid_image), self.grid_signature
+        )
+        logger.debug(f"断点网格差异: {distance:.2f}")
+        return distance <= GRID_SIGNATURE_THRESHOLD
+
+    def is_done(self, row: int, col: int) -> bool:
+        """断点所在页中这个位置是否已经完成。"""
+        return self.last_cell is not None and (row, col) <= self.last_cell
+
+    def save(self) -> None:
+        """保存断点。先写入临时文件再替换，避免留下不完整的文件。"""
+        self.saved_at = time.time()
+        tmp_path = checkpoint_path.with_suffix(".json.tmp")
+        tmp_path.write_text(self.model_dump_json(), encoding="utf-8")
+        os.replace(tmp_path, checkpoint_path)
+
+    @classmethod
+    def load(cls) -> ScanCheckpoint | None:
+        """读取断点，文件不存在、无法解析或版本不匹配时返回 None。"""
+        if not checkpoint_path.is_file():
+            return None
+        try:
+            checkpoint = cls.model_validate_json(
+                checkpoint_path.read_text(encoding="utf-8")
+            )
+        except Exception as e:
+            logger.warning(f"读取扫描断点失败：{e}")
+            return None
+        if checkpoint.version != cls._VERSION:
+            logger.warning("扫描断点版本不匹配，已忽略。")
+            return None
+        return checkpoint
+
+    @staticmethod
+    def clear() -> None:
+        """删除断点文件。"""
+        checkpoint_path.unlink(missing_ok=True)
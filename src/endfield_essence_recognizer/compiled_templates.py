@@ -0,0 +1,174 @@
+"""预编译模板库。
+
+把预处理后的模板保存为一个可内存映射的 `.npy` 文件和一个 JSON 清单：
+
+- `<name>.npy`：所有模板像素首尾相接的一维 uint8 数组
+- `<name>.json`：格式版本、源哈希、源文件键，以及每个模板的标签、尺寸和在数组中的偏移
+
+源哈希由模板源图像的内容、标签顺序和预处理方式计算得到，
+任何一项变化都会使已编译的模板库失效，由 `Recognizer` 自动重新编译。
+计算源哈希需要读取所有模板源文件，因此启动时先比较只由文件元数据（相对路径、大小、修改时间）
+计算的源文件键，不一致时才读取文件内容计算源哈希。
+"""
+
+import hashlib
+import importlib.resources
+import json
+import os
+from collections.abc import Callable, Sequence
+from pathlib import Path
+
+import numpy as np
+from cv2.typing import MatLike
+
+from endfield_essence_recognizer.log import logger
+from endfield_essence_recognizer.path import CACHE_DIR
+
+COMPILED_TEMPLATES_FORMAT_VERSION = 1
+"""预编译模板库格式版本"""
+packaged_compiled_templates_dir = Path(
+    str(importlib.resources.files("endfield_essence_recognizer") / "templates/compiled")
+)
+"""随程序发布的预编译模板库目录（构建时由 scripts/compile_templates.py 生成）"""
+cached_compiled_templates_dir = CACHE_DIR / "templates"
+"""运行时自动编译的模板库目录"""
+
+
+def describe_preprocess(preprocess: Callable[[MatLike], MatLike]) -> str:
+    """预处理函数的稳定标识，用于计算源哈希。"""
+    module = getattr(preprocess, "__module__", None)
+    qualname = getattr(preprocess, "__qualname__", None)
+    if module is None or qualname is None:
+        return repr(preprocess)
+    return f"{module}.{qualname}"
+
+
+def compute_source_hash(
+    sources: Sequence[tuple[str, str, bytes]], preprocess_id: str
+) -> str:
+    """
+    计算模板源的内容哈希。
+
+    Args:
+        sources: (标签, 相对路径, 文件内容) 列表，顺序即模板加载顺序
+        preprocess_id: 模板预处理方式的标识
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(f"v{COMPILED_TEMPLATES_FORMAT_VERSION}\0{preprocess_id}\0".encode())
+    for label, relative_path, content in sources:
+        digest.update(f"{label}\0{relative_path}\0{len(content)}\0".encode())
+        digest.update(content)
+    return digest.hexdigest()
+
+
+def compute_source_key(
+    sources: Sequence[tuple[str, Path]], root: Path, preprocess_id: str
+) -> str:
+    """
+    由模板源文件的元数据计算源文件键，不读取文件内容。
+
+    Args:
+        sources: (标签, 文件路径) 列表，顺序即模板加载顺序
+        root: 模板目录，键中使用相对于它的路径
+        preprocess_id: 模板预处理方式的标识
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(f"v{COMPILED_TEMPLATES_FORMAT_VERSION}\0{preprocess_id}\0".encode())
+    for label, path in sources:
+        stat = path.stat()
+        relative_path = path.relative_to(root).as_posix()
+        digest.update(
+            f"{label}\0{relative_path}\0{stat.st_size}\0{stat.st_mtime_ns}\0".encode()
+        )
+    return digest.hexdigest()
+
+
+def load_compiled_templates(
+    directory: Path,
+    name: str,
+    source_key: str | None = None,
+    source_hash: str | None = None,
+) -> list[tuple[str, MatLike]] | None:
+    """
+    加载预编译模板库，文件不存在或与给出的源文件键、源哈希都不一致时返回 None。
+
+    模板以只读内存映射的方式加载，一次读取即可得到全部模板。
+
+    Returns:
+        (标签, 模板图像) 列表，顺序与编译时一致
+    """
+    manifest_path = directory / f"{name}.json"
+    data_path = directory / f"{name}.npy"
+    if not manifest_path.is_file() or not data_path.is_file():
+        return None
+    try:
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        if manifest.get("version") != COMPILED_TEMPLATES_FORMAT_VERSION or not (
+            (source_key is not None and manifest.get("source_key") == source_key)
+            or (source_hash is not None and manifest.get("source_hash") == source_hash)
+        ):
+            return None
+        data = np.load(data_path, mmap_mode="r")
+        templates = []
+        for entry in manifest["templates"]:
+            height, width = entry["shape"]
+            offset = entry["offset"]
+            template = data[offset : offset + height * width].reshape(height, width)
+            templates.append((entry["label"], template))
+        return templates
+    except Exception as e:
+        logger.warning(f"读取预编译模板库失败 {manifest_path}: {e}")
+        return None
+
+
+def update_compiled_templates_key(directory: Path, name: str, source_key: str) -> None:
+    """只更新预编译模板库清单中的源文件键（模板源的元数据变化但内容不变时）。"""
+    manifest_path = directory / f"{name}.json"
+    manifest_tmp_path = directory / f"{name}.json.tmp"
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    manifest["source_key"] = source_key
+    manifest_tmp_path.write_text(
+        json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8"
+    )
+    os.replace(manifest_tmp_path, manifest_path)
+
+
+def save_compiled_templates(
+    directory: Path,
+    name: str,
+    source_hash: str,
+    templates: Sequence[tuple[str, MatLike]],
+    source_key: str = "",
+) -> None:
+    """保存预编译模板库。先写入临时文件再替换，避免留下不完整的文件。"""
+    directory.mkdir(parents=True, exist_ok=True)
+    entries = []
+    offset = 0
+    for label, template in templates:
+        height, width = template.shape[:2]
+        entries.append({"label": label, "shape": [height, width], "offset": offset})
+        offset += height * width
+    data = (
+        np.concatenate([np.asarray(t, dtype=np.uint8).ravel() for _, t in templates])
+        if templates
+        else np.empty(0, dtype=np.uint8)
+    )
+    manifest = {
+        "version": COMPILED_TEMPLATES_FORMAT_VERSION,
+        "source_hash": source_hash,
+        "source_key": source_key,
+        "templates": entries,
+    }
+
+    data_path = directory / f"{name}.npy"
+    manifest_path = directory / f"{name}.json"
+    data_tmp_path = directory / f"{name}.npy.tmp"
+    manifest_tmp_path = directory / f"{name}.json.tmp"
+    with data_tmp_path.open("wb") as f:
+        np.save(f, data)
+    manifest_tmp_path.write_text(
+        json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8"
+    )
+    # 先替换数据再替换清单，清单始终描述已经完整写入的数据
+    os.replace(data_tmp_path, data_path)
+    os.replace(manifest_tmp_path, manifest_path)
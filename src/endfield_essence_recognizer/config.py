@@ -17,6 +17,9 @@ type Action = Literal[
     "unlock_and_undeprecate",
 ]
 
+type ScanMode = Literal["serial", "pipelined"]
+"""扫描模式：serial 逐个识别并操作，pipelined 点击与识别流水线并行"""
+
 config_path = ROOT_DIR / "config.json"
 
 
@@ -37,12 +40,43 @@ class Config(BaseModel):
     treasure_action: Action = "lock"
     trash_action: Action = "unlock"
 
+    scan_mode: ScanMode = "serial"
+    incremental_scan: bool = False
+    """增量扫描：缩略图已记录在基质库存中的基质不再识别属性"""
+    badge_skip: bool = False
+    """角标跳过：缩略图角标显示的锁定和弃用状态无论品质如何都无需操作时不点击，这些基质不计入宝藏摘要"""
+    resume_scan: bool = False
+    """断点续扫：扫描被中断后，下次扫描直接滚动到断点所在页继续"""
+    record_scan: bool = False
+    """录制扫描：把扫描中的截图、点击和滚动写入录像，可用 `eer replay` 离线回放"""
+    trace_scan: bool = False
+    """追踪扫描：记录扫描各阶段的时间线，扫描结束时保存为 Chrome 追踪文件，可在 Perfetto 中查看"""
+
+    _DECISION_FIELDS: ClassVar[tuple[str, ...]] = (
+        "trash_weapon_ids",
+        "treasure_essence_stats",
+    )
+    """影响基质判定索引的字段"""
+    _decision_revision: int = 0
+
+    @property
+    def decision_revision(self) -> int:
+        """判定相关字段的修订号，这些字段每次变化后递增，用于让判定索引失效。"""
+        return self._decision_revision
+
     def update_from_model(self, other: Config) -> None:
+        decision_changed = any(
+            getattr(self, field) != getattr(other, field)
+            for field in self._DECISION_FIELDS
+        )
         for field in self.__class__.model_fields:
             setattr(self, field, getattr(other, field))
+        if decision_changed:
+            self._decision_revision += 1
 
     def update_from_dict(self, data: dict[str, Any]) -> None:
-        model = Config.model_validate(data)
+        # 未提供的字段保留当前值，前端只提交它关心的字段
+        model = Config.model_validate({**self.model_dump(), **data})
         self.update_from_model(model)
 
     @classmethod
@@ -0,0 +1,197 @@
+"""基质判定索引。
+
+把武器数据和用户配置预先整理成哈希索引，判定一个基质时只需常数次字典查找，
+与游戏中的武器数量无关。配置中相关字段变化后索引会自动重建。
+
+判定品质之后，根据用户设置的操作决定需要点击的按钮，以及扫描时可以不点击的基质。
+"""
+
+from __future__ import annotations
+
+import itertools
+import threading
+from collections.abc import Iterable, Mapping
+from typing import TYPE_CHECKING, Literal, NamedTuple
+
+from endfield_essence_recognizer.config import config
+
+if TYPE_CHECKING:
+    from endfield_essence_recognizer.config import EssenceStats
+    from endfield_essence_recognizer.game_data.snapshot import WeaponInfo
+
+type StatsTuple = tuple[str, str, str]
+
+type ButtonAction = Literal["lock", "unlock", "deprecate", "undeprecate"]
+"""对当前选中基质执行的按钮操作"""
+
+
+class WeaponMatch(NamedTuple):
+    treasure: list[str]
+    """匹配且未被用户标记为垃圾的武器 ID"""
+    trash: list[str]
+    """匹配但被用户标记为垃圾的武器 ID"""
+
+
+_NO_MATCH = WeaponMatch([], [])
+
+
+class DecisionIndex:
+    """
+    基质判定索引。
+
+    - 武器索引：(基础属性, 附加属性, 技能属性) 到匹配武器 ID 的映射，按宝藏/垃圾分开
+    - 用户宝藏条件：每个条件的词条集合组成的哈希集合
+    """
+
+    def __init__(
+        self,
+        weapons: Mapping[str, WeaponInfo],
+        trash_weapon_ids: Iterable[str],
+        treasure_essence_stats: Iterable[EssenceStats],
+    ) -> None:
+        self.trash_weapon_ids: frozenset[str] = frozenset(trash_weapon_ids)
+
+        weapons_by_stats: dict[tuple[str | None, ...], WeaponMatch] = {}
+        for weapon_id, weapon in weapons.items():
+            stats = weapon["stats"]
+            key = (stats["attribute"], stats["secondary"], stats["skill"])
+            match = weapons_by_stats.setdefault(key, WeaponMatch([], []))
+            if weapon_id in self.trash_weapon_ids:
+                match.trash.append(weapon_id)
+            else:
+                match.treasure.append(weapon_id)
+        self.weapons_by_stats: dict[tuple[str | None, ...], WeaponMatch] = (
+            weapons_by_stats
+        )
+
+        # 用户条件的三个词条都出现在基质上即匹配，与词条顺序无关；
+        # 含空词条的条件永远不会匹配完整识别的基质
+        treasure_stat_sets: set[frozenset[str]] = set()
+        for treasure_stat in treasure_essence_stats:
+            stats = (
+                treasure_stat.attribute,
+                treasure_stat.secondary,
+                treasure_stat.skill,
+            )
+            if None not in stats:
+                treasure_stat_sets.add(frozenset(stats))  # type: ignore[arg-type]
+        self.treasure_stat_sets: frozenset[frozenset[str]] = frozenset(
+            treasure_stat_sets
+        )
+
+    def match_treasure_stats(self, stats: StatsTuple) -> bool:
+        """基质是否符合用户设定的任一宝藏基质条件。"""
+        if not self.treasure_stat_sets:
+            return False
+        # 基质只有三个词条，枚举它的所有非空子集（至多 7 个）查表
+        return any(
+            frozenset(subset) in self.treasure_stat_sets
+            for size in range(1, len(stats) + 1)
+            for subset in itertools.combinations(stats, size)
+        )
+
+    def match_weapons(self, stats: StatsTuple) -> WeaponMatch:
+        """查找与基质词条完全一致的武器。"""
+        return self.weapons_by_stats.get(stats, _NO_MATCH)
+
+    def quality(self, stats: StatsTuple) -> Literal["treasure", "trash"]:
+        """判断基质品质（与 `judge_essence_quality` 的规则一致，但不输出日志也不记录摘要）。"""
+        if self.match_treasure_stats(stats) or self.match_weapons(stats).treasure:
+            return "treasure"
+        return "trash"
+
+
+_index: DecisionIndex | None = None
+_index_revision: int = -1
+_index_lock = threading.Lock()
+
+
+def get_decision_index() -> DecisionIndex:
+    """获取当前配置下的判定索引，配置中相关字段变化后重建。"""
+    from endfield_essence_recognizer.game_data.weapon import weapon_info_dict
+
+    global _index, _index_revision
+    with _index_lock:
+        revision = config.decision_revision
+        if _index is None or _index_revision != revision:
+            _index = DecisionIndex(
+                weapon_info_dict,
+                config.trash_weapon_ids,
+                config.treasure_essence_stats,
+            )
+            _index_revision = revision
+        return _index
+
+
+def plan_button_actions(
+    essence_quality: Literal["treasure", "trash"],
+    locked_str: str | None,
+    deprecated_str: str | None,
+) -> list[ButtonAction]:
+    """根据基质品质、当前锁定和弃用状态以及用户设置，决定需要点击的按钮。"""
+    action = (
+        config.treasure_action if essence_quality == "treasure" else config.trash_action
+    )
+    actions: list[ButtonAction] = []
+    if locked_str == "未锁定" and action == "lock":
+        actions.append("lock")
+    elif locked_str == "已锁定" and action in ["unlock", "unlock_and_undeprecate"]:
+        actions.append("unlock")
+    if deprecated_str == "未弃用" and action == "deprecate":
+        actions.append("deprecate")
+    elif deprecated_str == "已弃用" and action in [
+        "undeprecate",
+        "unlock_and_undeprecate",
+    ]:
+        actions.append("undeprecate")
+    return actions
+
+
+def state_after_actions(
+    locked_str: str | None,
+    deprecated_str: str | None,
+    actions: list[ButtonAction],
+) -> tuple[str | None, str | None]:
+    """执行按钮操作后基质的锁定和弃用状态。"""
+    for action in actions:
+        if action == "lock":
+            locked_str = "已锁定"
+        elif action == "unlock":
+            locked_str = "未锁定"
+        elif action == "deprecate":
+            deprecated_str = "已弃用"
+        elif action == "undeprecate":
+            deprecated_str = "未弃用"
+    return locked_str, deprecated_str
+
+
+def skip_reason(
+    locked_str: str,
+    deprecated_str: str,
+    known_quality: Literal["treasure", "trash"] | None,
+    badge_skip: bool,
+) -> Literal["known", "badge"] | None:
+    """
+    根据缩略图角标显示的状态判断是否可以不点击一个基质。
+
+    Args:
+        locked_str: 角标显示的锁定状态
+        deprecated_str: 角标显示的弃用状态
+        known_quality: 增量扫描中按记录的属性判定的品质，属性未知时为 None
+        badge_skip: 是否允许只根据角标跳过属性未知的基质
+
+    Returns:
+        - known: 已知属性，按其品质无需操作
+        - badge: 属性未知，但无论品质如何都无需操作
+        - None: 需要点击
+    """
+    if known_quality is not None:
+        if plan_button_actions(known_quality, locked_str, deprecated_str):
+            return None
+        return "known"
+    if badge_skip and not any(
+        plan_button_actions(quality, locked_str, deprecated_str)
+        for quality in ("treasure", "trash")
+    ):
+        return "badge"
+    return None
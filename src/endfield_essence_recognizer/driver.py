@@ -0,0 +1,62 @@
+"""游戏交互驱动。
+
+扫描器通过驱动截图、点击和滚动，不直接依赖窗口和输入后端：
+
+- `window.WindowDriver`：操作真实的终末地窗口，依赖 pygetwindow、pyautogui 和 pywin32
+- `recording.RecordingDriver`：包装另一个驱动，把扫描过程写入录像
+- `recording.ReplayDriver`：从录像中回放画面，不需要窗口和输入后端，可在 Linux 上运行
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING
+
+from endfield_essence_recognizer.image import Frame
+
+if TYPE_CHECKING:
+    from cv2.typing import MatLike
+
+    from endfield_essence_recognizer.image import Scope
+
+
+class GameDriver(ABC):
+    """扫描器与游戏交互的接口，所有坐标均为客户区坐标。"""
+
+    @abstractmethod
+    def activate(self) -> bool:
+        """找到游戏窗口并将其置于前台，找不到窗口时返回 False。"""
+
+    @abstractmethod
+    def is_active(self) -> bool:
+        """游戏窗口是否在前台。"""
+
+    @abstractmethod
+    def client_size(self) -> tuple[int, int]:
+        """客户区的尺寸 (宽, 高)。"""
+
+    @abstractmethod
+    def screenshot(self, relative_region: Scope, copy: bool = True) -> MatLike:
+        """
+        截取客户区中的一块区域，返回 BGR 格式的 numpy 图像。
+
+        Args:
+            relative_region: 客户区坐标下的截图区域
+            copy: 是否复制截图结果。为 False 时可能返回驱动内部缓冲区的视图，
+                会在下一次相同尺寸的截图时被覆盖
+        """
+
+    @abstractmethod
+    def click(self, x: int, y: int) -> None:
+        """在客户区坐标 (x, y) 位置点击。"""
+
+    @abstractmethod
+    def scroll(self, x: int, y: int, ticks: int) -> None:
+        """把鼠标移动到客户区坐标 (x, y) 后滚动滚轮，负数为向下滚动。"""
+
+    def capture_frame(self, relative_region: Scope) -> Frame:
+        """截取一块区域作为一帧画面，画面直接引用驱动的缓冲区，见 `screenshot`。"""
+        return Frame(self.screenshot(relative_region, copy=False), relative_region)
+
+    def close(self) -> None:
+        """扫描结束后释放驱动持有的资源。"""
@@ -1,32 +1,55 @@
 import importlib.resources
+import queue
 import threading
-import time
-from collections.abc import Collection
+from dataclasses import dataclass
 from typing import Literal
 
 import cv2
 import numpy as np
-import pyautogui
-import pygetwindow
-
-from endfield_essence_recognizer.config import config
-from endfield_essence_recognizer.game_data import get_translation, weapon_basic_table
-from endfield_essence_recognizer.game_data.item import get_item_name
+from cv2.typing import MatLike
+
+from endfield_essence_recognizer.checkpoint import ScanCheckpoint, grid_signature
+from endfield_essence_recognizer.config import ScanMode
+from endfield_essence_recognizer.decision import (
+    ButtonAction,
+    get_decision_index,
+    plan_button_actions,
+    skip_reason,
+    state_after_actions,
+)
+from endfield_essence_recognizer.driver import GameDriver
 from endfield_essence_recognizer.game_data.weapon import (
+    all_attribute_stats,
+    all_secondary_stats,
+    all_skill_stats,
     get_gem_tag_name,
-    weapon_stats_dict,
-    weapon_type_int_to_translation_key,
+    weapon_info_dict,
+)
+from endfield_essence_recognizer.grid import GridOccupancy, analyze_grid
+from endfield_essence_recognizer.image import Frame, load_image
+from endfield_essence_recognizer.inventory import (
+    InventoryRecord,
+    InventoryStore,
+    get_inventory_store,
 )
-from endfield_essence_recognizer.image import load_image
 from endfield_essence_recognizer.log import logger
+from endfield_essence_recognizer.metrics import metrics
+from endfield_essence_recognizer.paging import ScrollOffset, estimate_scroll_offset
 from endfield_essence_recognizer.recognizer import Recognizer
-from endfield_essence_recognizer.window import (
-    click_on_window,
-    get_active_support_window,
-    get_client_size,
-    get_support_window,
-    screenshot_window,
+from endfield_essence_recognizer.settle import (
+    SETTLE_CHANGE_THRESHOLD,
+    SettleResult,
+    SettleStats,
+    fingerprint_distance,
+    image_fingerprint,
+    wait_for_settle,
 )
+from endfield_essence_recognizer.thumbnail import (
+    badge_classifier,
+    thumbnail_fingerprint,
+    thumbnail_memory,
+)
+from endfield_essence_recognizer.tracing import new_trace_path, tracer
 
 # 基质图标位置网格（客户区像素坐标）
 # 5 行 9 列，共 45 个图标位置
@@ -41,6 +64,7 @@ ESSENCE_UI_TEMPLATE_PATH = (
     / "templates/screenshot/武器基质.png"
 )
 AREA = ((1465, 79), (1883, 532))
+"""基质详情面板区域（包含所有属性和按钮截图区域，每个基质只截图一次）"""
 DEPRECATE_BUTTON_POS = (1807, 284)
 """弃用按钮点击坐标"""
 LOCK_BUTTON_POS = (1839, 286)
@@ -55,22 +79,59 @@ STATS_1_ROI = ((1508, 416), (1700, 448))
 """属性 1 截图区域"""
 STATS_2_ROI = ((1508, 468), (1700, 500))
 """属性 2 截图区域"""
+STATS_SLOTS = [
+    (STATS_0_ROI, all_attribute_stats),
+    (STATS_1_ROI, all_secondary_stats),
+    (STATS_2_ROI, all_skill_stats),
+]
+"""三个属性槽位的截图区域及其可能出现的标签（按 termType 分组：基础属性、附加属性、技能属性）"""
+DEPRECATE_BUTTON_LABELS = ["已弃用", "未弃用"]
+"""弃用按钮可能出现的标签"""
+LOCK_BUTTON_LABELS = ["已锁定", "未锁定"]
+"""锁定按钮可能出现的标签"""
+BUTTON_CANDIDATE_LABELS = [*DEPRECATE_BUTTON_LABELS, *LOCK_BUTTON_LABELS]
+"""识别按钮时匹配的标签：同时匹配另一个按钮的模板，截图区域错位看到另一个按钮时识别为未知"""
 SCROLL_POSITION = (960, 500)
 """鼠标滚轮滚动位置（客户区坐标）"""
 SCROLL_TICKS = -100
 """鼠标滚轮滚动量（负数为向下滚动）"""
 FIRST_ESSENCE_ROI = ((128, 196), (230, 288))
-"""第一个基质截图区域（用于检测滚动是否成功）"""
+"""第一个基质截图区域"""
 ESSENCE_SIMILARITY_THRESHOLD = 0.95
 """基质相似度阈值（用于检测重复）"""
+ESSENCE_ICON_SIZE = (
+    FIRST_ESSENCE_ROI[1][0] - FIRST_ESSENCE_ROI[0][0],
+    FIRST_ESSENCE_ROI[1][1] - FIRST_ESSENCE_ROI[0][1],
+)
+"""基质图标尺寸 (宽, 高)"""
+BOTTOM_DETECTION_ROI = (
+    (int(essence_icon_x_list[0]), int(essence_icon_y_list[0])),
+    (
+        int(essence_icon_x_list[-1]) + ESSENCE_ICON_SIZE[0],
+        int(essence_icon_y_list[-1]) + ESSENCE_ICON_SIZE[1],
+    ),
+)
+"""底部检测区域（完整覆盖所有基质图标的网格区域）"""
+ESSENCE_ROW_PITCH = float(
+    (essence_icon_y_list[-1] - essence_icon_y_list[0]) / (len(essence_icon_y_list) - 1)
+)
+"""相邻两行基质图标的间距（像素）"""
+CLICK_SETTLE_TIMEOUT = 0.5
+"""点击后等待详情面板稳定的最长时间（秒）"""
+CLICK_UNCHANGED_WINDOW = 0.35
+"""点击基质后详情面板持续不变超过此时间（秒）认为面板没有刷新（原先点击后固定等待 0.3 秒）"""
+ACTION_UNCHANGED_WINDOW = 0.5
+"""按钮操作后详情面板持续不变超过此时间（秒）认为按钮状态没有变化（原先操作后固定等待 0.5 秒）"""
+SCROLL_SETTLE_TIMEOUT = 1.5
+"""滚动后等待基质网格稳定的最长时间（秒）"""
+SCROLL_UNCHANGED_WINDOW = 0.8
+"""滚动后基质网格持续不变超过此时间（秒）认为这次滚动没有生效（游戏开始滚动可能较慢）"""
 MAX_SCROLL_ATTEMPTS = 3
-"""最大滚动尝试次数"""
-SCROLL_SIMILARITY_THRESHOLD = 0.9
-"""滚动成功判定阈值（低于此值认为滚动成功）"""
-BOTTOM_DETECTION_ROI = ((128, 196), (1374, 819))
-"""底部检测区域（基质网格区域）"""
-BOTTOM_SIMILARITY_THRESHOLD = 0.95
-"""底部检测相似度阈值"""
+"""网格没有滚动时最多尝试滚动的次数，全部没有滚动才认为已经到底"""
+PIPELINE_QUEUE_SIZE = 2
+"""流水线扫描中等待识别的基质画面队列长度"""
+CHECKPOINT_INTERVAL = 8
+"""逐个扫描时每完成多少个基质保存一次扫描断点（每页结束时总会保存）"""
 
 # 扫描中止相关常量
 MAX_CONSECUTIVE_FAILURES = 3
@@ -83,15 +144,15 @@ MAX_CONSECUTIVE_DUPLICATE_RESULTS = 2
 """最大连续重复结果次数（超过此值中止扫描，说明点击了空白位置）"""
 
 
-def check_scene(window: pygetwindow.Window) -> bool:
-    width, height = get_client_size(window)
+def check_scene(driver: GameDriver) -> bool:
+    width, height = driver.client_size()
     if (width, height) != RESOLUTION:
         logger.warning(
             f"检测到终末地窗口的客户区尺寸为 {width}x{height}，请将终末地分辨率调整为 {RESOLUTION[0]}x{RESOLUTION[1]} 窗口。"
         )
         return False
 
-    screenshot = screenshot_window(window, ESSENCE_UI_ROI)
+    screenshot = driver.screenshot(ESSENCE_UI_ROI)
     template = load_image(ESSENCE_UI_TEMPLATE_PATH.read_bytes())
     res = cv2.matchTemplate(screenshot, template, cv2.TM_CCOEFF_NORMED)
     _, max_val, _, _ = cv2.minMaxLoc(res)
@@ -104,75 +165,82 @@ def check_scene(window: pygetwindow.Window) -> bool:
     return True
 
 
-def scroll_down_window(window: pygetwindow.Window) -> None:
-    from endfield_essence_recognizer.window import _get_client_rect
-
-    (left, top), (_right, _bottom) = _get_client_rect(window)
-    screen_x = left + SCROLL_POSITION[0]
-    screen_y = top + SCROLL_POSITION[1]
+def scroll_and_settle(
+    driver: GameDriver,
+    baseline: np.ndarray,
+    settle_stats: SettleStats | None = None,
+) -> SettleResult:
+    """
+    向下滚动并等待基质网格稳定，返回网格区域（`BOTTOM_DETECTION_ROI`）的稳定检测结果。
 
-    pyautogui.moveTo(screen_x, screen_y)
-    pyautogui.scroll(SCROLL_TICKS)
+    Args:
+        baseline: 滚动前网格区域的指纹
+    """
+    driver.scroll(*SCROLL_POSITION, SCROLL_TICKS)
+    settle = wait_for_settle(
+        lambda: driver.screenshot(BOTTOM_DETECTION_ROI, copy=False),
+        baseline,
+        SCROLL_SETTLE_TIMEOUT,
+        unchanged_window=SCROLL_UNCHANGED_WINDOW,
+    )
+    logger.debug(
+        f"滚动后网格稳定耗时 {settle.latency * 1000:.0f}ms"
+        f"（{'已变化' if settle.changed else '未变化'}）"
+    )
+    if settle_stats is not None:
+        settle_stats.record("滚动", settle)
+    return settle
 
 
-def scroll_to_next_page_robust(window: pygetwindow.Window) -> bool:
-    first_essence_before = screenshot_window(window, FIRST_ESSENCE_ROI)
+@metrics.timed("scroll_page_seconds")
+@tracer.traced("scroll")
+def scroll_to_next_page(
+    driver: GameDriver, settle_stats: SettleStats | None = None
+) -> ScrollOffset:
+    """
+    向下滚动一页，通过滚动前后网格的配准得到实际滚动的行数。
 
+    滚轮事件可能丢失，游戏也可能较晚才开始滚动，因此网格没有滚动时会重新滚动，
+    连续 `MAX_SCROLL_ATTEMPTS` 次都没有滚动才返回 0 行，表示已经到底。
+    """
+    baseline = image_fingerprint(driver.screenshot(BOTTOM_DETECTION_ROI, copy=False))
     for attempt in range(MAX_SCROLL_ATTEMPTS):
-        scroll_down_window(window)
-        time.sleep(0.8)
-
-        first_essence_after = screenshot_window(window, FIRST_ESSENCE_ROI)
-
-        result = cv2.matchTemplate(
-            first_essence_before, first_essence_after, cv2.TM_CCOEFF_NORMED
+        settle = scroll_and_settle(driver, baseline, settle_stats)
+        offset = estimate_scroll_offset(
+            baseline, settle.fingerprint, ESSENCE_ROW_PITCH, len(essence_icon_y_list)
         )
-        _, max_val, _, _ = cv2.minMaxLoc(result)
-
         logger.debug(
-            f"滚动尝试 {attempt + 1}/{MAX_SCROLL_ATTEMPTS}，相似度: {max_val:.3f}"
+            f"滚动尝试 {attempt + 1}/{MAX_SCROLL_ATTEMPTS}，滚动偏移: {offset.rows} 行"
+            f"（{offset.pixels:.1f}px，响应 {offset.response:.3f}）"
         )
-
-        if max_val < SCROLL_SIMILARITY_THRESHOLD:
-            logger.info(f"滚动成功（尝试 {attempt + 1} 次）")
-            return True
-
-        logger.debug("第一个基质未变化，继续滚动...")
-
-    logger.warning(f"滚动失败（{MAX_SCROLL_ATTEMPTS} 次尝试后第一个基质仍相同）")
-    return False
-
-    first_essence_after = screenshot_window(window, FIRST_ESSENCE_ROI)
-
-    result = cv2.matchTemplate(
-        first_essence_before, first_essence_after, cv2.TM_CCOEFF_NORMED
+        if offset.rows != 0:
+            break
+    if offset.rows is None:
+        logger.warning("无法确定滚动的行数，将扫描整页基质。")
+    return offset
+
+
+def analyze_page(grid_image: MatLike) -> GridOccupancy:
+    """分析网格区域（`BOTTOM_DETECTION_ROI`）截图，判断本页每个位置是否有基质。"""
+    (grid_left, grid_top), _ = BOTTOM_DETECTION_ROI
+    return analyze_grid(
+        grid_image,
+        [int(x) - grid_left for x in essence_icon_x_list],
+        [int(y) - grid_top for y in essence_icon_y_list],
+        ESSENCE_ICON_SIZE,
     )
-    _, max_val, _, _ = cv2.minMaxLoc(result)
-
-    logger.debug(f"第一个基质相似度: {max_val:.3f}")
-
-    if max_val >= ESSENCE_SIMILARITY_THRESHOLD:
-        logger.debug("检测到第一个基质重复，额外滚动一次")
-        scroll_down_window(window)
-        time.sleep(0.5)
-
-
-def is_at_bottom_robust(window: pygetwindow.Window) -> bool:
-    first_essence = screenshot_window(window, FIRST_ESSENCE_ROI)
 
-    scroll_down_window(window)
-    time.sleep(0.8)
 
-    first_essence_after = screenshot_window(window, FIRST_ESSENCE_ROI)
-
-    result = cv2.matchTemplate(first_essence, first_essence_after, cv2.TM_CCOEFF_NORMED)
-    _, max_val, _, _ = cv2.minMaxLoc(result)
-
-    logger.debug(f"底部检测（第一个基质相似度）: {max_val:.3f}")
-
-    return max_val >= BOTTOM_SIMILARITY_THRESHOLD
+def crop_thumbnail(grid_image: MatLike, i: int, j: int) -> MatLike:
+    """从网格区域（`BOTTOM_DETECTION_ROI`）截图中裁出第 i 行第 j 列的缩略图。"""
+    x, y = int(essence_icon_x_list[j]), int(essence_icon_y_list[i])
+    return Frame(grid_image, BOTTOM_DETECTION_ROI).crop(
+        ((x, y), (x + ESSENCE_ICON_SIZE[0], y + ESSENCE_ICON_SIZE[1]))
+    )
 
 
+@metrics.timed("judge_seconds")
+@tracer.traced("judge")
 def judge_essence_quality(
     stats: list[str | None],
     treasure_summary: dict[tuple[str, str, str], dict] | None = None,
@@ -194,42 +262,26 @@ def judge_essence_quality(
 
     stats_tuple = (stats[0], stats[1], stats[2])  # type: ignore
 
+    decision_index = get_decision_index()
+
     # 尝试匹配用户自定义的宝藏基质条件
-    for treasure_stat in config.treasure_essence_stats:
-        if (
-            treasure_stat.attribute in stats
-            and treasure_stat.secondary in stats
-            and treasure_stat.skill in stats
-        ):
-            logger.opt(colors=True).success(
-                "这个基质是<green><bold><underline>宝藏</></></>，因为它符合你设定的宝藏基质条件。"
-            )
-            return "treasure"
+    if decision_index.match_treasure_stats(stats_tuple):
+        logger.opt(colors=True).success(
+            "这个基质是<green><bold><underline>宝藏</></></>，因为它符合你设定的宝藏基质条件。"
+        )
+        return "treasure"
 
     # 尝试匹配已实装武器
-    matched_weapons = []  # 收集所有匹配的武器
-    for weapon_id, weapon_basic in weapon_basic_table.items():
-        weapon_stats = weapon_stats_dict[weapon_id]
-        if (
-            weapon_stats["attribute"] == stats[0]
-            and weapon_stats["secondary"] == stats[1]
-            and weapon_stats["skill"] == stats[2]
-        ):
-            # 收集匹配的武器
-            matched_weapons.append((weapon_id, weapon_basic))
-
-    if matched_weapons:
-        # 检查是否有垃圾武器
-        trash_weapons = [wid for wid, _ in matched_weapons if wid in config.trash_weapon_ids]
-        treasure_weapons = [wid for wid, _ in matched_weapons if wid not in config.trash_weapon_ids]
+    treasure_weapons, trash_weapons = decision_index.match_weapons(stats_tuple)
 
+    if treasure_weapons or trash_weapons:
         # 如果有垃圾武器
         if trash_weapons and not treasure_weapons:
             # 只有垃圾武器
             weapon_id = trash_weapons[0]
-            weapon_basic = weapon_basic_table[weapon_id]
+            weapon_info = weapon_info_dict[weapon_id]
             logger.opt(colors=True).warning(
-                f"这个基质虽然匹配武器<bold>{get_item_name(weapon_id, 'CN')}（{weapon_basic['rarity']}★ {get_translation(weapon_type_int_to_translation_key[weapon_id], 'CN')}）</>，但是它被认为是<red><bold><underline>垃圾</></></>。"
+                f"这个基质虽然匹配武器<bold>{weapon_info['name']}（{weapon_info['rarity']}★ {weapon_info['weapon_type']}）</>，但是它被认为是<red><bold><underline>垃圾</></></>。"
             )
             return "trash"
 
@@ -251,27 +303,26 @@ def judge_essence_quality(
                     }
 
                 # 添加所有宝藏武器（如果还没添加）
+                summary_weapons = treasure_summary[stats_tuple]["weapons"]
+                summary_weapon_ids = {w["id"] for w in summary_weapons}
                 for weapon_id in treasure_weapons:
-                    weapon_basic = weapon_basic_table[weapon_id]
-                    weapon_info = {
+                    weapon_info = weapon_info_dict[weapon_id]
+                    weapon_summary = {
                         "id": weapon_id,
-                        "name": get_item_name(weapon_id, "CN"),
-                        "rarity": weapon_basic["rarity"],
-                        "weapon_type": get_translation(
-                            weapon_type_int_to_translation_key[weapon_id], "CN"
-                        ),
+                        "name": weapon_info["name"],
+                        "rarity": weapon_info["rarity"],
+                        "weapon_type": weapon_info["weapon_type"],
                     }
                     # 检查武器是否已在列表中
-                    if not any(
-                        w["id"] == weapon_id for w in treasure_summary[stats_tuple]["weapons"]
-                    ):
-                        treasure_summary[stats_tuple]["weapons"].append(weapon_info)
+                    if weapon_id not in summary_weapon_ids:
+                        summary_weapons.append(weapon_summary)
+                        summary_weapon_ids.add(weapon_id)
 
                 treasure_summary[stats_tuple]["count"] += 1
 
         # 记录匹配的武器（所有宝藏武器）
         weapon_names = "、".join([
-            get_item_name(wid, "CN") for wid in treasure_weapons
+            weapon_info_dict[wid]["name"] for wid in treasure_weapons
         ])
         logger.opt(colors=True).success(
             f"这个基质是<green><bold><underline>宝藏</></></>，它完美契合武器<bold>{weapon_names}</>。"
@@ -287,12 +338,14 @@ def judge_essence_quality(
 
 def format_summary_report(
     treasure_summary: dict[tuple[str, str, str], dict],
+    badge_skipped: int = 0,
 ) -> str:
     """生成格式化的宝藏摘要报告。
 
     Args:
         treasure_summary: 宝藏摘要字典，key 为 (attribute, secondary, skill) 元组，
                          value 包含 weapons 列表和 count
+        badge_skipped: 只根据角标跳过、没有识别属性的基质数量
 
     Returns:
         格式化的摘要报告字符串
@@ -326,15 +379,48 @@ def format_summary_report(
     else:
         report_lines.append("未找到任何宝藏基质")
 
+    if badge_skipped:
+        report_lines.append("")
+        report_lines.append(
+            f"另有 <yellow><bold>{badge_skipped}</></yellow> 个基质只根据角标跳过，"
+            "未识别属性，不计入以上统计"
+        )
+
     report_lines.append("=================================================")
 
     return "\n".join(report_lines)
 
 
 def recognize_essence(
-    window: pygetwindow.Window, text_recognizer: Recognizer, icon_recognizer: Recognizer
+    driver: GameDriver, text_recognizer: Recognizer, icon_recognizer: Recognizer
+) -> tuple[list[str | None], str | None, str | None, list[float]]:
+    """截取基质详情面板并识别基质信息，返回值同 `recognize_essence_in_frame`。"""
+    frame = driver.capture_frame(AREA)
+    return recognize_essence_in_frame(frame, text_recognizer, icon_recognizer)
+
+
+def recognize_button(
+    icon_recognizer: Recognizer, roi_image: MatLike, labels: list[str]
+) -> tuple[str | None, float]:
+    """
+    识别按钮状态。
+
+    锁定和弃用按钮被激活时外观相近，只匹配本按钮的模板时另一个按钮的截图也能得到中等分数，
+    因此同时匹配两个按钮的模板，最佳匹配是另一个按钮的标签时返回 None。
+    """
+    label, score = icon_recognizer.recognize_roi(roi_image, BUTTON_CANDIDATE_LABELS)
+    return (label if label in labels else None), score
+
+
+def recognize_essence_in_frame(
+    frame: Frame,
+    text_recognizer: Recognizer,
+    icon_recognizer: Recognizer,
 ) -> tuple[list[str | None], str | None, str | None, list[float]]:
-    """识别基质信息。
+    """从一帧基质详情面板画面中识别基质信息。
+
+    Args:
+        frame: 包含所有属性和按钮截图区域的画面（通常为 `AREA`）
 
     Returns:
         包含四个元素的元组：
@@ -346,22 +432,23 @@ def recognize_essence(
     stats: list[str | None] = []
     attribute_scores: list[float] = []
 
-    for k, roi in enumerate([STATS_0_ROI, STATS_1_ROI, STATS_2_ROI]):
-        screenshot_image = screenshot_window(window, roi)
-        result, max_val = text_recognizer.recognize_roi(screenshot_image)
+    for k, (roi, labels) in enumerate(STATS_SLOTS):
+        result, max_val = text_recognizer.recognize_roi(frame.crop(roi), labels)
         stats.append(result)
         attribute_scores.append(max_val)
         logger.debug(f"属性 {k} 识别结果: {result} (分数: {max_val:.3f})")
 
-    screenshot_image = screenshot_window(window, DEPRECATE_BUTTON_ROI)
-    deprecated_str, max_val = icon_recognizer.recognize_roi(screenshot_image)
+    deprecated_str, max_val = recognize_button(
+        icon_recognizer, frame.crop(DEPRECATE_BUTTON_ROI), DEPRECATE_BUTTON_LABELS
+    )
     deprecated_text = (
         deprecated_str if deprecated_str is not None else "不知道是否已弃用"
     )
     logger.debug(f"弃用按钮识别结果: {deprecated_str} (分数: {max_val:.3f})")
 
-    screenshot_image = screenshot_window(window, LOCK_BUTTON_ROI)
-    locked_str, max_val = icon_recognizer.recognize_roi(screenshot_image)
+    locked_str, max_val = recognize_button(
+        icon_recognizer, frame.crop(LOCK_BUTTON_ROI), LOCK_BUTTON_LABELS
+    )
     locked_text = locked_str if locked_str is not None else "不知道是否已锁定"
     logger.debug(f"锁定按钮识别结果: {locked_str} (分数: {max_val:.3f})")
 
@@ -377,9 +464,9 @@ def recognize_essence(
 
 
 def recognize_once(
-    window: pygetwindow.Window, text_recognizer: Recognizer, icon_recognizer: Recognizer
+    driver: GameDriver, text_recognizer: Recognizer, icon_recognizer: Recognizer
 ) -> None:
-    check_scene_result = check_scene(window)
+    check_scene_result = check_scene(driver)
     if not check_scene_result:
         return
 
@@ -387,7 +474,7 @@ def recognize_once(
     scanned_stats_set: set[tuple[str, str, str]] = set()
 
     stats, deprecated_str, locked_str, _attribute_scores = recognize_essence(
-        window, text_recognizer, icon_recognizer
+        driver, text_recognizer, icon_recognizer
     )
 
     if deprecated_str is None or locked_str is None:
@@ -399,214 +486,742 @@ def recognize_once(
     logger.opt(colors=True).info(format_summary_report(treasure_summary))
 
 
+BUTTON_ACTION_POS: dict[ButtonAction, tuple[int, int]] = {
+    "lock": LOCK_BUTTON_POS,
+    "unlock": LOCK_BUTTON_POS,
+    "deprecate": DEPRECATE_BUTTON_POS,
+    "undeprecate": DEPRECATE_BUTTON_POS,
+}
+"""按钮操作对应的点击坐标"""
+BUTTON_ACTION_MESSAGES: dict[ButtonAction, str] = {
+    "lock": "给你自动锁上了，记得保管好哦！(*/ω＼*)",
+    "unlock": "给你自动解锁了！ヾ(≧▽≦*)o",
+    "deprecate": "给你自动标记为弃用了！(￣︶￣)>",
+    "undeprecate": "给你自动取消弃用啦！(＾Ｕ＾)ノ~ＹＯ",
+}
+"""按钮操作完成后的提示"""
+
+
+class ScanAbortMonitor:
+    """根据连续的识别结果判断扫描是否应该中止。"""
+
+    def __init__(self) -> None:
+        self.consecutive_failures = 0
+        self.consecutive_low_scores = 0
+        self.consecutive_duplicate_results = 0
+        self.last_recognized_stats: (
+            tuple[str | None, str | None, str | None, str | None, str | None] | None
+        ) = None
+
+    def check(
+        self,
+        stats: list[str | None],
+        deprecated_str: str | None,
+        locked_str: str | None,
+        attribute_scores: list[float],
+    ) -> Literal["ok", "skip", "abort"]:
+        """
+        检查一次识别结果。
+
+        Returns:
+            - ok: 结果可用
+            - skip: 按钮识别失败，跳过这个基质
+            - abort: 应该中止扫描
+        """
+        # 检查按钮识别失败（中止检测）
+        if deprecated_str is None or locked_str is None:
+            self.consecutive_failures += 1
+            logger.debug(
+                f"按钮识别失败 ({self.consecutive_failures}/{MAX_CONSECUTIVE_FAILURES})"
+            )
+            if self.consecutive_failures >= MAX_CONSECUTIVE_FAILURES:
+                logger.opt(colors=True).warning(
+                    f"<yellow>连续 {MAX_CONSECUTIVE_FAILURES} 次无法识别按钮状态，"
+                    f"可能未在基质界面。</>请按 '<green>N</>' 键打开贵重品库后切换到武器基质页面。"
+                )
+                return "abort"
+            return "skip"
+        else:
+            # 按钮识别成功，重置失败计数器
+            self.consecutive_failures = 0
+
+        # 检查低分识别（中止检测）
+        low_score_count = sum(1 for score in attribute_scores if score < LOW_SCORE_THRESHOLD)
+        if low_score_count == 3:  # 所有三个属性都是低分
+            self.consecutive_low_scores += 1
+            logger.debug(
+                f"低分识别 ({self.consecutive_low_scores}/{MAX_CONSECUTIVE_LOW_SCORES}), "
+                f"分数: {[f'{s:.2f}' for s in attribute_scores]}"
+            )
+            if self.consecutive_low_scores >= MAX_CONSECUTIVE_LOW_SCORES:
+                logger.opt(colors=True).warning(
+                    f"<yellow>连续 {MAX_CONSECUTIVE_LOW_SCORES} 次识别分数过低，"
+                    f"可能不在正确页面或识别异常。</>请检查游戏界面。"
+                )
+                return "abort"
+        else:
+            # 至少有一个属性分数正常，重置低分计数器
+            self.consecutive_low_scores = 0
+
+        # 检查重复识别结果（检测点击空白位置）
+        current_stats_tuple = (stats[0], stats[1], stats[2], deprecated_str, locked_str)
+        if self.last_recognized_stats is not None:
+            if current_stats_tuple == self.last_recognized_stats:
+                self.consecutive_duplicate_results += 1
+                logger.debug(
+                    f"识别结果重复 ({self.consecutive_duplicate_results}/{MAX_CONSECUTIVE_DUPLICATE_RESULTS})"
+                )
+                if self.consecutive_duplicate_results >= MAX_CONSECUTIVE_DUPLICATE_RESULTS:
+                    logger.opt(colors=True).warning(
+                        f"<yellow>连续 {MAX_CONSECUTIVE_DUPLICATE_RESULTS} 次识别结果相同，"
+                        f"可能已扫描完所有基质或点击了空白位置。</>"
+                    )
+                    return "abort"
+            else:
+                # 识别结果不同，重置重复计数器
+                self.consecutive_duplicate_results = 0
+
+        self.last_recognized_stats = current_stats_tuple
+        return "ok"
+
+
+@dataclass
+class PageCell:
+    """本页需要点击的一个基质。"""
+
+    row: int
+    col: int
+    thumbnail: MatLike
+    """网格中这个基质的缩略图"""
+    thumbnail_fingerprint: bytes
+    """缩略图指纹"""
+
+
+@dataclass
+class EssenceTask:
+    """流水线扫描中等待识别的一个基质。"""
+
+    cell: PageCell
+    image: MatLike
+    """点击后稳定下来的详情面板画面（`AREA`）"""
+    fingerprint: np.ndarray
+    """详情面板画面的指纹，用于延后操作时确认选中的仍是这个基质"""
+    panel_changed: bool = True
+    """点击后详情面板是否发生了变化，没有变化时识别结果不写入记录"""
+
+
+@dataclass
+class EssenceResult:
+    """流水线扫描中一个基质的识别结果。"""
+
+    task: EssenceTask
+    stats: list[str | None]
+    deprecated_str: str | None
+    locked_str: str | None
+    attribute_scores: list[float]
+
+
+class RecognitionWorker(threading.Thread):
+    """
+    流水线扫描的后台识别线程。
+
+    从有界队列中取出详情面板画面，完成识别后放入结果队列。
+    OpenCV 和 NumPy 在计算时会释放 GIL，因此识别可以与主线程等待界面刷新重叠进行。
+    品质判定会修改宝藏摘要，由主线程在中止检测通过后进行，与逐个扫描模式一致。
+    """
+
+    def __init__(
+        self,
+        text_recognizer: Recognizer,
+        icon_recognizer: Recognizer,
+    ) -> None:
+        super().__init__(daemon=True)
+        self.tasks: queue.Queue[EssenceTask | None] = queue.Queue(
+            maxsize=PIPELINE_QUEUE_SIZE
+        )
+        self.results: queue.Queue[EssenceResult] = queue.Queue()
+        self._text_recognizer: Recognizer = text_recognizer
+        self._icon_recognizer: Recognizer = icon_recognizer
+
+    def run(self) -> None:
+        while (task := self.tasks.get()) is not None:
+            try:
+                with tracer.span("recognize", row=task.cell.row, col=task.cell.col):
+                    stats, deprecated_str, locked_str, attribute_scores = (
+                        recognize_essence_in_frame(
+                            Frame(task.image, AREA),
+                            self._text_recognizer,
+                            self._icon_recognizer,
+                        )
+                    )
+            except Exception as e:
+                logger.exception(
+                    f"识别第 {task.cell.row + 1} 行第 {task.cell.col + 1} 列的基质时出错：{e}"
+                )
+                stats, deprecated_str, locked_str = [None, None, None], None, None
+                attribute_scores = [0.0, 0.0, 0.0]
+            self.results.put(
+                EssenceResult(task, stats, deprecated_str, locked_str, attribute_scores)
+            )
+
+    def stop(self) -> None:
+        self.tasks.put(None)
+
+
 class EssenceScanner(threading.Thread):
     """
     基质图标扫描器后台线程。
 
-    此线程负责自动遍历游戏界面中的 45 个基质图标位置，
+    此线程负责自动遍历游戏界面中 45 个基质图标位置里有基质的位置，
     对每个位置执行"点击 -> 截图 -> 识别"的流程。
+
+    流水线模式下，主线程负责点击、截图和品质判定，识别交给 `RecognitionWorker`，
+    需要执行的按钮操作延后到本页点击完成后，重新选中对应基质再执行。
     """
 
     def __init__(
         self,
         text_recognizer: Recognizer,
         icon_recognizer: Recognizer,
-        supported_window_titles: Collection[str],
+        driver: GameDriver,
+        scan_mode: ScanMode = "serial",
+        incremental: bool = False,
+        badge_skip: bool = False,
+        resume: bool = False,
+        inventory: InventoryStore | None = None,
+        checkpoints: bool = True,
+        trace: bool = False,
     ) -> None:
         super().__init__(daemon=True)
         self._scanning = threading.Event()
         self._text_recognizer: Recognizer = text_recognizer
         self._icon_recognizer: Recognizer = icon_recognizer
-        self._supported_window_titles: Collection[str] = supported_window_titles
+        self._driver: GameDriver = driver
+        self._scan_mode: ScanMode = scan_mode
+        self._settle_stats: SettleStats = SettleStats()
+
+        # 初始化宝藏摘要和去重集合
+        self._treasure_summary: dict[tuple[str, str, str], dict] = {}
+        self._scanned_stats_set: set[tuple[str, str, str]] = set()
+        # 初始化中止检测
+        self._abort_monitor: ScanAbortMonitor = ScanAbortMonitor()
+        # 基质库存与增量扫描
+        self._inventory: InventoryStore = (
+            inventory if inventory is not None else get_inventory_store()
+        )
+        self._incremental: bool = incremental
+        self._badge_skip: bool = badge_skip
+        # 只根据角标跳过的基质数量，这些基质的属性未知，不计入宝藏摘要
+        self._badge_skipped: int = 0
+        self._page: int = 0
+        # 扫描断点
+        self._resume: bool = resume
+        self._checkpoints: bool = checkpoints
+        # 扫描追踪
+        self._trace: bool = trace
+        self._page_new_rows: list[int] = []
+        self._page_signature: str = ""
+        # 详情面板的当前指纹，用于判断点击后面板是否已刷新
+        self._panel_fingerprint: np.ndarray | None = None
+
+    def _wait_for_panel(
+        self, baseline: np.ndarray | None, kind: str, unchanged_window: float
+    ) -> SettleResult:
+        """等待基质详情面板（`AREA`）在点击后稳定。"""
+        settle = wait_for_settle(
+            lambda: self._driver.screenshot(AREA, copy=False),
+            baseline,
+            CLICK_SETTLE_TIMEOUT,
+            unchanged_window=unchanged_window,
+        )
+        logger.debug(
+            f"{kind}后详情面板稳定耗时 {settle.latency * 1000:.0f}ms"
+            f"（{'已变化' if settle.changed else '未变化'}）"
+        )
+        self._settle_stats.record(kind, settle)
+        return settle
+
+    def _can_continue(self) -> bool:
+        """终末地窗口是否仍在前台且扫描没有被中断。"""
+        if not self._driver.is_active():
+            logger.info("终末地窗口不在前台，停止基质扫描。")
+            self._scanning.clear()
+            return False
+
+        if not self._scanning.is_set():
+            logger.info("基质扫描被中断。")
+            return False
+        return True
+
+    def _click_essence(self, i: int, j: int, retry: bool = False) -> SettleResult:
+        """
+        点击第 i 行第 j 列的基质，等待详情面板刷新并稳定。
+
+        Args:
+            retry: 面板没有变化时是否重新点击一次。
+                仍然没有变化时返回的 `changed` 为 False，画面可能仍是上一个基质，不能用于识别
+        """
+        for attempt in range(2 if retry else 1):
+            if attempt > 0:
+                logger.debug("点击后详情面板没有变化，重新点击...")
+            with tracer.span("click", row=i, col=j):
+                self._driver.click(
+                    int(essence_icon_x_list[j]), int(essence_icon_y_list[i])
+                )
+            settle = self._wait_for_panel(
+                self._panel_fingerprint, "点击", CLICK_UNCHANGED_WINDOW
+            )
+            self._panel_fingerprint = settle.fingerprint
+            if settle.changed:
+                break
+        return settle
+
+    def _apply_button_actions(self, actions: list[ButtonAction]) -> None:
+        """对当前选中的基质依次执行按钮操作。"""
+        for action in actions:
+            with tracer.span("action", action=action):
+                self._driver.click(*BUTTON_ACTION_POS[action])
+            logger.success(BUTTON_ACTION_MESSAGES[action])
+
+        if actions:
+            # 等待按钮状态刷新，更新面板指纹，避免误判下一次点击后的面板变化
+            settle = self._wait_for_panel(
+                self._panel_fingerprint, "操作", ACTION_UNCHANGED_WINDOW
+            )
+            self._panel_fingerprint = settle.fingerprint
+
+    def _recall_stats(self, fingerprint: bytes) -> tuple[str, str, str] | None:
+        """
+        增量扫描时查找缩略图对应的已知属性：先查本进程的记忆，再查基质库存。
+
+        跳过的基质不会被点击，缩略图相同而属性不同的情况无法被发现，
+        因此只有用户开启增量扫描时才信任记录的属性，否则返回 None。
+        """
+        if not self._incremental:
+            return None
+        stats = thumbnail_memory.recall(fingerprint)
+        if stats is None:
+            stats = self._inventory.lookup_stats(fingerprint)
+        return stats
+
+    def _plan_page(
+        self, grid_image: MatLike, cells: list[tuple[int, int]]
+    ) -> list[PageCell]:
+        """根据缩略图决定本页哪些基质需要点击。"""
+        page_cells: list[PageCell] = []
+        for i, j in cells:
+            thumbnail = crop_thumbnail(grid_image, i, j)
+            cell = PageCell(i, j, thumbnail, thumbnail_fingerprint(thumbnail))
+            known_stats = self._recall_stats(cell.thumbnail_fingerprint)
+            # 记录的属性只用来跳过无需操作的基质；需要点击的基质总是重新识别属性，
+            # 避免缩略图相同的另一个基质按记录的属性被锁定或弃用
+            if not self._can_skip(cell, known_stats):
+                page_cells.append(cell)
+        return page_cells
+
+    def _can_skip(
+        self, cell: PageCell, known_stats: tuple[str, str, str] | None
+    ) -> bool:
+        """
+        根据缩略图判断是否可以不点击这个基质，规则见 `skip_reason`。
+
+        只有角标状态有把握时才会跳过。已知属性的基质照常计入宝藏摘要，
+        只根据角标跳过的基质只计数，在扫描总结中单独列出。
+        """
+        locked_str, deprecated_str = badge_classifier.predict(cell.thumbnail)
+        if locked_str is None or deprecated_str is None:
+            return False
+
+        known_quality = (
+            get_decision_index().quality(known_stats)
+            if known_stats is not None
+            else None
+        )
+        reason = skip_reason(
+            locked_str, deprecated_str, known_quality, self._badge_skip
+        )
+        position = f"第 {cell.row + 1} 行第 {cell.col + 1} 列"
+        if reason == "known":
+            logger.info(f"{position}的基质已识别过且无需操作，跳过。")
+            # 增量扫描中记录的属性由用户选择信任，照常计入宝藏摘要
+            judge_essence_quality(
+                list(known_stats),  # type: ignore[arg-type]
+                self._treasure_summary,
+                self._scanned_stats_set,
+            )
+            return True
+        if reason == "badge":
+            logger.info(
+                f"{position}的基质{locked_str}、{deprecated_str}，无论品质如何都无需操作，跳过。"
+            )
+            self._badge_skipped += 1
+            return True
+        return False
+
+    def _record_essence(
+        self,
+        cell: PageCell,
+        stats: list[str | None],
+        deprecated_str: str | None,
+        locked_str: str | None,
+        applied_actions: list[ButtonAction],
+    ) -> None:
+        """
+        记录点击识别的结果：学习缩略图的角标外观和对应的属性，并写入基质库存。
+
+        缩略图是操作前截取的，角标按识别到的状态学习；
+        库存中记录的是执行完 `applied_actions` 之后的状态。
+        """
+        if deprecated_str is not None and locked_str is not None:
+            badge_classifier.learn(cell.thumbnail, locked_str, deprecated_str)
+        locked_str, deprecated_str = state_after_actions(
+            locked_str, deprecated_str, applied_actions
+        )
+        if None not in stats:
+            thumbnail_memory.remember(
+                cell.thumbnail_fingerprint,
+                (stats[0], stats[1], stats[2]),  # type: ignore[arg-type]
+            )
+        metrics.increment("essences_scanned")
+        self._inventory.add(
+            InventoryRecord(
+                fingerprint=cell.thumbnail_fingerprint,
+                attribute=stats[0],
+                secondary=stats[1],
+                skill=stats[2],
+                locked=locked_str,
+                deprecated=deprecated_str,
+                page=self._page,
+                row=cell.row,
+                col=cell.col,
+            )
+        )
+
+    def _save_checkpoint(self, last_cell: tuple[int, int] | None) -> None:
+        """保存当前页的扫描断点。"""
+        if not self._checkpoints:
+            return
+        try:
+            checkpoint = ScanCheckpoint.from_summary(
+                self._page,
+                self._page_new_rows,
+                self._page_signature,
+                self._treasure_summary,
+                self._scanned_stats_set,
+            )
+            checkpoint.last_cell = last_cell
+            checkpoint.save()
+        except Exception as e:
+            logger.warning(f"保存扫描断点失败：{e}")
+
+    def _fast_forward(self, checkpoint: ScanCheckpoint) -> bool:
+        """滚动到断点所在页，并确认网格与断点记录一致。"""
+        logger.info(f"从断点继续扫描：正在滚动到第 {checkpoint.page} 页...")
+        for _ in range(checkpoint.page - 1):
+            if not self._can_continue():
+                return False
+            if scroll_to_next_page(self._driver, self._settle_stats).rows == 0:
+                break
+
+        if not checkpoint.matches_grid(
+            self._driver.screenshot(BOTTOM_DETECTION_ROI, copy=False)
+        ):
+            logger.warning(
+                "当前网格与扫描断点记录不一致，已丢弃断点。请回到第一页后重新开始扫描。"
+            )
+            ScanCheckpoint.clear()
+            return False
+        checkpoint.restore_summary(self._treasure_summary, self._scanned_stats_set)
+        return True
+
+    def _scan_page_serial(self, cells: list[PageCell]) -> None:
+        """逐个点击、识别、判定并操作本页需要点击的基质。"""
+        # 本页最后一个完成的位置，以及上次保存断点后新完成的基质数量
+        last_done: tuple[int, int] | None = None
+        pending = 0
+        for cell in cells:
+            if not self._can_continue():
+                break
+
+            with tracer.span("cell", row=cell.row, col=cell.col):
+                logger.info(f"正在扫描第 {cell.row + 1} 行第 {cell.col + 1} 列的基质...")
+
+                # 点击基质图标位置，等待详情面板刷新并稳定，直接使用稳定后的画面识别
+                settle = self._click_essence(cell.row, cell.col, retry=True)
+                if not settle.changed:
+                    # 面板可能仍是上一个基质，也可能这个基质与上一个完全相同；
+                    # 照常判定和操作，但识别结果不能记录到这个基质的缩略图下
+                    logger.warning(
+                        f"第 {cell.row + 1} 行第 {cell.col + 1} 列的基质点击后详情面板没有变化，识别结果不写入记录。"
+                    )
+
+                # 识别基质信息
+                stats, deprecated_str, locked_str, attribute_scores = (
+                    recognize_essence_in_frame(
+                        Frame(settle.image, AREA),
+                        self._text_recognizer,
+                        self._icon_recognizer,
+                    )
+                )
+
+                verdict = self._abort_monitor.check(
+                    stats, deprecated_str, locked_str, attribute_scores
+                )
+                if verdict == "abort":
+                    self._scanning.clear()
+                    break
+                if verdict == "ok":
+                    essence_quality = judge_essence_quality(
+                        stats, self._treasure_summary, self._scanned_stats_set
+                    )
+                    actions = plan_button_actions(
+                        essence_quality, locked_str, deprecated_str
+                    )
+                    self._apply_button_actions(actions)
+                    if settle.changed:
+                        self._record_essence(
+                            cell, stats, deprecated_str, locked_str, actions
+                        )
+
+                # 每个基质都重写断点文件开销较大，每完成若干个基质才保存一次
+                last_done = (cell.row, cell.col)
+                pending += 1
+                if pending >= CHECKPOINT_INTERVAL:
+                    self._save_checkpoint(last_done)
+                    pending = 0
+
+        # 本页结束或中断时保存最后完成的位置，恢复时最多重新扫描不到一个间隔的基质
+        if pending:
+            self._save_checkpoint(last_done)
+
+    def _scan_page_pipelined(
+        self, worker: RecognitionWorker, cells: list[PageCell]
+    ) -> None:
+        """流水线扫描本页：点击与识别重叠进行，按钮操作延后到本页点击完成后执行。"""
+        submitted = 0
+        handled = 0
+        deferred: list[tuple[EssenceResult, list[ButtonAction]]] = []
+        aborted = False
+
+        def record(result: EssenceResult, applied_actions: list[ButtonAction]) -> None:
+            if result.task.panel_changed:
+                self._record_essence(
+                    result.task.cell,
+                    result.stats,
+                    result.deprecated_str,
+                    result.locked_str,
+                    applied_actions,
+                )
+
+        def handle(result: EssenceResult) -> None:
+            nonlocal aborted
+            if aborted:
+                return
+            verdict = self._abort_monitor.check(
+                result.stats,
+                result.deprecated_str,
+                result.locked_str,
+                result.attribute_scores,
+            )
+            if verdict == "abort":
+                aborted = True
+                self._scanning.clear()
+            elif verdict == "ok":
+                essence_quality = judge_essence_quality(
+                    result.stats, self._treasure_summary, self._scanned_stats_set
+                )
+                actions = plan_button_actions(
+                    essence_quality, result.locked_str, result.deprecated_str
+                )
+                if actions:
+                    # 操作执行后再记录
+                    deferred.append((result, actions))
+                else:
+                    record(result, [])
+
+        for cell in cells:
+            if not self._can_continue():
+                break
+
+            logger.info(f"正在扫描第 {cell.row + 1} 行第 {cell.col + 1} 列的基质...")
+
+            with tracer.span("cell", row=cell.row, col=cell.col):
+                settle = self._click_essence(cell.row, cell.col, retry=True)
+                if not settle.changed:
+                    logger.warning(
+                        f"第 {cell.row + 1} 行第 {cell.col + 1} 列的基质点击后详情面板没有变化，识别结果不写入记录。"
+                    )
+                # 截图缓冲区会在下一次截图时被覆盖，交给识别线程前需要复制
+                worker.tasks.put(
+                    EssenceTask(
+                        cell, settle.image.copy(), settle.fingerprint, settle.changed
+                    )
+                )
+            submitted += 1
+
+            # 处理已经完成的识别结果
+            while True:
+                try:
+                    result = worker.results.get_nowait()
+                except queue.Empty:
+                    break
+                handled += 1
+                handle(result)
+
+        # 等待本页剩余的识别结果
+        while handled < submitted:
+            handle(worker.results.get())
+            handled += 1
+
+        # 重新选中需要操作的基质，确认详情面板与识别时一致后再执行按钮操作
+        # 没有执行的操作不计入记录的状态
+        for result, actions in deferred:
+            applied_actions: list[ButtonAction] = []
+            if self._can_continue():
+                task = result.task
+                settle = self._click_essence(task.cell.row, task.cell.col, retry=True)
+                distance = fingerprint_distance(settle.fingerprint, task.fingerprint)
+                if distance > SETTLE_CHANGE_THRESHOLD:
+                    logger.warning(
+                        f"第 {task.cell.row + 1} 行第 {task.cell.col + 1} 列的基质与识别时不一致"
+                        f"（差异 {distance:.4f}），跳过操作。"
+                    )
+                else:
+                    self._apply_button_actions(actions)
+                    applied_actions = actions
+            record(result, applied_actions)
+
+        # 流水线模式下本页全部完成后才记录断点，中途中断时从本页开头继续
+        if self._scanning.is_set() and cells:
+            self._save_checkpoint((cells[-1].row, cells[-1].col))
 
     def run(self) -> None:
         logger.info("开始基质扫描线程...")
         self._scanning.set()
+        metrics.reset()
+        if self._trace:
+            tracer.start()
 
-        # 初始化宝藏摘要和去重集合
-        treasure_summary: dict[tuple[str, str, str], dict] = {}
-        scanned_stats_set: set[tuple[str, str, str]] = set()
-
-        # 初始化中止检测计数器
-        consecutive_failures = 0
-        consecutive_low_scores = 0
-        consecutive_duplicate_results = 0
-        last_recognized_stats: tuple[str | None, str | None, str | None] | None = None
-
+        worker: RecognitionWorker | None = None
         try:
-            window = get_support_window(self._supported_window_titles)
-            if window is None:
+            if not self._driver.activate():
                 logger.info("未找到终末地窗口，停止基质扫描。")
                 self._scanning.clear()
                 return
-            if window.isMinimized:
-                window.restore()
-                time.sleep(0.5)
-            if not window.isActive:
-                window.activate()
-                time.sleep(0.5)
-
-            check_scene_result = check_scene(window)
+
+            check_scene_result = check_scene(self._driver)
             if not check_scene_result:
                 self._scanning.clear()
                 return
 
+            self._panel_fingerprint = image_fingerprint(
+                self._driver.screenshot(AREA, copy=False)
+            )
+
+            if self._scan_mode == "pipelined":
+                logger.info("使用流水线扫描模式。")
+                worker = RecognitionWorker(self._text_recognizer, self._icon_recognizer)
+                worker.start()
+
             page = 0
-            last_essence_stats = None
+            new_rows: range | list[int] = range(len(essence_icon_y_list))
+            resume = ScanCheckpoint.load() if self._resume else None
+            if resume is not None:
+                if not self._fast_forward(resume):
+                    self._scanning.clear()
+                    return
+                page = resume.page - 1
+                new_rows = resume.new_rows
+
             while True:
                 page += 1
-                logger.info(f"开始扫描第 {page} 页...")
-
-                for i, j in np.ndindex(len(essence_icon_y_list), len(essence_icon_x_list)):
-                    window = get_active_support_window(self._supported_window_titles)
-                    if window is None:
-                        logger.info("终末地窗口不在前台，停止基质扫描。")
-                        self._scanning.clear()
-                        break
+                self._page = page
+                with tracer.span("page", page=page):
+                    logger.info(f"开始扫描第 {page} 页...")
 
-                    if not self._scanning.is_set():
-                        logger.info("基质扫描被中断。")
+                    if not self._can_continue():
                         break
 
-                    logger.info(f"正在扫描第 {i + 1} 行第 {j + 1} 列的基质...")
-
-                    # 点击基质图标位置
-                    relative_x = essence_icon_x_list[j]
-                    relative_y = essence_icon_y_list[i]
-                    click_on_window(window, relative_x, relative_y)
-
-                    # 等待短暂时间以确保界面更新
-                    time.sleep(0.3)
+                    # 截图一次网格，只点击有基质、本页新出现且可能需要操作的位置
+                    with tracer.span("capture", region="grid"):
+                        grid_image = self._driver.screenshot(BOTTOM_DETECTION_ROI)
+                    occupancy = analyze_page(grid_image)
+                    new_cells = [
+                        (i, j) for i, j in occupancy.occupied_cells() if i in new_rows
+                    ]
+
+                    self._page_new_rows = list(new_rows)
+                    self._page_signature = grid_signature(grid_image)
+                    if resume is not None and resume.page == page:
+                        # 跳过断点所在页中已经完成的位置
+                        new_cells = [
+                            (i, j) for i, j in new_cells if not resume.is_done(i, j)
+                        ]
+                        self._page_signature = resume.grid_signature
+                        self._save_checkpoint(resume.last_cell)
+                    else:
+                        self._save_checkpoint(None)
 
-                    # 识别基质信息
-                    stats, deprecated_str, locked_str, attribute_scores = recognize_essence(
-                        window, self._text_recognizer, self._icon_recognizer
+                    cells = self._plan_page(grid_image, new_cells)
+                    logger.debug(
+                        f"第 {page} 页有 {occupancy.occupied_count}/{occupancy.occupied.size} "
+                        f"个位置有基质，其中 {len(new_cells)} 个是新的，"
+                        f"{len(cells)} 个需要点击"
                     )
 
-                    # 检查按钮识别失败（中止检测）
-                    if deprecated_str is None or locked_str is None:
-                        consecutive_failures += 1
-                        logger.debug(
-                            f"按钮识别失败 ({consecutive_failures}/{MAX_CONSECUTIVE_FAILURES})"
-                        )
-                        if consecutive_failures >= MAX_CONSECUTIVE_FAILURES:
-                            logger.opt(colors=True).warning(
-                                f"<yellow>连续 {MAX_CONSECUTIVE_FAILURES} 次无法识别按钮状态，"
-                                f"可能未在基质界面。</>请按 '<green>N</>' 键打开贵重品库后切换到武器基质页面。"
-                            )
-                            self._scanning.clear()
-                            break
-                        continue
+                    if worker is not None:
+                        self._scan_page_pipelined(worker, cells)
                     else:
-                        # 按钮识别成功，重置失败计数器
-                        consecutive_failures = 0
-
-                    # 检查低分识别（中止检测）
-                    low_score_count = sum(1 for score in attribute_scores if score < LOW_SCORE_THRESHOLD)
-                    if low_score_count == 3:  # 所有三个属性都是低分
-                        consecutive_low_scores += 1
-                        logger.debug(
-                            f"低分识别 ({consecutive_low_scores}/{MAX_CONSECUTIVE_LOW_SCORES}), "
-                            f"分数: {[f'{s:.2f}' for s in attribute_scores]}"
-                        )
-                        if consecutive_low_scores >= MAX_CONSECUTIVE_LOW_SCORES:
-                            logger.opt(colors=True).warning(
-                                f"<yellow>连续 {MAX_CONSECUTIVE_LOW_SCORES} 次识别分数过低，"
-                                f"可能不在正确页面或识别异常。</>请检查游戏界面。"
-                            )
-                            self._scanning.clear()
-                            break
-                    else:
-                        # 至少有一个属性分数正常，重置低分计数器
-                        consecutive_low_scores = 0
-
-                    # 检查重复识别结果（检测点击空白位置）
-                    current_stats_tuple = (stats[0], stats[1], stats[2], deprecated_str, locked_str)
-                    if last_recognized_stats is not None:
-                        if current_stats_tuple == last_recognized_stats:
-                            consecutive_duplicate_results += 1
-                            logger.debug(
-                                f"识别结果重复 ({consecutive_duplicate_results}/{MAX_CONSECUTIVE_DUPLICATE_RESULTS})"
-                            )
-                            if consecutive_duplicate_results >= MAX_CONSECUTIVE_DUPLICATE_RESULTS:
-                                logger.opt(colors=True).warning(
-                                    f"<yellow>连续 {MAX_CONSECUTIVE_DUPLICATE_RESULTS} 次识别结果相同，"
-                                    f"可能已扫描完所有基质或点击了空白位置。</>"
-                                )
-                                self._scanning.clear()
-                                break
-                        else:
-                            # 识别结果不同，重置重复计数器
-                            consecutive_duplicate_results = 0
-
-                    last_recognized_stats = current_stats_tuple
-                    last_essence_stats = stats
-
-                    essence_quality = judge_essence_quality(stats, treasure_summary, scanned_stats_set)
-                    if locked_str == "未锁定" and (
-                        (essence_quality == "treasure" and config.treasure_action in "lock")
-                        or (essence_quality == "trash" and config.trash_action in "lock")
-                    ):
-                        click_on_window(window, *LOCK_BUTTON_POS)
-                        logger.success("给你自动锁上了，记得保管好哦！(*/ω＼*)")
-                    elif locked_str == "已锁定" and (
-                        (
-                            essence_quality == "treasure"
-                            and config.treasure_action
-                            in ["unlock", "unlock_and_undeprecate"]
-                        )
-                        or (
-                            essence_quality == "trash"
-                            and config.trash_action in ["unlock", "unlock_and_undeprecate"]
-                        )
-                    ):
-                        click_on_window(window, *LOCK_BUTTON_POS)
-                        logger.success("给你自动解锁了！ヾ(≧▽≦*)o")
-                    if deprecated_str == "未弃用" and (
-                        (
-                            essence_quality == "treasure"
-                            and config.treasure_action == "deprecate"
-                        )
-                        or (
-                            essence_quality == "trash"
-                            and config.trash_action == "deprecate"
-                        )
-                    ):
-                        click_on_window(window, *DEPRECATE_BUTTON_POS)
-                        logger.success("给你自动标记为弃用了！(￣︶￣)>")
-                    elif deprecated_str == "已弃用" and (
-                        (
-                            essence_quality == "treasure"
-                            and config.treasure_action
-                            in ["undeprecate", "unlock_and_undeprecate"]
-                        )
-                        or (
-                            essence_quality == "trash"
-                            and config.trash_action
-                            in ["undeprecate", "unlock_and_undeprecate"]
-                        )
-                    ):
-                        click_on_window(window, *DEPRECATE_BUTTON_POS)
-                        logger.success("给你自动取消弃用啦！(＾Ｕ＾)ノ~ＹＯ")
-
-                window = get_active_support_window(self._supported_window_titles)
-                if window is None:
-                    logger.info("终末地窗口不在前台，停止基质扫描。")
-                    self._scanning.clear()
-                    break
+                        self._scan_page_serial(cells)
 
-                if not self._scanning.is_set():
-                    logger.info("基质扫描被中断。")
-                    break
+                    # 本页存在空位，说明已经是最后一页
+                    if occupancy.is_partial:
+                        if self._scanning.is_set():
+                            logger.info("基质扫描完成。")
+                            ScanCheckpoint.clear()
+                        break
 
-                scroll_to_next_page_robust(window)
+                    if not self._can_continue():
+                        break
 
-                if is_at_bottom_robust(window):
-                    logger.info("基质扫描完成。")
-                    break
+                    offset = scroll_to_next_page(self._driver, self._settle_stats)
+                    if offset.rows == 0:
+                        # 多次滚动网格都没有变化，确认已经到底后才清除断点
+                        if self._scanning.is_set():
+                            logger.info("基质扫描完成。")
+                            ScanCheckpoint.clear()
+                        break
+                    new_rows = offset.new_rows(len(essence_icon_y_list))
         finally:
+            if worker is not None:
+                worker.stop()
+                worker.join()
+            self._inventory.flush()
+            self._driver.close()
             # 无论扫描如何结束，都输出总结报告
-            logger.opt(colors=True).info(format_summary_report(treasure_summary))
+            logger.opt(colors=True).info(
+                format_summary_report(self._treasure_summary, self._badge_skipped)
+            )
+            settle_report = self._settle_stats.format_report()
+            if settle_report:
+                logger.info(f"界面稳定等待统计:\n{settle_report}")
+            metrics_report = metrics.format_report()
+            if metrics_report:
+                logger.debug(f"各阶段耗时统计:\n{metrics_report}")
+            if self._trace:
+                tracer.stop()
+                try:
+                    trace_path = tracer.export(new_trace_path())
+                    logger.info(f"扫描追踪已保存到 {trace_path}")
+                except Exception as e:
+                    logger.warning(f"保存扫描追踪失败：{e}")
+            for name, recognizer in [
+                ("属性", self._text_recognizer),
+                ("按钮", self._icon_recognizer),
+            ]:
+                cache_info = recognizer.cache_info()
+                if cache_info is not None:
+                    logger.debug(f"{name}识别缓存: {cache_info}")
 
     def stop(self) -> None:
         logger.info("停止基质扫描线程...")
@@ -0,0 +1,481 @@
+"""识别器的准确率与延迟评估。
+
+对一组已标注的 ROI 截图运行识别器，在同一次运行中报告：
+
+- 混淆矩阵（真实标签 -> 识别结果，识别为未知记为 `<unknown>`）
+- 最高分与次高分之间差距（margin）的分布，以及正确/错误识别的分数范围
+- 每个 ROI 的识别耗时
+
+用于调整 `HIGH_THRESH`、`LOW_THRESH` 等阈值，以及确认识别器的性能优化没有降低准确率：
+
+    eer evaluate --output baseline.json
+    eer evaluate --engine loop --compare baseline.json
+
+标注集目录中的 manifest.json 列出每个 ROI 截图所属的槽位、真实标签和来源，
+标签为 null 表示该截图应被识别为未知。来源为 synthetic（从模拟器渲染的画面裁剪）
+或 captured（从游戏中截取的画面裁剪），结果中按来源分别统计准确率；
+合成样本与识别模板同源，调整阈值时应以真实截取的样本为准。
+"""
+
+from __future__ import annotations
+
+import argparse
+import functools
+import importlib.resources
+import json
+import time
+from collections import Counter, defaultdict
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, get_args
+
+import numpy as np
+
+from endfield_essence_recognizer.bench import BenchResult
+from endfield_essence_recognizer.image import load_image
+from endfield_essence_recognizer.log import logger
+
+if TYPE_CHECKING:
+    from endfield_essence_recognizer.image import Scope
+    from endfield_essence_recognizer.recognizer import MatchEngine, Recognizer
+
+corpus_dir = Path(
+    str(importlib.resources.files("endfield_essence_recognizer") / "fixtures/corpus")
+)
+"""ROI 标注集目录（由 scripts/generate_eval_corpus.py 生成，不打包进发布版本）"""
+CORPUS_FORMAT_VERSION = 1
+"""ROI 标注集清单的格式版本"""
+EVALUATION_RESULT_FORMAT_VERSION = 1
+"""评估结果的格式版本，结果格式变化时递增"""
+DEFAULT_EVALUATION_REPEAT = 5
+"""每个 ROI 默认的计时次数"""
+UNKNOWN_LABEL = "<unknown>"
+"""混淆矩阵中表示识别为未知（或标注为未知）的标签"""
+MARGIN_BUCKETS = [0.0, 0.02, 0.05, 0.1, 0.2, 0.3, 0.5]
+"""margin 分布的分桶下界"""
+
+
+def evaluation_slots() -> dict[str, tuple[str, Scope, list[str]]]:
+    """
+    标注集中的槽位，及其使用的识别器（"text" 或 "icon"）、截图区域和可能出现的标签。
+
+    与扫描时 `recognize_essence_in_frame` 的识别方式一致。
+    """
+    from endfield_essence_recognizer.essence_scanner import (
+        DEPRECATE_BUTTON_LABELS,
+        DEPRECATE_BUTTON_ROI,
+        LOCK_BUTTON_LABELS,
+        LOCK_BUTTON_ROI,
+        STATS_SLOTS,
+    )
+
+    slots: dict[str, tuple[str, Scope, list[str]]] = {
+        f"stats_{k}": ("text", roi, labels)
+        for k, (roi, labels) in enumerate(STATS_SLOTS)
+    }
+    slots["deprecate_button"] = ("icon", DEPRECATE_BUTTON_ROI, DEPRECATE_BUTTON_LABELS)
+    slots["lock_button"] = ("icon", LOCK_BUTTON_ROI, LOCK_BUTTON_LABELS)
+    return slots
+
+
+@dataclass
+class CorpusSample:
+    file: str
+    """ROI 截图相对于标注集目录的路径"""
+    slot: str
+    """所属槽位（见 `evaluation_slots`）"""
+    label: str | None
+    """真实标签，为 None 时应识别为未知"""
+    image: np.ndarray = field(repr=False)
+    """ROI 截图"""
+    source: str = "synthetic"
+    """样本来源：synthetic 为模拟器渲染，captured 为游戏中截取"""
+
+
+def load_corpus(directory: Path = corpus_dir) -> list[CorpusSample]:
+    """读取 ROI 标注集。"""
+    manifest = json.loads((directory / "manifest.json").read_text(encoding="utf-8"))
+    if manifest.get("version") != CORPUS_FORMAT_VERSION:
+        raise ValueError(f"Unsupported corpus version: {manifest.get('version')}")
+    return [
+        CorpusSample(
+            file=entry["file"],
+            slot=entry["slot"],
+            label=entry["label"],
+            image=load_image(directory / entry["file"]),
+            source=entry.get("source", "synthetic"),
+        )
+        for entry in manifest["samples"]
+    ]
+
+
+@dataclass
+class SampleOutcome:
+    file: str
+    slot: str
+    source: str
+    """样本来源"""
+    label: str | None
+    """真实标签"""
+    predicted: str | None
+    """识别结果"""
+    score: float
+    """识别分数"""
+    margin: float | None
+    """最高分与次高分之差，候选标签只有一个时为 None"""
+    runner_up: str | None
+    """次高分的标签"""
+
+    @property
+    def correct(self) -> bool:
+        return self.predicted == self.label
+
+
+def margin_histogram(margins: list[float]) -> dict[str, int]:
+    """按 `MARGIN_BUCKETS` 统计 margin 的分布，键为 "下界-上界"。"""
+    bounds = MARGIN_BUCKETS + [float("inf")]
+    histogram = {}
+    for low, high in zip(bounds, bounds[1:]):
+        key = f"{low:g}-{high:g}" if high != float("inf") else f"{low:g}+"
+        histogram[key] = sum(1 for m in margins if low <= m < high)
+    # 负 margin 不会出现（最高分总是不低于次高分），数值误差时归入第一个桶
+    histogram[next(iter(histogram))] += sum(1 for m in margins if m < bounds[0])
+    return histogram
+
+
+def summarize_outcomes(outcomes: list[SampleOutcome]) -> dict[str, Any]:
+    """统计一组识别结果的准确率（总体和按来源）、混淆矩阵和 margin 分布。"""
+    confusion: defaultdict[str, Counter[str]] = defaultdict(Counter)
+    by_source: defaultdict[str, list[SampleOutcome]] = defaultdict(list)
+    for outcome in outcomes:
+        by_source[outcome.source].append(outcome)
+        confusion[outcome.label or UNKNOWN_LABEL][
+            outcome.predicted or UNKNOWN_LABEL
+        ] += 1
+
+    correct = [o for o in outcomes if o.correct]
+    wrong = [o for o in outcomes if not o.correct]
+    margins = [o.margin for o in outcomes if o.margin is not None]
+    # 分数和 margin 只统计识别出标签的正确结果，正确拒识的负样本不计入
+    recognized = [o for o in correct if o.label is not None]
+    correct_margins = [o.margin for o in recognized if o.margin is not None]
+    return {
+        "samples": len(outcomes),
+        "negatives": sum(1 for o in outcomes if o.label is None),
+        "correct": len(correct),
+        "accuracy": round(len(correct) / len(outcomes), 4) if outcomes else 0.0,
+        # 有标签但识别为未知
+        "rejected": sum(
+            1 for o in wrong if o.label is not None and o.predicted is None
+        ),
+        # 应为未知但识别出了标签，或识别成了其他标签
+        "misrecognized": sum(1 for o in wrong if o.predicted is not None),
+        "min_correct_score": round(min((o.score for o in recognized), default=0.0), 4),
+        "max_wrong_score": round(
+            max((o.score for o in wrong if o.predicted is not None), default=0.0), 4
+        ),
+        "margin": {
+            "min": round(min(correct_margins, default=0.0), 4),
+            "p5": round(float(np.percentile(correct_margins, 5)), 4)
+            if correct_margins
+            else 0.0,
+            "p50": round(float(np.percentile(correct_margins, 50)), 4)
+            if correct_margins
+            else 0.0,
+            "histogram": margin_histogram(margins),
+        },
+        "confusion": {
+            label: dict(counter) for label, counter in sorted(confusion.items())
+        },
+        "sources": {
+            source: {
+                "samples": len(group),
+                "correct": sum(1 for o in group if o.correct),
+                "accuracy": round(sum(1 for o in group if o.correct) / len(group), 4),
+            }
+            for source, group in sorted(by_source.items())
+        },
+        "errors": [asdict(o) for o in wrong],
+    }
+
+
+def evaluate_recognizers(
+    samples: list[CorpusSample],
+    recognizers: dict[str, Recognizer],
+    repeat: int = DEFAULT_EVALUATION_REPEAT,
+) -> dict[str, Any]:
+    """
+    用给定的识别器评估标注集。
+
+    识别结果和计时都来自 `Recognizer.recognize_roi`（包含阈值判断），
+    按钮与扫描时一致使用 `recognize_button`。margin 由 `Recognizer.rank_roi` 单独计算，
+    不计入耗时。
+
+    Args:
+        samples: ROI 标注集
+        recognizers: 识别器类型（"text" 或 "icon"）到识别器的映射
+        repeat: 每个 ROI 的计时次数
+    """
+    from endfield_essence_recognizer.essence_scanner import (
+        BUTTON_CANDIDATE_LABELS,
+        recognize_button,
+    )
+
+    slots = evaluation_slots()
+    outcomes: defaultdict[str, list[SampleOutcome]] = defaultdict(list)
+    timings: defaultdict[str, list[float]] = defaultdict(list)
+
+    for sample in samples:
+        kind, _roi, labels = slots[sample.slot]
+        recognizer = recognizers[kind]
+        image = np.ascontiguousarray(sample.image)
+        if kind == "icon":
+            recognize = functools.partial(recognize_button, recognizer)
+            candidates = BUTTON_CANDIDATE_LABELS
+        else:
+            recognize = recognizer.recognize_roi
+            candidates = labels
+
+        predicted, score = recognize(image, labels)  # 预热
+        for _ in range(repeat):
+            start = time.perf_counter()
+            recognize(image, labels)
+            timings[kind].append(time.perf_counter() - start)
+
+        ranked = recognizer.rank_roi(image, candidates)
+        outcomes[kind].append(
+            SampleOutcome(
+                file=sample.file,
+                slot=sample.slot,
+                source=sample.source,
+                label=sample.label,
+                predicted=predicted,
+                score=round(score, 4),
+                margin=round(ranked.margin, 4) if ranked.margin is not None else None,
+                runner_up=ranked.candidates[1][0]
+                if len(ranked.candidates) > 1
+                else None,
+            )
+        )
+
+    results = {}
+    for kind, kind_outcomes in outcomes.items():
+        summary = summarize_outcomes(kind_outcomes)
+        summary["latency"] = asdict(BenchResult.from_samples(timings[kind]))
+        results[kind] = summary
+    return results
+
+
+def create_evaluation_recognizers(
+    engine: MatchEngine | None = None,
+    high_thresh: float | None = None,
+    low_thresh: float | None = None,
+    cache: bool = False,
+    track_alignment: bool | None = None,
+) -> dict[str, Recognizer]:
+    """
+    构造待评估的识别器，未指定的参数使用 `create_recognizers` 的默认配置。
+
+    默认关闭识别缓存，避免重复计时命中缓存。
+    """
+    from endfield_essence_recognizer import create_recognizers
+
+    text_recognizer, icon_recognizer = create_recognizers(cache=cache)
+    for recognizer in (text_recognizer, icon_recognizer):
+        if engine is not None:
+            recognizer.engine = engine
+        if high_thresh is not None:
+            recognizer.high_thresh = high_thresh
+        if low_thresh is not None:
+            recognizer.low_thresh = low_thresh
+        if track_alignment is not None:
+            recognizer.track_alignment = track_alignment
+        recognizer.load_templates()
+    return {"text": text_recognizer, "icon": icon_recognizer}
+
+
+def describe_recognizer(recognizer: Recognizer) -> dict[str, Any]:
+    """识别器的配置，记录在评估结果中。"""
+    return {
+        "engine": recognizer.engine,
+        "high_thresh": recognizer.high_thresh,
+        "low_thresh": recognizer.low_thresh,
+        "track_alignment": recognizer.track_alignment,
+        "cache": recognizer.cache_info() is not None,
+    }
+
+
+def run_evaluation(
+    recognizers: dict[str, Recognizer],
+    directory: Path = corpus_dir,
+    repeat: int = DEFAULT_EVALUATION_REPEAT,
+) -> dict[str, Any]:
+    """
+    运行评估，返回可序列化为 JSON 的结果。
+
+    评估期间关闭本包的日志输出，避免低分警告和日志写入影响计时。
+    """
+    samples = load_corpus(directory)
+    logger.disable("endfield_essence_recognizer")
+    try:
+        results = evaluate_recognizers(samples, recognizers, repeat)
+    finally:
+        logger.enable("endfield_essence_recognizer")
+    return {
+        "version": EVALUATION_RESULT_FORMAT_VERSION,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "corpus": str(directory),
+        "samples": len(samples),
+        "repeat": repeat,
+        "recognizers": {
+            kind: describe_recognizer(recognizer)
+            for kind, recognizer in recognizers.items()
+        },
+        "results": results,
+    }
+
+
+def format_evaluation(report: dict[str, Any]) -> str:
+    """评估结果的摘要。"""
+    lines = []
+    for kind, result in report["results"].items():
+        config = report["recognizers"][kind]
+        latency = result["latency"]
+        sources = "，".join(
+            f"{source} {group['accuracy']:.2%} ({group['correct']}/{group['samples']})"
+            for source, group in result.get("sources", {}).items()
+        )
+        lines += [
+            (
+                f"[{kind}] engine={config['engine']} high={config['high_thresh']} "
+                f"low={config['low_thresh']} align={config.get('track_alignment')}"
+            ),
+            (
+                f"  准确率: {result['accuracy']:.2%} ({result['correct']}/{result['samples']})，"
+                f"负样本 {result.get('negatives', 0)}，"
+                f"拒识 {result['rejected']}，误识 {result['misrecognized']}"
+            ),
+            f"  按来源: {sources}",
+            (
+                f"  分数: 正确识别最低 {result['min_correct_score']:.3f}，"
+                f"错误识别最高 {result['max_wrong_score']:.3f}"
+            ),
+            (
+                f"  margin: 最小 {result['margin']['min']:.3f}，P5 {result['margin']['p5']:.3f}，"
+                f"P50 {result['margin']['p50']:.3f}，分布 {result['margin']['histogram']}"
+            ),
+            (
+                f"  耗时: P50 {latency['p50_ms']:.3f}ms，P90 {latency['p90_ms']:.3f}ms，"
+                f"平均 {latency['mean_ms']:.3f}ms/ROI"
+            ),
+        ]
+        lines += [
+            f"  - {e['file']}: {e['label'] or UNKNOWN_LABEL} -> "
+            f"{e['predicted'] or UNKNOWN_LABEL} (分数 {e['score']:.3f})"
+            for e in result["errors"]
+        ]
+    return "\n".join(lines)
+
+
+def compare_evaluations(
+    current: dict[str, Any], baseline: dict[str, Any]
+) -> tuple[str, bool]:
+    """
+    对比两次评估的准确率和耗时。
+
+    Returns:
+        (对比摘要, 是否没有降低准确率)。基线中识别正确的 ROI 在当前结果中识别错误也视为降低。
+    """
+    lines = [
+        (
+            f"{'识别器':<8} {'基线准确率':>10} {'当前准确率':>10} "
+            f"{'基线 P50':>12} {'当前 P50':>12} {'比值':>8}"
+        )
+    ]
+    ok = True
+    for kind, result in current["results"].items():
+        base = baseline.get("results", {}).get(kind)
+        if base is None:
+            lines.append(f"{kind:<8} {'-':>10} {result['accuracy']:>10.2%}")
+            continue
+        base_p50 = base["latency"]["p50_ms"]
+        p50 = result["latency"]["p50_ms"]
+        ratio = p50 / base_p50 if base_p50 > 0 else float("inf")
+        lines.append(
+            f"{kind:<8} {base['accuracy']:>10.2%} {result['accuracy']:>10.2%} "
+            f"{base_p50:>10.3f}ms {p50:>10.3f}ms {ratio:>7.2f}x"
+        )
+        base_errors = {e["file"] for e in base["errors"]}
+        new_errors = [e for e in result["errors"] if e["file"] not in base_errors]
+        if result["accuracy"] < base["accuracy"] or new_errors:
+            ok = False
+        lines += [f"  新增错误: {e['file']}" for e in new_errors]
+    return "\n".join(lines), ok
+
+
+def main(argv: list[str]) -> None:
+    from endfield_essence_recognizer.recognizer import MatchEngine
+
+    parser = argparse.ArgumentParser(
+        prog="eer evaluate",
+        description="在 ROI 标注集上评估识别器的准确率、分数差距和耗时",
+    )
+    parser.add_argument(
+        "--corpus", type=Path, default=corpus_dir, help="ROI 标注集目录"
+    )
+    parser.add_argument(
+        "--engine",
+        choices=get_args(MatchEngine.__value__),
+        default=None,
+        help="模板匹配引擎，默认使用识别器的默认配置",
+    )
+    parser.add_argument("--high-thresh", type=float, default=None, help="高分数阈值")
+    parser.add_argument("--low-thresh", type=float, default=None, help="低分数阈值")
+    parser.add_argument(
+        "--cache", action="store_true", help="启用识别结果缓存（计时会命中缓存）"
+    )
+    parser.add_argument(
+        "--track-alignment",
+        choices=["on", "off"],
+        default=None,
+        help="是否启用对齐跟踪，默认使用识别器的默认配置",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=DEFAULT_EVALUATION_REPEAT,
+        help="每个 ROI 的计时次数",
+    )
+    parser.add_argument(
+        "--output", type=Path, default=None, help="结果 JSON 的保存路径"
+    )
+    parser.add_argument(
+        "--compare",
+        type=Path,
+        default=None,
+        help="与之对比的基线结果 JSON，准确率降低时以非零状态退出",
+    )
+    args = parser.parse_args(argv)
+
+    recognizers = create_evaluation_recognizers(
+        args.engine,
+        args.high_thresh,
+        args.low_thresh,
+        args.cache,
+        None if args.track_alignment is None else args.track_alignment == "on",
+    )
+    report = run_evaluation(recognizers, args.corpus, args.repeat)
+    if args.output is not None:
+        args.output.write_text(
+            json.dumps(report, ensure_ascii=False, indent=2) + "\n", encoding="utf-8"
+        )
+        logger.info(f"评估结果已保存到 {args.output}")
+    logger.info(f"评估结果:\n{format_evaluation(report)}")
+
+    if args.compare is not None:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        comparison, ok = compare_evaluations(report, baseline)
+        logger.info(f"与基线对比:\n{comparison}")
+        if not ok:
+            logger.error("准确率低于基线")
+            raise SystemExit(1)
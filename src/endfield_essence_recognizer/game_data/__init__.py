@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import importlib.resources
 import json
+from functools import cache
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -48,8 +49,10 @@ def get_translation(text_data: TranslationKey, language: str) -> str:
     text_content = text_data["text"]
 
     # 查找翻译表中的文本
-    if language in i18n_text_tables and text_id in i18n_text_tables[language]:
-        return i18n_text_tables[language][text_id]
+    if language in used_i18n_languages:
+        i18n_text_table = get_i18n_text_table(language)
+        if text_id in i18n_text_table:
+            return i18n_text_table[text_id]
 
     # 如果找不到翻译或翻译为空，使用原始文本
     return text_content
@@ -61,16 +64,52 @@ table_cfg_dir = CBT3_dir / "endfielddata/TableCfg"
 i18n_languages = ["CN", "EN", "JP", "KR", "MX", "RU", "TC"]
 used_i18n_languages = ["CN"]
 
-gem_table: GemTable = load_table_cfg("GemTable.json")
-gem_tag_id_table: GemTagIdTable = load_table_cfg("GemTagIdTable.json")
-item_table: ItemTable = load_table_cfg("ItemTable.json")
-rarity_color_table: RarityColorTable = load_table_cfg("RarityColorTable.json")
-skill_patch_table: SkillPatchTable = load_table_cfg("SkillPatchTable.json")
-weapon_basic_table: WeaponBasicTable = load_table_cfg("WeaponBasicTable.json")
-wiki_entry_data_table: WikiEntryDataTable = load_table_cfg("WikiEntryDataTable.json")
-wiki_entry_table: WikiEntryTable = load_table_cfg("WikiEntryTable.json")
-wiki_group_table: WikiGroupTable = load_table_cfg("WikiGroupTable.json")
-# 读取所有语言的翻译表
-i18n_text_tables: dict[str, I18nTextTable] = {}
-for language in used_i18n_languages:
-    i18n_text_tables[language] = load_table_cfg(get_i18n_text_table_filename(language))
+_lazy_table_filenames: dict[str, str] = {
+    "gem_table": "GemTable.json",
+    "gem_tag_id_table": "GemTagIdTable.json",
+    "item_table": "ItemTable.json",
+    "rarity_color_table": "RarityColorTable.json",
+    "skill_patch_table": "SkillPatchTable.json",
+    "weapon_basic_table": "WeaponBasicTable.json",
+    "wiki_entry_data_table": "WikiEntryDataTable.json",
+    "wiki_entry_table": "WikiEntryTable.json",
+    "wiki_group_table": "WikiGroupTable.json",
+}
+"""按需加载的数据表：模块属性名到文件名的映射"""
+
+
+@cache
+def get_i18n_text_table(language: str) -> I18nTextTable:
+    """获取（并缓存）指定语言的翻译表"""
+    return load_table_cfg(get_i18n_text_table_filename(language))
+
+
+def __getattr__(name: str) -> Any:
+    """
+    按需加载数据表。
+
+    数据表只在第一次访问时解析，识别和判定只需要派生快照（见 `snapshot` 模块），
+    正常运行时不会加载完整的数据表。
+    """
+    if name in _lazy_table_filenames:
+        table = load_table_cfg(_lazy_table_filenames[name])
+        globals()[name] = table
+        return table
+    if name == "i18n_text_tables":
+        return {
+            language: get_i18n_text_table(language) for language in used_i18n_languages
+        }
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+if TYPE_CHECKING:
+    gem_table: GemTable
+    gem_tag_id_table: GemTagIdTable
+    item_table: ItemTable
+    rarity_color_table: RarityColorTable
+    skill_patch_table: SkillPatchTable
+    weapon_basic_table: WeaponBasicTable
+    wiki_entry_data_table: WikiEntryDataTable
+    wiki_entry_table: WikiEntryTable
+    wiki_group_table: WikiGroupTable
+    i18n_text_tables: dict[str, I18nTextTable]
@@ -1,8 +1,8 @@
-from endfield_essence_recognizer.game_data import get_translation, item_table
+from endfield_essence_recognizer import game_data
 
 
 def get_item_name(item_id: str, language: str) -> str:
-    item = item_table.get(item_id)
+    item = game_data.item_table.get(item_id)
     if item is None:
         return item_id
-    return get_translation(item["name"], language)
+    return game_data.get_translation(item["name"], language)
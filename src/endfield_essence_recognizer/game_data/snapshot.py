@@ -0,0 +1,201 @@
+"""派生的游戏数据快照。
+
+识别、判定和界面只用到数据表中很少的一部分：基质词条列表、词条名称，
+以及每把武器的名称、稀有度、类型和对应的基质词条。
+这些字段从完整数据表中派生一次后保存为一个小的 JSON 快照，
+之后启动时直接读取快照，不再解析完整的数据表。
+
+快照以源数据表内容的哈希为键，数据表更新后自动重新生成。
+完整的翻译表很大，读取并计算哈希本身就很耗时，因此启动时先比较由每个数据表的大小和修改时间
+计算的源文件键，不一致时才读取数据表内容计算哈希。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from functools import cache
+from pathlib import Path
+from typing import TYPE_CHECKING, TypedDict
+
+from endfield_essence_recognizer.game_data import (
+    get_i18n_text_table_filename,
+    table_cfg_dir,
+)
+from endfield_essence_recognizer.log import logger
+from endfield_essence_recognizer.path import CACHE_DIR
+
+if TYPE_CHECKING:
+    from endfield_essence_recognizer.game_data.models import TranslationKey
+    from endfield_essence_recognizer.game_data.weapon import WeaponStats
+
+SNAPSHOT_FORMAT_VERSION = 2
+"""快照格式版本"""
+SNAPSHOT_LANGUAGE = "CN"
+"""快照中名称使用的语言"""
+SNAPSHOT_SOURCE_TABLES = [
+    "GemTable.json",
+    "GemTagIdTable.json",
+    "ItemTable.json",
+    "SkillPatchTable.json",
+    "WeaponBasicTable.json",
+    "WikiEntryDataTable.json",
+    "WikiEntryTable.json",
+    "WikiGroupTable.json",
+    get_i18n_text_table_filename(SNAPSHOT_LANGUAGE),
+]
+"""派生快照所依赖的数据表"""
+snapshot_path = CACHE_DIR / "game_data_snapshot.json"
+"""快照文件路径"""
+
+
+class WeaponInfo(TypedDict):
+    name: str
+    """武器名称"""
+    rarity: int
+    """稀有度"""
+    weapon_type: str
+    """武器类型名称"""
+    stats: WeaponStats
+    """武器对应的基质词条"""
+
+
+class GameDataSnapshot(TypedDict):
+    version: int
+    """快照格式版本"""
+    source_hash: str
+    """源数据表内容的哈希"""
+    source_key: str
+    """源数据表大小和修改时间的哈希"""
+    attribute_stats: list[str]
+    """所有基础属性词条"""
+    secondary_stats: list[str]
+    """所有附加属性词条"""
+    skill_stats: list[str]
+    """所有技能属性词条"""
+    gem_tag_names: dict[str, str]
+    """词条名称"""
+    weapons: dict[str, WeaponInfo]
+    """武器信息"""
+    weapon_type_translation_keys: dict[str, TranslationKey]
+    """每把武器的武器类型翻译键"""
+
+
+def compute_source_key() -> str:
+    """由源数据表的大小和修改时间计算源文件键，不读取文件内容。"""
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(f"v{SNAPSHOT_FORMAT_VERSION}\0{SNAPSHOT_LANGUAGE}\0".encode())
+    for filename in SNAPSHOT_SOURCE_TABLES:
+        stat = Path(str(table_cfg_dir / filename)).stat()
+        digest.update(f"{filename}\0{stat.st_size}\0{stat.st_mtime_ns}\0".encode())
+    return digest.hexdigest()
+
+
+def compute_source_hash() -> str:
+    """计算源数据表内容的哈希。"""
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(f"v{SNAPSHOT_FORMAT_VERSION}\0{SNAPSHOT_LANGUAGE}\0".encode())
+    for filename in SNAPSHOT_SOURCE_TABLES:
+        content = (table_cfg_dir / filename).read_bytes()
+        digest.update(f"{filename}\0{len(content)}\0".encode())
+        digest.update(content)
+    return digest.hexdigest()
+
+
+def build_snapshot(source_hash: str, source_key: str) -> GameDataSnapshot:
+    """从完整数据表派生快照。"""
+    from endfield_essence_recognizer.game_data import (
+        gem_table,
+        get_translation,
+        weapon_basic_table,
+    )
+    from endfield_essence_recognizer.game_data.item import get_item_name
+    from endfield_essence_recognizer.game_data.weapon import (
+        get_stats_for_weapon,
+        get_weapon_type_translation_keys,
+    )
+
+    weapon_type_translation_keys = get_weapon_type_translation_keys()
+    return {
+        "version": SNAPSHOT_FORMAT_VERSION,
+        "source_hash": source_hash,
+        "source_key": source_key,
+        "attribute_stats": [
+            gem["gemTermId"] for gem in gem_table.values() if gem.get("termType") == 0
+        ],
+        "secondary_stats": [
+            gem["gemTermId"] for gem in gem_table.values() if gem.get("termType") == 1
+        ],
+        "skill_stats": [
+            gem["gemTermId"] for gem in gem_table.values() if gem.get("termType") == 2
+        ],
+        "gem_tag_names": {
+            gem_term_id: get_translation(gem["tagName"], SNAPSHOT_LANGUAGE)
+            for gem_term_id, gem in gem_table.items()
+        },
+        "weapons": {
+            weapon_id: {
+                "name": get_item_name(weapon_id, SNAPSHOT_LANGUAGE),
+                "rarity": weapon_basic["rarity"],
+                "weapon_type": get_translation(
+                    weapon_type_translation_keys[weapon_id], SNAPSHOT_LANGUAGE
+                ),
+                "stats": get_stats_for_weapon(weapon_id),
+            }
+            for weapon_id, weapon_basic in weapon_basic_table.items()
+        },
+        "weapon_type_translation_keys": weapon_type_translation_keys,
+    }
+
+
+def load_snapshot() -> GameDataSnapshot | None:
+    """读取快照文件，文件不存在、无法解析或格式版本不一致时返回 None。"""
+    if not snapshot_path.is_file():
+        return None
+    try:
+        snapshot = json.loads(snapshot_path.read_text(encoding="utf-8"))
+    except Exception as e:
+        logger.warning(f"读取游戏数据快照失败 {snapshot_path}: {e}")
+        return None
+    if snapshot.get("version") != SNAPSHOT_FORMAT_VERSION:
+        return None
+    return snapshot
+
+
+def save_snapshot(snapshot: GameDataSnapshot) -> None:
+    """保存快照文件。先写入临时文件再替换，避免留下不完整的文件。"""
+    snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = snapshot_path.with_suffix(".json.tmp")
+    tmp_path.write_text(
+        json.dumps(snapshot, ensure_ascii=False, separators=(",", ":")),
+        encoding="utf-8",
+    )
+    os.replace(tmp_path, snapshot_path)
+
+
+@cache
+def get_snapshot() -> GameDataSnapshot:
+    """获取游戏数据快照，快照缺失或过期时从完整数据表重新生成。"""
+    source_key = compute_source_key()
+    snapshot = load_snapshot()
+    if snapshot is not None and snapshot["source_key"] == source_key:
+        return snapshot
+
+    # 数据表的元数据变化时才读取内容，内容未变则只更新源文件键
+    source_hash = compute_source_hash()
+    if snapshot is not None and snapshot["source_hash"] == source_hash:
+        snapshot["source_key"] = source_key
+        try:
+            save_snapshot(snapshot)
+        except Exception as e:
+            logger.warning(f"保存游戏数据快照失败: {e}")
+        return snapshot
+
+    logger.info("正在生成游戏数据快照...")
+    snapshot = build_snapshot(source_hash, source_key)
+    try:
+        save_snapshot(snapshot)
+    except Exception as e:
+        logger.warning(f"保存游戏数据快照失败: {e}")
+    return snapshot
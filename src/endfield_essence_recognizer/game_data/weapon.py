@@ -1,16 +1,16 @@
-from typing import TypedDict
-
-from endfield_essence_recognizer.game_data import (
-    gem_table,
-    gem_tag_id_table,
-    get_translation,
-    skill_patch_table,
-    weapon_basic_table,
-    wiki_entry_data_table,
-    wiki_entry_table,
-    wiki_group_table,
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, TypedDict
+
+from endfield_essence_recognizer import game_data
+from endfield_essence_recognizer.game_data.snapshot import (
+    SNAPSHOT_LANGUAGE,
+    get_snapshot,
 )
-from endfield_essence_recognizer.game_data.models import TranslationKey
+
+if TYPE_CHECKING:
+    from endfield_essence_recognizer.game_data.models import TranslationKey
+    from endfield_essence_recognizer.game_data.snapshot import WeaponInfo
 
 
 class WeaponStats(TypedDict):
@@ -24,15 +24,17 @@ class WeaponStats(TypedDict):
 
 def get_gem_tag_name(gem_term_id: str, language: str) -> str:
     """Get the localized name for a gem tag."""
-    gem = gem_table.get(gem_term_id)
+    if language == SNAPSHOT_LANGUAGE:
+        return get_snapshot()["gem_tag_names"].get(gem_term_id, gem_term_id)
+    gem = game_data.gem_table.get(gem_term_id)
     if gem is None:
         return gem_term_id
-    return get_translation(gem["tagName"], language)
+    return game_data.get_translation(gem["tagName"], language)
 
 
 def get_stats_for_weapon(weapon_id: str) -> WeaponStats:
     """Get essence stats for a specific weapon."""
-    weapon = weapon_basic_table[weapon_id]
+    weapon = game_data.weapon_basic_table[weapon_id]
 
     result: WeaponStats = {
         "attribute": None,
@@ -41,11 +43,11 @@ def get_stats_for_weapon(weapon_id: str) -> WeaponStats:
     }
 
     for weapon_skill in weapon["weaponSkillList"]:
-        skill_patch = skill_patch_table[weapon_skill]
+        skill_patch = game_data.skill_patch_table[weapon_skill]
         skill_patch_data = skill_patch["SkillPatchDataBundle"]
         tag_id = skill_patch_data[0]["tagId"]
-        gem_stat = gem_tag_id_table[tag_id]
-        gem = gem_table[gem_stat]
+        gem_stat = game_data.gem_tag_id_table[tag_id]
+        gem = game_data.gem_table[gem_stat]
         term_type = gem["termType"]
         gem_term_id = gem["gemTermId"]
 
@@ -59,25 +61,45 @@ def get_stats_for_weapon(weapon_id: str) -> WeaponStats:
     return result
 
 
-all_attribute_stats = [
-    gem["gemTermId"] for gem in gem_table.values() if gem.get("termType") == 0
-]
-all_secondary_stats = [
-    gem["gemTermId"] for gem in gem_table.values() if gem.get("termType") == 1
-]
-all_skill_stats = [
-    gem["gemTermId"] for gem in gem_table.values() if gem.get("termType") == 2
-]
+def get_weapon_type_translation_keys() -> dict[str, TranslationKey]:
+    """Get the weapon type translation key for each weapon."""
+    result: dict[str, TranslationKey] = {}
+    for wiki_group in game_data.wiki_group_table["wiki_type_weapon"]["list"]:
+        for wiki_entry_id in game_data.wiki_entry_table[wiki_group["groupId"]]["list"]:
+            wiki_entry_data = game_data.wiki_entry_data_table[wiki_entry_id]
+            result[wiki_entry_data["refItemId"]] = wiki_group["groupName"]
+    return result
+
 
-weapon_stats_dict = {
-    weapon_id: get_stats_for_weapon(weapon_id)
-    for weapon_id in weapon_basic_table.keys()
+_lazy_attributes = {
+    "all_attribute_stats": lambda: get_snapshot()["attribute_stats"],
+    "all_secondary_stats": lambda: get_snapshot()["secondary_stats"],
+    "all_skill_stats": lambda: get_snapshot()["skill_stats"],
+    "weapon_info_dict": lambda: get_snapshot()["weapons"],
+    "weapon_stats_dict": lambda: {
+        weapon_id: weapon["stats"]
+        for weapon_id, weapon in get_snapshot()["weapons"].items()
+    },
+    "weapon_type_int_to_translation_key": lambda: get_snapshot()[
+        "weapon_type_translation_keys"
+    ],
 }
+"""按需计算的模块属性"""
+
+
+def __getattr__(name: str) -> Any:
+    """按需计算模块属性：词条列表和武器信息来自派生快照，只在第一次访问时计算。"""
+    if name in _lazy_attributes:
+        value = _lazy_attributes[name]()
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
-weapon_type_int_to_translation_key: dict[str, TranslationKey] = {}
-for wiki_group in wiki_group_table["wiki_type_weapon"]["list"]:
-    for wiki_entry_id in wiki_entry_table[wiki_group["groupId"]]["list"]:
-        wiki_entry_data = wiki_entry_data_table[wiki_entry_id]
-        weapon_type_int_to_translation_key[wiki_entry_data["refItemId"]] = wiki_group[
-            "groupName"
-        ]
+if TYPE_CHECKING:
+    all_attribute_stats: list[str]
+    all_secondary_stats: list[str]
+    all_skill_stats: list[str]
+    weapon_info_dict: dict[str, WeaponInfo]
+    weapon_stats_dict: dict[str, WeaponStats]
+    weapon_type_int_to_translation_key: dict[str, TranslationKey]
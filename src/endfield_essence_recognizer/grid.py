@@ -0,0 +1,78 @@
+"""基质网格分析。
+
+对整个基质网格只截图一次，用向量化的逐格统计量判断每个位置是否有基质，
+扫描时只点击有基质的位置，并在出现空位的页面确定地结束扫描。
+"""
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+import numpy as np
+from cv2.typing import MatLike
+
+from endfield_essence_recognizer.image import to_gray_image
+
+CELL_INSET = 10
+"""统计时从图标四周向内收缩的像素数，排除选中高亮边框的影响"""
+EMPTY_CELL_STD_THRESHOLD = 12.0
+"""图标区域灰度标准差低于此值认为是空位（空位是纯色底板，基质图标有丰富的纹理）"""
+
+
+@dataclass
+class GridOccupancy:
+    occupied: np.ndarray
+    """每个位置是否有基质，形状为 (行数, 列数)"""
+    cell_std: np.ndarray
+    """每个位置图标区域的灰度标准差，形状为 (行数, 列数)"""
+
+    @property
+    def occupied_count(self) -> int:
+        """有基质的位置数量"""
+        return int(np.count_nonzero(self.occupied))
+
+    @property
+    def is_partial(self) -> bool:
+        """本页是否存在空位（存在空位说明已经是最后一页）"""
+        return not bool(self.occupied.all())
+
+    def occupied_cells(self) -> list[tuple[int, int]]:
+        """按行优先顺序列出有基质的位置 (行, 列)"""
+        return [(int(i), int(j)) for i, j in np.argwhere(self.occupied)]
+
+
+def analyze_grid(
+    grid_image: MatLike,
+    cell_x_list: Sequence[int],
+    cell_y_list: Sequence[int],
+    cell_size: tuple[int, int],
+) -> GridOccupancy:
+    """
+    分析基质网格截图，判断每个位置是否有基质。
+
+    基质总是从左上角开始按行依次排列，因此只有最后一个有基质的位置之后的空位才认为是空位，
+    避免个别颜色单一的图标被误判为空位。
+
+    Args:
+        grid_image: 基质网格区域的截图
+        cell_x_list: 每列图标左上角在截图中的横坐标
+        cell_y_list: 每行图标左上角在截图中的纵坐标
+        cell_size: 图标尺寸 (宽, 高)
+
+    Returns:
+        网格占用情况
+    """
+    gray = to_gray_image(grid_image)
+    width, height = cell_size
+    xs = np.asarray(cell_x_list)[:, None] + np.arange(CELL_INSET, width - CELL_INSET)
+    ys = np.asarray(cell_y_list)[:, None] + np.arange(CELL_INSET, height - CELL_INSET)
+
+    # (行, 列, 高, 宽) 的图标区域，一次计算所有位置的标准差
+    cells = gray[ys[:, None, :, None], xs[None, :, None, :]].astype(np.float32)
+    cell_std = cells.std(axis=(2, 3))
+
+    textured = (cell_std >= EMPTY_CELL_STD_THRESHOLD).ravel()
+    occupied = np.zeros(textured.shape, dtype=bool)
+    if textured.any():
+        last_occupied = int(np.flatnonzero(textured)[-1])
+        occupied[: last_occupied + 1] = True
+    return GridOccupancy(occupied.reshape(cell_std.shape), cell_std)
@@ -64,3 +64,24 @@ def scope_to_slice(scope: Scope | None) -> Slice:
         return slice(None), slice(None)
     (x0, y0), (x1, y1) = scope
     return slice(y0, y1), slice(x0, x1)
+
+
+class Frame:
+    """
+    一次截图得到的画面。
+
+    记录画面在窗口客户区中的位置，可以按客户区坐标裁剪出 ROI。
+    裁剪结果是原画面的视图（不复制像素），因此同一帧中的所有 ROI 来自同一时刻。
+    """
+
+    def __init__(self, image: MatLike, scope: Scope) -> None:
+        self.image: MatLike = image
+        self.scope: Scope = scope
+
+    def crop(self, scope: Scope) -> MatLike:
+        """按客户区坐标 ((x0, y0), (x1, y1)) 裁剪出 ROI 视图。"""
+        (x0, y0), (x1, y1) = scope
+        (left, top), (right, bottom) = self.scope
+        if not (left <= x0 < x1 <= right and top <= y0 < y1 <= bottom):
+            raise ValueError(f"Scope {scope} is out of frame {self.scope}")
+        return self.image[y0 - top : y1 - top, x0 - left : x1 - left]
@@ -0,0 +1,195 @@
+"""基质库存记录。
+
+每次扫描把识别过的基质（缩略图指纹、属性、锁定和弃用状态、位置、扫描时间）
+写入本地 SQLite 数据库。同一位置上缩略图指纹相同的基质只保留一条记录，
+重复扫描时更新为最新的状态。增量扫描时，缩略图指纹已知的基质直接使用记录中的属性，
+无需再识别属性文本。
+"""
+
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+from endfield_essence_recognizer.log import logger
+from endfield_essence_recognizer.path import ROOT_DIR
+
+inventory_db_path = ROOT_DIR / "inventory.sqlite3"
+"""基质库存数据库路径"""
+INVENTORY_BATCH_SIZE = 64
+"""累积多少条记录后写入一次数据库"""
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS essences (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    fingerprint BLOB NOT NULL,
+    attribute TEXT,
+    secondary TEXT,
+    skill TEXT,
+    locked TEXT,
+    deprecated TEXT,
+    page INTEGER NOT NULL,
+    row INTEGER NOT NULL,
+    col INTEGER NOT NULL,
+    scanned_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_essences_fingerprint ON essences (fingerprint);
+CREATE INDEX IF NOT EXISTS idx_essences_stats ON essences (attribute, secondary, skill);
+-- 旧版本每次扫描都追加记录，建立唯一索引前只保留每个基质最新的一条
+DELETE FROM essences WHERE id NOT IN (
+    SELECT MAX(id) FROM essences GROUP BY fingerprint, page, row, col
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_essences_position
+    ON essences (fingerprint, page, row, col);
+"""
+
+
+@dataclass
+class InventoryRecord:
+    fingerprint: bytes
+    """缩略图指纹"""
+    attribute: str | None
+    """基础属性"""
+    secondary: str | None
+    """附加属性"""
+    skill: str | None
+    """技能属性"""
+    locked: str | None
+    """锁定状态"""
+    deprecated: str | None
+    """弃用状态"""
+    page: int
+    """所在页（从 1 开始）"""
+    row: int
+    """所在行（从 0 开始）"""
+    col: int
+    """所在列（从 0 开始）"""
+    scanned_at: float = field(default_factory=time.time)
+    """扫描时间（Unix 时间戳）"""
+
+
+class InventoryStore:
+    """基于 SQLite 的基质库存，写入按批提交，可在多个线程中使用。"""
+
+    def __init__(self, path: Path | str) -> None:
+        self.path: Path | str = path
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        self._connection.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._pending: list[InventoryRecord] = []
+
+    def add(self, record: InventoryRecord) -> None:
+        """添加或更新一条记录，累积到一批后统一写入。"""
+        with self._lock:
+            self._pending.append(record)
+            if len(self._pending) >= INVENTORY_BATCH_SIZE:
+                self._flush_locked()
+
+    def flush(self) -> None:
+        """在一个事务中写入所有尚未写入的记录，已有的同一基质的记录会被更新。"""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if not self._pending:
+            return
+        with self._connection:
+            self._connection.executemany(
+                "INSERT INTO essences (fingerprint, attribute, secondary, skill,"
+                " locked, deprecated, page, row, col, scanned_at)"
+                " VALUES (:fingerprint, :attribute, :secondary, :skill,"
+                " :locked, :deprecated, :page, :row, :col, :scanned_at)"
+                " ON CONFLICT (fingerprint, page, row, col) DO UPDATE SET"
+                " attribute = excluded.attribute, secondary = excluded.secondary,"
+                " skill = excluded.skill, locked = excluded.locked,"
+                " deprecated = excluded.deprecated, scanned_at = excluded.scanned_at",
+                [asdict(record) for record in self._pending],
+            )
+        logger.debug(f"已写入 {len(self._pending)} 条基质记录")
+        self._pending.clear()
+
+    def lookup_stats(self, fingerprint: bytes) -> tuple[str, str, str] | None:
+        """
+        查找缩略图指纹对应的基质属性。
+
+        指纹未知，或者记录中同一指纹对应过不同的属性时返回 None。
+        """
+        with self._lock:
+            self._flush_locked()
+            rows = self._connection.execute(
+                "SELECT DISTINCT attribute, secondary, skill FROM essences"
+                " WHERE fingerprint = ? AND attribute IS NOT NULL"
+                " AND secondary IS NOT NULL AND skill IS NOT NULL LIMIT 2",
+                (fingerprint,),
+            ).fetchall()
+        if len(rows) != 1:
+            return None
+        return rows[0]["attribute"], rows[0]["secondary"], rows[0]["skill"]
+
+    def query(
+        self,
+        attribute: str | None = None,
+        secondary: str | None = None,
+        skill: str | None = None,
+        locked: str | None = None,
+        deprecated: str | None = None,
+        limit: int = 100,
+    ) -> list[dict[str, Any]]:
+        """按条件查询记录，按扫描时间从新到旧排列。"""
+        conditions = {
+            "attribute": attribute,
+            "secondary": secondary,
+            "skill": skill,
+            "locked": locked,
+            "deprecated": deprecated,
+        }
+        where = [
+            f"{column} = :{column}" for column, value in conditions.items() if value
+        ]
+        sql = (
+            "SELECT attribute, secondary, skill, locked, deprecated,"
+            " page, row, col, scanned_at, hex(fingerprint) AS fingerprint"
+            " FROM essences"
+            + (f" WHERE {' AND '.join(where)}" if where else "")
+            + " ORDER BY scanned_at DESC, id DESC LIMIT :limit"
+        )
+        with self._lock:
+            self._flush_locked()
+            rows = self._connection.execute(sql, {**conditions, "limit": limit})
+            return [dict(row) for row in rows]
+
+    def summary(self) -> dict[str, Any]:
+        """库存概况：记录数（即基质数）、不同指纹数、不同属性组合数和最近扫描时间。"""
+        with self._lock:
+            self._flush_locked()
+            row = self._connection.execute(
+                "SELECT COUNT(*) AS records,"
+                " COUNT(DISTINCT fingerprint) AS fingerprints,"
+                " MAX(scanned_at) AS last_scanned_at FROM essences"
+            ).fetchone()
+            stats_row = self._connection.execute(
+                "SELECT COUNT(*) AS stats_combinations FROM (SELECT DISTINCT"
+                " attribute, secondary, skill FROM essences WHERE attribute IS NOT NULL)"
+            ).fetchone()
+        return {**dict(row), **dict(stats_row)}
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush_locked()
+            self._connection.close()
+
+
+_store: InventoryStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_inventory_store() -> InventoryStore:
+    """获取基质库存，首次调用时打开数据库。"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = InventoryStore(inventory_db_path)
+        return _store
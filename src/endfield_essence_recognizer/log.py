@@ -7,6 +7,7 @@ import sys
 
 from loguru import logger
 
+from endfield_essence_recognizer.metrics import metrics
 from endfield_essence_recognizer.path import ROOT_DIR
 
 file_log_format = (
@@ -75,6 +76,14 @@ class WebSocketHandler:
 websocket_handler = WebSocketHandler()
 
 
+def count_log_record(record) -> None:
+    """按级别统计日志记录数量，用于判断扫描是否被大量日志拖慢。"""
+    metrics.increment("log_records", level=record["level"].name)
+
+
+logger.configure(patcher=count_log_record)
+
+
 logger.remove()
 if sys.stderr:  # 打包后可能没有 stderr
     logger.add(
@@ -0,0 +1,491 @@
+"""批量模板匹配引擎。
+
+将同尺寸的模板堆叠成一个连续的模板库，对 ROI 只做一次傅里叶变换，
+即可在一次向量化运算中得到所有模板的 TM_CCOEFF_NORMED 分数。
+
+已知文字在 ROI 中的大致位置时，也可以只在该位置附近的小窗口内直接计算相关，
+此时偏移数量很少，矩阵乘法比傅里叶变换更快。
+
+对高对比度的文字还可以使用二值模板库：ROI 和模板二值化后按位打包为 uint64 字，
+用 XOR 与 popcount 计算二值图像上的相关系数，分数与上面的引擎可以使用同一组阈值。
+"""
+
+from collections.abc import Sequence
+from functools import cache
+
+import cv2
+import numpy as np
+from cv2.typing import MatLike
+from numpy.lib.stride_tricks import as_strided, sliding_window_view
+
+PROFILE_SEARCH_RADIUS = 2
+"""二值匹配中相对投影曲线估计位置允许偏离的像素数"""
+
+
+@cache
+def _partial_inverse_dft(
+    fft_shape: tuple[int, int], result_shape: tuple[int, int]
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    构造只计算有效区域的二维逆实数 DFT 矩阵。
+
+    模板匹配只需要互相关结果左上角的 result_shape 区域，
+    用两个小矩阵代替完整的逆变换可以省去绝大部分计算。
+
+    Returns:
+        (行方向矩阵, 列方向矩阵)，满足
+        `((rows @ spectrum) @ cols).real == np.fft.irfft2(spectrum, s=fft_shape)[:h, :w]`
+    """
+    fft_height, fft_width = fft_shape
+    result_height, result_width = result_shape
+    rows = (
+        np.exp(
+            2j
+            * np.pi
+            * np.outer(np.arange(result_height), np.arange(fft_height))
+            / fft_height
+        )
+        / fft_height
+    )
+
+    # 实数信号的频谱共轭对称，只存储了一半频率，其余频率通过权重 2 补回
+    num_freqs = fft_width // 2 + 1
+    weights = np.full(num_freqs, 2.0)
+    weights[0] = 1.0
+    if fft_width % 2 == 0:
+        weights[-1] = 1.0
+    cols = (
+        weights[:, None]
+        * np.exp(
+            2j
+            * np.pi
+            * np.outer(np.arange(num_freqs), np.arange(result_width))
+            / fft_width
+        )
+        / fft_width
+    )
+    return rows, cols
+
+
+def _window_sum(integral: np.ndarray, height: int, width: int) -> np.ndarray:
+    """根据积分图计算所有 height x width 窗口内的和。"""
+    return (
+        integral[height:, width:]
+        - integral[:-height, width:]
+        - integral[height:, :-width]
+        + integral[:-height, :-width]
+    )
+
+
+def _normalize_scores(
+    numerators: np.ndarray, denominators: np.ndarray, norms: np.ndarray
+) -> np.ndarray:
+    """由 TM_CCOEFF 的分子和分母计算 TM_CCOEFF_NORMED 分数，模板位于第 0 维。"""
+    # 与 OpenCV 保持一致的归一化与数值保护
+    abs_numerators = np.abs(numerators)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scores = np.where(
+            abs_numerators < denominators,
+            numerators / denominators,
+            np.where(abs_numerators < denominators * 1.125, np.sign(numerators), 0.0),
+        )
+    # 常量模板在 OpenCV 中的结果恒为 1
+    scores[norms < np.finfo(np.float64).eps] = 1.0
+    return scores
+
+
+class _TemplateGroup:
+    """同一尺寸的模板组。"""
+
+    def __init__(self, labels: list[str], templates: list[MatLike]) -> None:
+        self.labels: list[str] = labels
+        self.shape: tuple[int, int] = templates[0].shape[:2]
+        stack = np.stack(templates).astype(np.float64)
+        # 去均值后的模板，使互相关结果直接等于 TM_CCOEFF 的分子
+        self.stack: np.ndarray = np.ascontiguousarray(
+            stack - stack.mean(axis=(1, 2), keepdims=True)
+        )
+        self.norms: np.ndarray = np.sqrt(np.square(self.stack).sum(axis=(1, 2)))
+        # 小窗口直接相关使用的单精度模板矩阵，每列一个模板
+        self.columns: np.ndarray = np.ascontiguousarray(
+            self.stack.reshape(len(labels), -1).T, dtype=np.float32
+        )
+        self._spectra: dict[tuple[int, int], np.ndarray] = {}
+
+    def spectra(self, fft_shape: tuple[int, int]) -> np.ndarray:
+        """获取（并缓存）指定 FFT 尺寸下所有模板的共轭频谱。"""
+        spectra = self._spectra.get(fft_shape)
+        if spectra is None:
+            spectra = np.conj(np.fft.rfft2(self.stack, s=fft_shape))
+            self._spectra[fft_shape] = spectra
+        return spectra
+
+    def match(self, image: MatLike) -> np.ndarray:
+        """
+        计算 ROI 与组内所有模板的 TM_CCOEFF_NORMED 最大分数。
+
+        Args:
+            image: 单通道 ROI 图像
+
+        Returns:
+            每个模板的最大分数
+        """
+        return self.score_maps(image).reshape(len(self.labels), -1).max(axis=1)
+
+    def score_maps(self, image: MatLike) -> np.ndarray:
+        """
+        计算 ROI 与组内所有模板在每个偏移处的 TM_CCOEFF_NORMED 分数。
+
+        Returns:
+            形状为 (模板数, 结果高度, 结果宽度) 的分数图
+        """
+        image_height, image_width = image.shape[:2]
+        template_height, template_width = self.shape
+        result_shape = (
+            image_height - template_height + 1,
+            image_width - template_width + 1,
+        )
+        fft_shape = (
+            cv2.getOptimalDFTSize(image_height),
+            cv2.getOptimalDFTSize(image_width),
+        )
+
+        # 分子：去均值模板与 ROI 的互相关（一次正变换，批量求有效区域的逆变换）
+        image_spectrum = np.fft.rfft2(np.asarray(image, dtype=np.float64), s=fft_shape)
+        rows, cols = _partial_inverse_dft(fft_shape, result_shape)
+        numerators = ((rows @ (self.spectra(fft_shape) * image_spectrum)) @ cols).real
+
+        # 分母：利用积分图计算每个窗口的方差项
+        integral, squared_integral = cv2.integral2(
+            np.ascontiguousarray(image), sdepth=cv2.CV_64F, sqdepth=cv2.CV_64F
+        )
+        window_sum = _window_sum(integral, template_height, template_width)
+        window_squared_sum = _window_sum(
+            squared_integral, template_height, template_width
+        )
+        window_variance = np.maximum(
+            window_squared_sum - window_sum**2 / (template_height * template_width),
+            0,
+        )
+        denominators = np.sqrt(window_variance)[None] * self.norms[:, None, None]
+
+        return _normalize_scores(numerators, denominators, self.norms)
+
+    def match_window(
+        self, image: MatLike, top_left: tuple[int, int], radius: int
+    ) -> np.ndarray | None:
+        """
+        只在模板左上角位于 top_left 附近 radius 像素内的偏移上计算分数。
+
+        Returns:
+            每个模板在窗口内的最大分数，窗口超出 ROI 而放不下模板时返回 None
+        """
+        image_height, image_width = image.shape[:2]
+        template_height, template_width = self.shape
+        x, y = top_left
+        x0, y0 = max(x - radius, 0), max(y - radius, 0)
+        x1 = min(x + template_width + radius, image_width)
+        y1 = min(y + template_height + radius, image_height)
+        if x1 - x0 < template_width or y1 - y0 < template_height:
+            return None
+        window = np.ascontiguousarray(image[y0:y1, x0:x1])
+
+        # 分子：每个偏移处的窗口块与所有去均值模板的点积（一次矩阵乘法）
+        patches = sliding_window_view(
+            window.astype(np.float32), (template_height, template_width)
+        )
+        offsets = patches.shape[0] * patches.shape[1]
+        numerators = (patches.reshape(offsets, -1) @ self.columns).T
+
+        # 分母：利用积分图计算每个偏移处的方差项
+        integral, squared_integral = cv2.integral2(
+            window, sdepth=cv2.CV_64F, sqdepth=cv2.CV_64F
+        )
+        window_sum = _window_sum(integral, template_height, template_width).ravel()
+        window_squared_sum = _window_sum(
+            squared_integral, template_height, template_width
+        ).ravel()
+        window_variance = np.maximum(
+            window_squared_sum - window_sum**2 / (template_height * template_width),
+            0,
+        )
+        denominators = np.sqrt(window_variance)[None] * self.norms[:, None]
+
+        scores = _normalize_scores(numerators, denominators, self.norms)
+        return scores.max(axis=1)
+
+
+class TemplateBank:
+    """
+    批量模板库。
+
+    按尺寸将模板分组堆叠，匹配时每组只对 ROI 做一次变换，返回的分数与逐个调用
+    `cv2.matchTemplate(..., cv2.TM_CCOEFF_NORMED)` 一致（浮点误差范围内）。
+    """
+
+    def __init__(self, labels: Sequence[str], templates: Sequence[MatLike]) -> None:
+        grouped: dict[tuple[int, int], tuple[list[str], list[MatLike]]] = {}
+        for label, template in zip(labels, templates, strict=True):
+            group_labels, group_templates = grouped.setdefault(
+                template.shape[:2], ([], [])
+            )
+            group_labels.append(label)
+            group_templates.append(template)
+        self._groups: list[_TemplateGroup] = [
+            _TemplateGroup(group_labels, group_templates)
+            for group_labels, group_templates in grouped.values()
+        ]
+
+    def match(self, image: MatLike) -> dict[str, float]:
+        """
+        对单通道 ROI 图像匹配模板库中的所有模板，尺寸大于 ROI 的模板会被跳过。
+
+        Args:
+            image: 单通道 ROI 图像
+
+        Returns:
+            标签到最大分数的映射
+        """
+        image_height, image_width = image.shape[:2]
+        scores: dict[str, float] = {}
+        for group in self._groups:
+            template_height, template_width = group.shape
+            if image_height < template_height or image_width < template_width:
+                continue
+            for label, score in zip(group.labels, group.match(image)):
+                if score > scores.get(label, -float("inf")):
+                    scores[label] = float(score)
+        return scores
+
+    def locate(self, image: MatLike) -> dict[str, tuple[float, tuple[int, int]]]:
+        """
+        对单通道 ROI 图像匹配模板库中的所有模板，同时返回最大分数所在的位置。
+
+        Returns:
+            标签到 (最大分数, 模板左上角坐标 (x, y)) 的映射
+        """
+        image_height, image_width = image.shape[:2]
+        located: dict[str, tuple[float, tuple[int, int]]] = {}
+        for group in self._groups:
+            template_height, template_width = group.shape
+            if image_height < template_height or image_width < template_width:
+                continue
+            maps = group.score_maps(image)
+            flat = maps.reshape(len(group.labels), -1)
+            best = flat.argmax(axis=1)
+            for k, label in enumerate(group.labels):
+                score = float(flat[k, best[k]])
+                if label not in located or score > located[label][0]:
+                    y, x = divmod(int(best[k]), maps.shape[2])
+                    located[label] = (score, (x, y))
+        return located
+
+    def match_window(
+        self, image: MatLike, top_left: tuple[int, int], radius: int
+    ) -> dict[str, float]:
+        """
+        只在模板左上角位于 top_left 附近 radius 像素内时匹配模板库中的所有模板。
+
+        Args:
+            image: 单通道 ROI 图像
+            top_left: 预期的模板左上角在 ROI 中的坐标 (x, y)
+            radius: 允许偏离预期位置的像素数
+
+        Returns:
+            标签到窗口内最大分数的映射，窗口放不下的模板会被跳过
+        """
+        scores: dict[str, float] = {}
+        for group in self._groups:
+            group_scores = group.match_window(image, top_left, radius)
+            if group_scores is None:
+                continue
+            for label, score in zip(group.labels, group_scores):
+                if score > scores.get(label, -float("inf")):
+                    scores[label] = float(score)
+        return scores
+
+
+def _binarize(image: MatLike) -> np.ndarray:
+    """用 Otsu 阈值二值化单通道图像，返回布尔数组。"""
+    _threshold, binary = cv2.threshold(
+        np.ascontiguousarray(image, dtype=np.uint8),
+        0,
+        1,
+        cv2.THRESH_BINARY + cv2.THRESH_OTSU,
+    )
+    return binary.astype(bool)
+
+
+def _pack_rows(bits: np.ndarray) -> np.ndarray:
+    """把最后一维（图像的一行）按位打包为 uint64 字，不足 64 位的部分补 0。"""
+    words = -(-bits.shape[-1] // 64)
+    packed = np.packbits(bits, axis=-1)
+    padded = np.zeros((*bits.shape[:-1], words * 8), dtype=np.uint8)
+    padded[..., : packed.shape[-1]] = packed
+    return padded.view(">u8").astype(np.uint64)
+
+
+def _center(profiles: np.ndarray) -> np.ndarray:
+    """投影曲线去均值，每行一条。"""
+    return profiles - profiles.mean(axis=1, keepdims=True)
+
+
+def _profile_offsets(profile: np.ndarray, templates: np.ndarray) -> np.ndarray:
+    """由投影曲线的互相关估计每个模板在 ROI 中的偏移（一维），模板投影曲线已去均值。"""
+    windows = sliding_window_view(profile, templates.shape[1])
+    return (windows @ templates.T).argmax(axis=0)
+
+
+class _BinaryTemplateGroup:
+    """同一尺寸的二值模板组，每行打包为若干个 uint64 字。"""
+
+    def __init__(self, labels: list[str], templates: list[MatLike]) -> None:
+        self.labels: list[str] = labels
+        self.shape: tuple[int, int] = templates[0].shape[:2]
+        self.bits: np.ndarray = np.stack(
+            [_binarize(template) for template in templates]
+        )
+        self.row_profiles: np.ndarray = _center(self.bits.sum(axis=2, dtype=np.float32))
+        self.column_profiles: np.ndarray = _center(
+            self.bits.sum(axis=1, dtype=np.float32)
+        )
+        self.ones: np.ndarray = self.bits.sum(axis=(1, 2)).astype(np.float64)
+        size = self.shape[0] * self.shape[1]
+        self.norms: np.ndarray = np.sqrt(self.ones * (size - self.ones))
+        self._shifted: dict[int, tuple[np.ndarray, np.ndarray]] = {}
+
+    def shifted(self, image_width: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        获取（并缓存）模板放在宽度为 image_width 的行中每个水平偏移处打包后的结果。
+
+        Returns:
+            (模板, 掩码)，形状分别为 (模板数, 水平偏移数, 模板行数 * 字数) 和
+            (水平偏移数, 模板行数 * 字数)，掩码只在模板覆盖的列上为 1
+        """
+        shifted = self._shifted.get(image_width)
+        if shifted is None:
+            count, template_height, template_width = self.bits.shape
+            offsets = image_width - template_width + 1
+            placed = np.zeros(
+                (count, offsets, template_height, image_width), dtype=bool
+            )
+            masks = np.zeros((offsets, template_height, image_width), dtype=bool)
+            for dx in range(offsets):
+                placed[:, dx, :, dx : dx + template_width] = self.bits
+                masks[dx, :, dx : dx + template_width] = True
+            shifted = (
+                _pack_rows(placed).reshape(count, offsets, -1),
+                _pack_rows(masks).reshape(offsets, -1),
+            )
+            self._shifted[image_width] = shifted
+        return shifted
+
+    def match(
+        self, bits: np.ndarray, top_left: tuple[int, int] | None, radius: int
+    ) -> np.ndarray | None:
+        """
+        计算二值 ROI 与组内所有模板的二值相关系数，返回每个模板在搜索范围内的最大分数。
+
+        top_left 为 None 时由行、列投影曲线的互相关估计每个模板的位置，
+        只在估计位置附近 radius 像素内比较。模板放不下时返回 None。
+        """
+        image_height, image_width = bits.shape
+        template_height, template_width = self.shape
+        if image_height < template_height or image_width < template_width:
+            return None
+        if top_left is None:
+            x = _profile_offsets(
+                bits.sum(axis=0, dtype=np.float32), self.column_profiles
+            )
+            y = _profile_offsets(bits.sum(axis=1, dtype=np.float32), self.row_profiles)
+        else:
+            x = np.array([top_left[0]])
+            y = np.array([top_left[1]])
+        steps = np.arange(-radius, radius + 1)
+        xs = np.clip(x[:, None] + steps, 0, image_width - template_width)
+        ys = np.clip(y[:, None] + steps, 0, image_height - template_height)
+
+        # ROI 只打包一次，连续的模板行数行在内存中相邻，不复制即可视为每个垂直偏移处的窗口
+        rows = _pack_rows(bits)
+        row_windows = as_strided(
+            rows,
+            shape=(image_height - template_height + 1, rows[:template_height].size),
+            strides=rows.strides,
+            writeable=False,
+        )
+        words, masks = self.shifted(image_width)
+        templates = words[np.arange(len(self.labels))[:, None], xs]
+        # (模板数或 1, 水平偏移数, 垂直偏移数, 模板行数 * 字数)，只保留模板覆盖的列
+        windows = row_windows[ys][:, None] & masks[xs][:, :, None]
+
+        # XOR 后 popcount 得到汉明距离 d，两边同时为 1 的像素数 c = (a + b - d) / 2，
+        # phi = (N c - a b) / sqrt(a (N - a) b (N - b))
+        distances = np.bitwise_count(templates[:, :, None] ^ windows).sum(
+            axis=3, dtype=np.int32
+        )
+        window_ones = np.bitwise_count(windows).sum(axis=3, dtype=np.int32)
+        size = template_height * template_width
+        a = self.ones[:, None, None]
+        b = window_ones.astype(np.float64)
+        numerators = size * (a + b - distances) / 2 - a * b
+        denominators = np.sqrt(b * (size - b)) * self.norms[:, None, None]
+        scores = _normalize_scores(numerators, denominators, self.norms)
+        return scores.reshape(len(self.labels), -1).max(axis=1)
+
+
+class BinaryTemplateBank:
+    """
+    二值模板库。
+
+    把 ROI 和模板二值化后按行打包为 uint64 字，由投影曲线估计每个模板的位置，
+    只在附近的少量偏移处用 XOR 与 popcount 一次性比较所有模板。
+    返回的分数是二值图像上的 TM_CCOEFF_NORMED（phi 系数），与 `TemplateBank` 的分数范围和含义相同，
+    可以直接使用同一组阈值。适合高对比度的文字，不适合有渐变的图标。
+    """
+
+    def __init__(self, labels: Sequence[str], templates: Sequence[MatLike]) -> None:
+        grouped: dict[tuple[int, int], tuple[list[str], list[MatLike]]] = {}
+        for label, template in zip(labels, templates, strict=True):
+            group_labels, group_templates = grouped.setdefault(
+                template.shape[:2], ([], [])
+            )
+            group_labels.append(label)
+            group_templates.append(template)
+        self._groups: list[_BinaryTemplateGroup] = [
+            _BinaryTemplateGroup(group_labels, group_templates)
+            for group_labels, group_templates in grouped.values()
+        ]
+
+    def _match(
+        self, image: MatLike, top_left: tuple[int, int] | None, radius: int
+    ) -> dict[str, float]:
+        bits = _binarize(image)
+        scores: dict[str, float] = {}
+        for group in self._groups:
+            group_scores = group.match(bits, top_left, radius)
+            if group_scores is None:
+                continue
+            for label, score in zip(group.labels, group_scores):
+                if score > scores.get(label, -float("inf")):
+                    scores[label] = float(score)
+        return scores
+
+    def match(self, image: MatLike) -> dict[str, float]:
+        """
+        对单通道 ROI 图像匹配模板库中的所有模板，尺寸大于 ROI 的模板会被跳过。
+
+        Returns:
+            标签到最大分数的映射
+        """
+        return self._match(image, None, PROFILE_SEARCH_RADIUS)
+
+    def match_window(
+        self, image: MatLike, top_left: tuple[int, int], radius: int
+    ) -> dict[str, float]:
+        """
+        只在模板左上角位于 top_left 附近 radius 像素内时匹配模板库中的所有模板。
+
+        Returns:
+            标签到窗口内最大分数的映射，放不下的模板会被跳过
+        """
+        return self._match(image, top_left, radius)
@@ -0,0 +1,236 @@
+"""扫描各阶段的耗时指标。
+
+在截图、模板识别、品质判定、点击、滚动和等待等位置记录耗时，汇总为固定分桶的直方图和计数器，
+通过 `/api/metrics` 以 JSON 或 Prometheus 文本格式提供，每次开始扫描时清零。
+
+记录一次耗时只需要一次字典查找和一次加锁，可以一直开启。
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any
+
+LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+)
+"""耗时直方图的分桶上界（秒），最后还有一个 +Inf 桶"""
+METRIC_PREFIX = "eer_"
+"""Prometheus 指标名前缀"""
+METRIC_HELP = {
+    "screenshot_seconds": "截图耗时",
+    "click_seconds": "点击耗时",
+    "scroll_seconds": "滚动耗时（只包含滚轮操作）",
+    "scroll_page_seconds": "翻页耗时（包含滚动、等待网格稳定和计算滚动行数）",
+    "recognize_roi_seconds": "单个 ROI 的模板识别耗时",
+    "judge_seconds": "基质品质判定耗时",
+    "settle_seconds": "操作后等待界面稳定的耗时",
+    "sleep_seconds": "固定等待的耗时",
+    "settle_timeouts": "等待界面稳定超时的次数",
+    "template_correlations": "ordered 引擎中逐个匹配的模板数量（不含批量匹配）",
+    "alignment_fallbacks": "对齐跟踪的窗口匹配分数下降、回退到完整搜索的次数",
+    "essences_scanned": "扫描的基质数量",
+    "log_records": "日志记录数量",
+}
+"""指标说明，同时用于 Prometheus 的 HELP 行"""
+
+type MetricKey = tuple[str, tuple[tuple[str, str], ...]]
+"""指标名及其标签"""
+
+
+class Histogram:
+    """固定分桶的耗时直方图。"""
+
+    __slots__ = ("count", "counts", "sum")
+
+    def __init__(self) -> None:
+        self.counts: list[int] = [0] * (len(LATENCY_BUCKETS) + 1)
+        """每个分桶（非累计）的次数，最后一个为 +Inf 桶"""
+        self.count: int = 0
+        self.sum: float = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def to_dict(self) -> dict[str, Any]:
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip([*LATENCY_BUCKETS, "+Inf"], self.counts):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "mean": round(self.sum / self.count, 6) if self.count else 0.0,
+            "buckets": buckets,
+        }
+
+
+class Metrics:
+    """线程安全的直方图和计数器集合。"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._histograms: dict[MetricKey, Histogram] = {}
+        self._counters: dict[MetricKey, float] = {}
+        self._started_at: float = time.time()
+
+    def observe(self, name: str, seconds: float, **labels: str) -> None:
+        """记录一次耗时（秒）。"""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    def increment(self, name: str, value: float = 1, **labels: str) -> None:
+        """增加计数器。"""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    @contextmanager
+    def timer(self, name: str, **labels: str) -> Iterator[None]:
+        """记录代码块的耗时。"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def timed[**P, R](
+        self, name: str, **labels: str
+    ) -> Callable[[Callable[P, R]], Callable[P, R]]:
+        """记录函数每次调用耗时的装饰器。"""
+
+        def decorator(func: Callable[P, R]) -> Callable[P, R]:
+            @wraps(func)
+            def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.observe(name, time.perf_counter() - start, **labels)
+
+            return wrapper
+
+        return decorator
+
+    def sleep(self, seconds: float, reason: str) -> None:
+        """固定等待，并记录实际等待的时间。"""
+        start = time.perf_counter()
+        time.sleep(seconds)
+        self.observe("sleep_seconds", time.perf_counter() - start, reason=reason)
+
+    def reset(self) -> None:
+        """清空所有指标，每次开始扫描时调用。"""
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self._started_at = time.time()
+
+    def snapshot(self) -> dict[str, Any]:
+        """以 JSON 友好的格式返回当前的所有指标。"""
+        with self._lock:
+            histograms = {key: h.to_dict() for key, h in self._histograms.items()}
+            counters = dict(self._counters)
+            started_at = self._started_at
+
+        result: dict[str, Any] = {
+            "started_at": started_at,
+            "elapsed": round(time.time() - started_at, 3),
+            "histograms": {},
+            "counters": {},
+        }
+        for (name, labels), data in sorted(histograms.items()):
+            result["histograms"].setdefault(name, []).append(
+                {"labels": dict(labels), **data}
+            )
+        for (name, labels), value in sorted(counters.items()):
+            result["counters"].setdefault(name, []).append(
+                {"labels": dict(labels), "value": value}
+            )
+        return result
+
+    def to_prometheus(self) -> str:
+        """以 Prometheus 文本格式（0.0.4）返回当前的所有指标。"""
+        snapshot = self.snapshot()
+        lines = []
+        for name, series in snapshot["histograms"].items():
+            metric = METRIC_PREFIX + name
+            lines += _prometheus_header(metric, name, "histogram")
+            for entry in series:
+                labels = entry["labels"]
+                for bound, count in entry["buckets"].items():
+                    lines.append(
+                        f"{metric}_bucket{_format_labels({**labels, 'le': bound})} {count}"
+                    )
+                lines.append(f"{metric}_sum{_format_labels(labels)} {entry['sum']}")
+                lines.append(f"{metric}_count{_format_labels(labels)} {entry['count']}")
+        for name, series in snapshot["counters"].items():
+            metric = f"{METRIC_PREFIX}{name}_total"
+            lines += _prometheus_header(metric, name, "counter")
+            for entry in series:
+                lines.append(
+                    f"{metric}{_format_labels(entry['labels'])} {entry['value']}"
+                )
+        return "\n".join(lines) + "\n"
+
+    def format_report(self) -> str:
+        """生成各阶段耗时的统计文本，按总耗时从高到低排列。"""
+        with self._lock:
+            histograms = [
+                (name, dict(labels), h.count, h.sum)
+                for (name, labels), h in self._histograms.items()
+            ]
+        lines = []
+        for name, labels, count, total in sorted(histograms, key=lambda h: -h[3]):
+            label_text = ",".join(f"{k}={v}" for k, v in labels.items())
+            title = f"{name}{{{label_text}}}" if label_text else name
+            lines.append(
+                f"{title}: 次数={count} 总计={total * 1000:.0f}ms "
+                f"平均={total / count * 1000:.1f}ms"
+            )
+        return "\n".join(lines)
+
+
+def _prometheus_header(metric: str, name: str, kind: str) -> list[str]:
+    lines = []
+    if name in METRIC_HELP:
+        lines.append(f"# HELP {metric} {METRIC_HELP[name]}")
+    lines.append(f"# TYPE {metric} {kind}")
+    return lines
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in labels.items()
+    )
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+metrics = Metrics()
+"""全局指标实例"""
@@ -0,0 +1,103 @@
+"""滚动偏移估计。
+
+对滚动前后的基质网格做图像配准，得到网格实际滚动了多少行：
+
+- 先用相位相关估计垂直位移，换算为行数
+- 再用行条带比对确认：滚动后网格的前若干行应与滚动前网格的后若干行一致（按亚像素位移比较）
+
+滚动了 0 行说明已经到底，滚动了不足一页时只有最后几行是新的基质。
+"""
+
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+
+from endfield_essence_recognizer.settle import (
+    FINGERPRINT_SCALE,
+    SETTLE_STABLE_THRESHOLD,
+    fingerprint_distance,
+)
+
+STRIP_MATCH_THRESHOLD = 0.05
+"""行条带比对时变化像素比例不超过此值认为两段网格一致"""
+
+
+@dataclass
+class ScrollOffset:
+    rows: int | None
+    """网格滚动的行数，无法确定（例如滚动超过一页、滚动后网格未对齐）时为 None"""
+    pixels: float
+    """相位相关估计的垂直位移（原图像素，向下滚动为正）"""
+    response: float
+    """相位相关的峰值响应"""
+
+    def new_rows(self, num_rows: int) -> range:
+        """滚动后网格中新出现的行。"""
+        if self.rows is None:
+            return range(num_rows)
+        return range(max(num_rows - self.rows, 0), num_rows)
+
+
+def _strip_distance(
+    before: np.ndarray, after: np.ndarray, rows: int, row_pitch: float
+) -> float:
+    """
+    滚动 rows 行时，滚动后网格的前几行与滚动前网格的后几行之间的差异。
+
+    行间距不是整数，实际滚动的像素数可能与估计相差一两个像素；
+    而指纹是缩小后的图像，原图中几个像素的位移在指纹中不是整数位移，
+    直接错开整数行比较时图标边缘处处不一致。因此在估计位移附近逐个原图像素尝试，
+    用相邻两行指纹的线性插值得到亚像素位移后的指纹，取其中的最小差异。
+    """
+    expected = rows * row_pitch
+    distances = []
+    for pixels in range(round(expected) - 4, round(expected) + 5):
+        shift = pixels * FINGERPRINT_SCALE
+        whole = int(shift)
+        weight = shift - whole
+        if not 0 < whole < before.shape[0] - 1:
+            continue
+        height = before.shape[0] - whole - 1
+        shifted = cv2.addWeighted(
+            before[whole : whole + height],
+            1.0 - weight,
+            before[whole + 1 : whole + 1 + height],
+            weight,
+            0.0,
+        )
+        distances.append(fingerprint_distance(shifted, after[:height]))
+    return min(distances, default=1.0)
+
+
+def estimate_scroll_offset(
+    before: np.ndarray, after: np.ndarray, row_pitch: float, num_rows: int
+) -> ScrollOffset:
+    """
+    估计网格在两次截图之间滚动的行数。
+
+    Args:
+        before: 滚动前网格区域的指纹（见 `settle.image_fingerprint`）
+        after: 滚动后网格区域的指纹
+        row_pitch: 相邻两行图标的间距（原图像素）
+        num_rows: 网格行数
+
+    Returns:
+        滚动偏移
+    """
+    if fingerprint_distance(before, after) <= SETTLE_STABLE_THRESHOLD:
+        return ScrollOffset(0, 0.0, 1.0)
+
+    (_dx, dy), response = cv2.phaseCorrelate(
+        before.astype(np.float32), after.astype(np.float32)
+    )
+    pixels = -dy / FINGERPRINT_SCALE
+
+    # 优先验证相位相关给出的行数，失败时逐个尝试其余可能的行数
+    estimate = round(pixels / row_pitch)
+    candidates = [estimate] if 0 < estimate < num_rows else []
+    candidates += [rows for rows in range(1, num_rows) if rows != estimate]
+    for rows in candidates:
+        if _strip_distance(before, after, rows, row_pitch) <= STRIP_MATCH_THRESHOLD:
+            return ScrollOffset(rows, pixels, response)
+    return ScrollOffset(None, pixels, response)
@@ -6,3 +6,6 @@ if getattr(sys, "frozen", False) and (_MEIPASS := getattr(sys, "_MEIPASS", None)
 
 else:
     ROOT_DIR = Path().resolve()
+
+CACHE_DIR = ROOT_DIR / "cache"
+"""运行时生成的缓存文件目录"""
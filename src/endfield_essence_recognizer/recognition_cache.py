@@ -0,0 +1,155 @@
+"""识别结果缓存。
+
+同一个属性名称在 1920x1080 下渲染出的 ROI 通常逐像素相同，
+以 ROI 的哈希为键缓存识别结果，命中时无需再做任何模板匹配。
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import NamedTuple
+
+import cv2
+import numpy as np
+from cv2.typing import MatLike
+
+NEAR_DUPLICATE_HASH_SIZE = (33, 8)
+"""近似重复检测所用差值哈希的采样尺寸 (宽, 高)，得到 (33 - 1) x 8 = 256 位哈希"""
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    """精确命中次数"""
+    near_hits: int
+    """近似命中次数"""
+    misses: int
+    """未命中次数"""
+    evictions: int
+    """淘汰次数"""
+    size: int
+    """当前缓存条目数"""
+    max_size: int
+    """最大缓存条目数"""
+
+
+def exact_hash(gray: MatLike) -> bytes:
+    """ROI 像素的精确哈希。"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.asarray(gray.shape, dtype=np.int32).tobytes())
+    digest.update(np.ascontiguousarray(gray).tobytes())
+    return digest.digest()
+
+
+def difference_hash(gray: MatLike) -> np.ndarray:
+    """ROI 的差值哈希（dHash），返回按位打包的 uint8 数组。"""
+    small = cv2.resize(gray, NEAR_DUPLICATE_HASH_SIZE, interpolation=cv2.INTER_AREA)
+    bits = small[:, 1:] > small[:, :-1]
+    return np.packbits(bits)
+
+
+class _CacheEntry(NamedTuple):
+    value: tuple[str | None, float]
+    near_hash: np.ndarray | None
+
+
+class RecognitionCache:
+    """
+    识别结果的有界 LRU 缓存。
+
+    - 精确层：以 ROI 像素哈希为键，逐像素相同的 ROI 直接命中
+    - 近似层（可选）：精确层未命中时，查找差值哈希的汉明距离不超过阈值的条目
+    """
+
+    def __init__(
+        self, max_size: int, near_duplicate_distance: int | None = None
+    ) -> None:
+        """
+        Args:
+            max_size: 最大缓存条目数
+            near_duplicate_distance: 近似命中允许的最大汉明距离，为 None 时关闭近似层
+        """
+        self.max_size: int = max_size
+        self.near_duplicate_distance: int | None = near_duplicate_distance
+        self._entries: OrderedDict[tuple[Hashable, bytes], _CacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._near_hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def _find_near(
+        self, namespace: Hashable, near_hash: np.ndarray
+    ) -> tuple[Hashable, bytes] | None:
+        keys = [
+            key
+            for key, entry in self._entries.items()
+            if key[0] == namespace and entry.near_hash is not None
+        ]
+        if not keys:
+            return None
+        hashes = np.stack([self._entries[key].near_hash for key in keys])  # type: ignore[misc]
+        distances = np.bitwise_count(hashes ^ near_hash).sum(axis=1)
+        best = int(np.argmin(distances))
+        if distances[best] <= self.near_duplicate_distance:  # type: ignore[operator]
+            return keys[best]
+        return None
+
+    def get_or_compute(
+        self,
+        gray: MatLike,
+        namespace: Hashable,
+        compute: Callable[[], tuple[str | None, float]],
+    ) -> tuple[str | None, float]:
+        """
+        查找 ROI 的识别结果，未命中时调用 compute 计算并写入缓存。
+
+        Args:
+            gray: 预处理后的单通道 ROI 图像
+            namespace: 区分不同识别条件（例如标签子集）的键，只在同一命名空间内查找
+            compute: 计算识别结果的函数
+        """
+        key = (namespace, exact_hash(gray))
+        near_hash = None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry.value
+
+            if self.near_duplicate_distance is not None:
+                near_hash = difference_hash(gray)
+                near_key = self._find_near(namespace, near_hash)
+                if near_key is not None:
+                    self._entries.move_to_end(near_key)
+                    self._near_hits += 1
+                    return self._entries[near_key].value
+
+            self._misses += 1
+
+        value = compute()
+
+        with self._lock:
+            self._entries[key] = _CacheEntry(value, near_hash)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+        return value
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(
+                self._hits,
+                self._near_hits,
+                self._misses,
+                self._evictions,
+                len(self._entries),
+                self.max_size,
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._near_hits = self._misses = self._evictions = 0
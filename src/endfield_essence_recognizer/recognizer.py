@@ -1,13 +1,24 @@
 import importlib.resources
-import itertools
-from collections import defaultdict
-from collections.abc import Callable
+import time
+from collections import Counter, defaultdict
+from collections.abc import Callable, Collection
 from importlib.abc import Traversable
+from pathlib import Path
+from typing import Literal, NamedTuple
 
 import cv2
 from cv2.typing import MatLike
 
-from endfield_essence_recognizer.game_data import gem_table
+from endfield_essence_recognizer.compiled_templates import (
+    cached_compiled_templates_dir,
+    compute_source_hash,
+    compute_source_key,
+    describe_preprocess,
+    load_compiled_templates,
+    packaged_compiled_templates_dir,
+    save_compiled_templates,
+    update_compiled_templates_key,
+)
 from endfield_essence_recognizer.game_data.weapon import get_gem_tag_name
 from endfield_essence_recognizer.image import (
     linear_operation,
@@ -15,10 +26,48 @@ from endfield_essence_recognizer.image import (
     to_gray_image,
 )
 from endfield_essence_recognizer.log import logger
+from endfield_essence_recognizer.matching import BinaryTemplateBank, TemplateBank
+from endfield_essence_recognizer.metrics import metrics
+from endfield_essence_recognizer.recognition_cache import CacheInfo, RecognitionCache
+from endfield_essence_recognizer.tracing import tracer
 
 # 识别阈值（默认值，可在 Recognizer 中覆盖）
 HIGH_THRESH = 0.75  # 高分数阈值：超过此值直接判定
 LOW_THRESH = 0.50  # 低分数阈值：低于此值判定为未知
+EARLY_EXIT_MARGIN = (
+    0.15  # 提前结束幅度：ordered 引擎中分数超过 HIGH_THRESH 此幅度即停止匹配
+)
+ORDERED_MIN_HIT_SHARE = (
+    0.5  # ordered 引擎只逐个匹配历史命中占比不低于此值的标签，其余情况批量匹配
+)
+
+# 对齐跟踪：固定布局下文字在 ROI 中的位置几乎不变，记住位置后只在附近的小窗口内匹配
+ALIGNMENT_RADIUS = 2  # 搜索窗口相对记住的位置允许偏离的像素数
+ALIGNMENT_SCORE_DROP = 0.1  # 窗口内最高分比记住位置时的分数低出此值即回退到完整搜索
+
+# 金字塔匹配：先在缩小的图像上粗匹配排出候选，再在原分辨率下验证
+PYRAMID_SCALE = 0.5  # 粗匹配层相对原图的缩放比例
+PYRAMID_CANDIDATES = 3  # 进入原分辨率验证的候选标签数量
+PYRAMID_VERIFY_RADIUS = 3  # 原分辨率验证时相对粗匹配位置允许偏离的像素数
+
+type MatchEngine = Literal["loop", "batched", "ordered", "pyramid", "binary"]
+"""
+模板匹配引擎：loop 逐个模板调用 OpenCV，batched 使用批量模板库一次匹配所有模板，
+ordered 先逐个匹配历史上经常命中的标签，分数足够高时提前结束，否则批量匹配，
+pyramid 在缩小的图像上粗匹配，只在原分辨率下验证排名靠前的候选，
+binary 把 ROI 和模板二值化后按位打包比较，只适合高对比度的文字
+"""
+
+
+class RankedMatch(NamedTuple):
+    candidates: list[tuple[str, float]]
+    """分数最高的若干个 (标签, 分数)，按分数从高到低排列"""
+    margin: float | None
+    """最高分与次高分之差，参与匹配的标签少于两个时为 None"""
+
+
+type AlignmentKey = tuple[tuple[int, int], frozenset[str] | None]
+"""对齐跟踪的键：ROI 尺寸和参与匹配的标签（对应扫描中的一个槽位）"""
 
 
 def preprocess_text_roi(roi_image: MatLike) -> MatLike:
@@ -33,11 +82,16 @@ def preprocess_text_template(template_image: MatLike) -> MatLike:
     return linear_operation(template_image, 128, 255)
 
 
+def downscale(image: MatLike) -> MatLike:
+    """缩小到金字塔粗匹配层。"""
+    return cv2.resize(
+        image, None, fx=PYRAMID_SCALE, fy=PYRAMID_SCALE, interpolation=cv2.INTER_AREA
+    )
+
+
 def get_label_name(label: str) -> str:
     """获取标签的显示名称。"""
-    if label in gem_table:
-        return get_gem_tag_name(label, "CN")
-    return label
+    return get_gem_tag_name(label, "CN")
 
 
 class Recognizer:
@@ -49,7 +103,19 @@ class Recognizer:
         low_thresh: float = LOW_THRESH,
         preprocess_roi: Callable[[MatLike], MatLike] | None = None,
         preprocess_template: Callable[[MatLike], MatLike] | None = None,
+        engine: MatchEngine = "loop",
+        cache_size: int = 0,
+        near_duplicate_distance: int | None = None,
+        early_exit_margin: float = EARLY_EXIT_MARGIN,
+        track_alignment: bool = False,
     ) -> None:
+        """
+        Args:
+            cache_size: 识别结果缓存的最大条目数，为 0 时不缓存
+            near_duplicate_distance: 缓存近似命中允许的最大差值哈希汉明距离，为 None 时只做精确命中
+            early_exit_margin: ordered 引擎中分数达到 high_thresh + early_exit_margin 即停止匹配
+            track_alignment: 是否记住每个槽位中最佳匹配的位置，之后只在该位置附近匹配
+        """
         self.labels: list[str] = labels
         self.templates_dir: Traversable = templates_dir
         self.high_thresh: float = high_thresh
@@ -60,7 +126,26 @@ class Recognizer:
         self.preprocess_template: Callable[[MatLike], MatLike] = (
             preprocess_template if preprocess_template is not None else lambda x: x
         )
+        self.engine: MatchEngine = engine
+        self.early_exit_margin: float = early_exit_margin
+        self._hit_counts: Counter[str] = Counter()
+        """ordered 引擎中每个标签被识别出的次数，决定匹配顺序"""
+        self.track_alignment: bool = track_alignment
+        self._alignments: dict[AlignmentKey, tuple[tuple[int, int], float]] = {}
+        """每个槽位记住的最佳匹配位置（模板左上角）及当时的分数"""
         self._templates: defaultdict[str, list[MatLike]] = defaultdict(list)
+        self._banks: dict[frozenset[str] | None, TemplateBank] = {}
+        self._coarse_templates: dict[str, list[MatLike]] = {}
+        """金字塔粗匹配层的模板，加载模板时预先缩小"""
+        self._coarse_banks: dict[frozenset[str] | None, TemplateBank] = {}
+        self._binary_banks: dict[frozenset[str] | None, BinaryTemplateBank] = {}
+        self._source_hash: str = ""
+        self._source_key: str = ""
+        self._cache: RecognitionCache | None = (
+            RecognitionCache(cache_size, near_duplicate_distance)
+            if cache_size > 0
+            else None
+        )
         self._suffixes: list[str] = [
             ".png",
             ".jpg",
@@ -72,49 +157,216 @@ class Recognizer:
             ".tif",
         ]
 
+    def _collect_sources(self, templates_dir_path: Path) -> list[tuple[str, Path]]:
+        """
+        遍历一次模板目录，按标签顺序列出所有模板文件。
+
+        标签的模板包括目录下以标签开头的文件，以及与标签同名的子目录中的所有文件。
+        """
+        top_level_files = sorted(
+            path
+            for path in templates_dir_path.iterdir()
+            if path.is_file() and path.suffix.lower() in self._suffixes
+        )
+        sources: list[tuple[str, Path]] = []
+        for label in self.labels:
+            sources.extend(
+                (label, path) for path in top_level_files if path.name.startswith(label)
+            )
+            label_dir = templates_dir_path / label
+            if label_dir.is_dir():
+                sources.extend(
+                    (label, path)
+                    for path in sorted(label_dir.glob("**/*"))
+                    if path.is_file() and path.suffix.lower() in self._suffixes
+                )
+        return sources
+
+    def _read_sources(
+        self, templates_dir_path: Path, source_paths: list[tuple[str, Path]]
+    ) -> list[tuple[str, str, bytes]]:
+        """读取模板源文件，返回 (标签, 相对路径, 文件内容) 列表。"""
+        return [
+            (label, path.relative_to(templates_dir_path).as_posix(), path.read_bytes())
+            for label, path in source_paths
+        ]
+
     def load_templates(self) -> None:
         logger.info(f"正在从目录加载模板: {self.templates_dir}...")
         if not self.templates_dir.is_dir():
             logger.error(f"模板目录未找到: {self.templates_dir}")
             return
 
-        for label in self.labels:
-            with importlib.resources.as_file(self.templates_dir) as templates_dir_path:
-                for path in itertools.chain(
-                    templates_dir_path.glob(label + "*"),
-                    (templates_dir_path / label).glob("**/*"),
-                ):
-                    if path.suffix.lower() in self._suffixes and path.is_file():
+        self._source_hash = ""
+        preprocess_id = describe_preprocess(self.preprocess_template)
+        directories = [packaged_compiled_templates_dir, cached_compiled_templates_dir]
+        with importlib.resources.as_file(self.templates_dir) as templates_dir_path:
+            source_paths = self._collect_sources(templates_dir_path)
+            self._source_key = compute_source_key(
+                source_paths, templates_dir_path, preprocess_id
+            )
+
+            # 优先使用与模板源一致的预编译模板库，省去逐个解码和预处理。
+            # 先只按文件元数据比较，不一致时才读取所有模板源计算内容哈希
+            templates = None
+            for directory in directories:
+                templates = load_compiled_templates(
+                    directory, self.templates_dir.name, source_key=self._source_key
+                )
+                if templates is not None:
+                    logger.debug(
+                        f"已从预编译模板库加载 {len(templates)} 个模板: {directory}"
+                    )
+                    break
+
+            sources = []
+            if templates is None:
+                sources = self._read_sources(templates_dir_path, source_paths)
+                self._source_hash = compute_source_hash(sources, preprocess_id)
+                for directory in directories:
+                    templates = load_compiled_templates(
+                        directory,
+                        self.templates_dir.name,
+                        source_hash=self._source_hash,
+                    )
+                    if templates is not None:
+                        logger.debug(
+                            f"模板源文件的元数据已变化但内容一致，已从预编译模板库加载 "
+                            f"{len(templates)} 个模板: {directory}"
+                        )
+                        # 记录新的源文件键，下次启动时无需再读取模板源。
+                        # 随程序发布的目录可能只读，此时在运行时目录保存一份
                         try:
-                            image = load_image(path, cv2.IMREAD_GRAYSCALE)
-                            image = self.preprocess_template(image)
-                            self._templates[label].append(image)
+                            if directory == cached_compiled_templates_dir:
+                                update_compiled_templates_key(
+                                    directory, self.templates_dir.name, self._source_key
+                                )
+                            else:
+                                self._save_compiled_templates(
+                                    cached_compiled_templates_dir, templates
+                                )
                         except Exception as e:
-                            logger.error(f"加载模板图像失败 {path}: {e}")
+                            logger.warning(f"保存预编译模板库失败: {e}")
+                        break
+
+        if templates is None:
+            templates = []
+            for label, relative_path, content in sources:
+                try:
+                    image = load_image(content, cv2.IMREAD_GRAYSCALE)
+                    image = self.preprocess_template(image)
+                    templates.append((label, image))
+                except Exception as e:
+                    logger.error(f"加载模板图像失败 {relative_path}: {e}")
+            try:
+                self._save_compiled_templates(cached_compiled_templates_dir, templates)
+            except Exception as e:
+                logger.warning(f"保存预编译模板库失败: {e}")
+
+        self._templates.clear()
+        for label, template in templates:
+            self._templates[label].append(template)
+        for label in self.labels:
             if not self._templates[label]:
                 logger.error(f'在 {self.templates_dir} 中未找到标签 "{label}" 的模板')
 
-    def recognize_roi(self, roi_image: MatLike) -> tuple[str | None, float]:
-        """
-        识别 ROI 图像中的短语，返回 (标签, 分数)。
+        self._coarse_templates = {
+            label: [downscale(template) for template in templates]
+            for label, templates in self._templates.items()
+        }
+        self._banks.clear()
+        self._coarse_banks.clear()
+        self._binary_banks.clear()
+        self._hit_counts.clear()
+        self._alignments.clear()
+        if self._cache is not None:
+            self._cache.clear()
 
-        Args:
-            roi_img: ROI 区域的图像（OpenCV 格式）
+    def _save_compiled_templates(
+        self, directory: Path, templates: list[tuple[str, MatLike]]
+    ) -> None:
+        save_compiled_templates(
+            directory,
+            self.templates_dir.name,
+            self._source_hash,
+            templates,
+            self._source_key,
+        )
 
-        Returns:
-            (标签, 分数) 元组。如果无法识别，返回 (None, best_score)。
+    def compile_templates(self, directory: Path) -> None:
+        """加载模板并将其编译为预编译模板库，保存到指定目录。"""
+        self.load_templates()
+        if not self._source_hash:
+            # 按源文件键命中预编译模板库时没有计算内容哈希
+            with importlib.resources.as_file(self.templates_dir) as templates_dir_path:
+                self._source_hash = compute_source_hash(
+                    self._read_sources(
+                        templates_dir_path, self._collect_sources(templates_dir_path)
+                    ),
+                    describe_preprocess(self.preprocess_template),
+                )
+        self._save_compiled_templates(
+            directory,
+            [
+                (label, template)
+                for label, templates in self._templates.items()
+                for template in templates
+            ],
+        )
+
+    def _iter_templates(
+        self, labels: Collection[str] | None
+    ) -> list[tuple[str, list[MatLike]]]:
+        """按加载顺序列出参与匹配的标签及其模板。"""
+        if labels is None:
+            return list(self._templates.items())
+        return [
+            (label, templates)
+            for label, templates in self._templates.items()
+            if label in labels
+        ]
+
+    def _get_bank(
+        self, labels: Collection[str] | None, coarse: bool = False
+    ) -> TemplateBank | BinaryTemplateBank:
         """
+        获取指定标签子集的批量模板库，每个子集只在首次使用时构建一次。
 
-        if not self._templates:
-            self.load_templates()
+        binary 引擎使用二值模板库，其余引擎使用 `TemplateBank`。
 
-        image_height, image_width = roi_image.shape[:2]
-        gray = to_gray_image(roi_image)
+        Args:
+            coarse: 是否使用金字塔粗匹配层的模板
+        """
+        key = None if labels is None else frozenset(labels)
+        banks: dict[frozenset[str] | None, TemplateBank | BinaryTemplateBank]
+        bank_type: type[TemplateBank | BinaryTemplateBank]
+        if coarse:
+            banks, bank_type = self._coarse_banks, TemplateBank
+        elif self.engine == "binary":
+            banks, bank_type = self._binary_banks, BinaryTemplateBank
+        else:
+            banks, bank_type = self._banks, TemplateBank
+        bank = banks.get(key)
+        if bank is None:
+            pairs = [
+                (label, template)
+                for label, templates in self._iter_templates(key)
+                for template in (self._coarse_templates[label] if coarse else templates)
+            ]
+            bank = bank_type(
+                [label for label, _template in pairs],
+                [template for _label, template in pairs],
+            )
+            banks[key] = bank
+        return bank
 
-        best_label = None
-        best_label_name = "无匹配"
-        best_score = -float("inf")
-        for label, templates in self._templates.items():
+    def _match_loop(
+        self, gray: MatLike, labels: Collection[str] | None
+    ) -> dict[str, float]:
+        """逐个模板调用 `cv2.matchTemplate`，返回每个标签的最高分数。"""
+        image_height, image_width = gray.shape[:2]
+        scores: dict[str, float] = {}
+        for label, templates in self._iter_templates(labels):
             label_name = get_label_name(label)
             for template in templates:
                 template_height, template_width = template.shape[:2]
@@ -127,10 +379,253 @@ class Recognizer:
                 result = cv2.matchTemplate(gray, template, cv2.TM_CCOEFF_NORMED)
                 _minVal, maxVal, _minLoc, _maxLoc = cv2.minMaxLoc(result)
                 logger.trace(f"模板匹配: 最佳匹配={label_name} 分数={maxVal:.3f}")
-                if maxVal > best_score:
-                    best_score = maxVal
-                    best_label = label
-                    best_label_name = label_name
+                if maxVal > scores.get(label, -float("inf")):
+                    scores[label] = maxVal
+        return scores
+
+    def _match_ordered(
+        self, gray: MatLike, labels: Collection[str] | None, stop_score: float | None
+    ) -> dict[str, float]:
+        """
+        先按历史命中次数从高到低逐个匹配经常命中的标签，分数足够高时提前结束；
+        否则用批量模板库匹配全部标签。
+
+        逐个匹配一个模板的耗时约为批量匹配全部模板的几分之一，标签分布均匀时逐个匹配
+        几乎不会提前结束，反而比直接批量匹配更慢，因此只逐个匹配命中占比不低于
+        `ORDERED_MIN_HIT_SHARE` 的标签。
+
+        Args:
+            stop_score: 某个模板的分数达到此值时不再匹配其余模板，为 None 时直接批量匹配
+        """
+        if stop_score is not None:
+            image_height, image_width = gray.shape[:2]
+            hit_counts = self._hit_counts
+            candidates = list(self._iter_templates(labels))
+            min_hits = ORDERED_MIN_HIT_SHARE * sum(
+                hit_counts[label] for label, _templates in candidates
+            )
+            ordered = sorted(
+                (item for item in candidates if hit_counts[item[0]] >= min_hits > 0),
+                key=lambda item: -hit_counts[item[0]],
+            )
+            scores: dict[str, float] = {}
+            correlations = 0
+            for label, templates in ordered:
+                for template in templates:
+                    template_height, template_width = template.shape[:2]
+                    if image_height < template_height or image_width < template_width:
+                        continue
+                    result = cv2.matchTemplate(gray, template, cv2.TM_CCOEFF_NORMED)
+                    _minVal, maxVal, _minLoc, _maxLoc = cv2.minMaxLoc(result)
+                    correlations += 1
+                    if maxVal > scores.get(label, -float("inf")):
+                        scores[label] = maxVal
+                    if maxVal >= stop_score:
+                        metrics.increment(
+                            "template_correlations",
+                            correlations,
+                            recognizer=self.templates_dir.name,
+                        )
+                        hit_counts[label] += 1
+                        return scores
+            metrics.increment(
+                "template_correlations",
+                correlations,
+                recognizer=self.templates_dir.name,
+            )
+
+        scores = self._get_bank(labels).match(gray)
+        if stop_score is not None and scores:
+            best_label = max(scores, key=scores.__getitem__)
+            if scores[best_label] >= self.high_thresh:
+                self._hit_counts[best_label] += 1
+        return scores
+
+    def _match_pyramid(
+        self, gray: MatLike, labels: Collection[str] | None
+    ) -> dict[str, float]:
+        """
+        金字塔匹配，只返回候选标签在原分辨率下的分数。
+
+        先在缩小的图像上匹配所有模板，按分数排出前 `PYRAMID_CANDIDATES` 个候选及其大致位置，
+        再在原分辨率下只在该位置附近验证候选的模板。返回的分数与完整搜索一样是
+        原分辨率下的 TM_CCOEFF_NORMED 分数，因此阈值的含义不变。
+        """
+        located = self._get_bank(labels, coarse=True).locate(downscale(gray))
+        if not located:
+            return self._get_bank(labels).match(gray)
+
+        candidates = sorted(located.items(), key=lambda item: -item[1][0])
+        scores: dict[str, float] = {}
+        for label, (_coarse_score, (x, y)) in candidates[:PYRAMID_CANDIDATES]:
+            top_left = (round(x / PYRAMID_SCALE), round(y / PYRAMID_SCALE))
+            scores.update(
+                self._get_bank([label]).match_window(
+                    gray, top_left, PYRAMID_VERIFY_RADIUS
+                )
+            )
+        return scores
+
+    def _match(
+        self,
+        gray: MatLike,
+        labels: Collection[str] | None,
+        stop_score: float | None = None,
+    ) -> dict[str, float]:
+        """
+        使用当前引擎计算每个标签的最高分数。
+
+        Args:
+            stop_score: 提前结束的分数，只对 ordered 引擎有效，此时只返回已匹配标签的分数
+        """
+        if self.engine in ("batched", "binary"):
+            return self._get_bank(labels).match(gray)
+        if self.engine == "ordered":
+            return self._match_ordered(gray, labels, stop_score)
+        if self.engine == "pyramid":
+            return self._match_pyramid(gray, labels)
+        return self._match_loop(gray, labels)
+
+    def _find_best_aligned(
+        self, gray: MatLike, labels: Collection[str] | None, key: AlignmentKey
+    ) -> tuple[str, float] | None:
+        """
+        在记住的位置附近的小窗口内匹配所有模板。
+
+        尚未记住位置，或窗口内的最高分低于 high_thresh、明显低于记住位置时的分数时返回 None，
+        由调用方回退到完整搜索。
+        """
+        alignment = self._alignments.get(key)
+        if alignment is None:
+            return None
+        top_left, aligned_score = alignment
+        scores = self._get_bank(labels).match_window(gray, top_left, ALIGNMENT_RADIUS)
+        if scores:
+            best_label = max(scores, key=scores.__getitem__)
+            best_score = scores[best_label]
+            if best_score >= max(
+                self.high_thresh, aligned_score - ALIGNMENT_SCORE_DROP
+            ):
+                return best_label, best_score
+        metrics.increment("alignment_fallbacks", recognizer=self.templates_dir.name)
+        return None
+
+    def _learn_alignment(
+        self, gray: MatLike, key: AlignmentKey, label: str, score: float
+    ) -> None:
+        """记住标签的模板在 ROI 中的最佳匹配位置（多一次模板匹配）。"""
+        image_height, image_width = gray.shape[:2]
+        best_location = None
+        best_score = -float("inf")
+        for template in self._templates[label]:
+            template_height, template_width = template.shape[:2]
+            if image_height < template_height or image_width < template_width:
+                continue
+            result = cv2.matchTemplate(gray, template, cv2.TM_CCOEFF_NORMED)
+            _minVal, maxVal, _minLoc, maxLoc = cv2.minMaxLoc(result)
+            if maxVal > best_score:
+                best_score = maxVal
+                best_location = maxLoc
+        if best_location is not None:
+            self._alignments[key] = ((best_location[0], best_location[1]), score)
+
+    def _find_best(
+        self, gray: MatLike, labels: Collection[str] | None
+    ) -> tuple[str | None, float]:
+        """返回分数最高的标签及其分数（不做阈值判断）。"""
+        key: AlignmentKey | None = None
+        if self.track_alignment:
+            key = (gray.shape[:2], None if labels is None else frozenset(labels))
+            aligned = self._find_best_aligned(gray, labels, key)
+            if aligned is not None:
+                return aligned
+
+        best_label = None
+        best_score = -float("inf")
+        stop_score = self.high_thresh + self.early_exit_margin
+        for label, score in self._match(gray, labels, stop_score).items():
+            if score > best_score:
+                best_score = score
+                best_label = label
+        if (
+            key is not None
+            and best_label is not None
+            and best_score >= self.high_thresh
+        ):
+            self._learn_alignment(gray, key, best_label, float(best_score))
+        return best_label, float(best_score)
+
+    def score_labels(
+        self, roi_image: MatLike, labels: Collection[str] | None = None
+    ) -> dict[str, float]:
+        """
+        计算 ROI 图像与每个标签的最高匹配分数（不做阈值判断，不使用识别缓存）。
+
+        用于评估识别器，例如比较最高分与次高分之间的差距。ordered 引擎在这里不会提前结束，
+        pyramid 引擎只返回粗匹配中排名靠前的候选标签的分数。
+        """
+        if not self._templates:
+            self.load_templates()
+        return {
+            label: float(score)
+            for label, score in self._match(to_gray_image(roi_image), labels).items()
+        }
+
+    def rank_roi(
+        self, roi_image: MatLike, labels: Collection[str] | None = None, k: int = 2
+    ) -> RankedMatch:
+        """
+        返回分数最高的 k 个候选标签及最高分与次高分之差，供需要判断识别是否含糊的调用方使用。
+
+        与 `score_labels` 一样匹配所有模板，不做阈值判断，不使用识别缓存。
+        """
+        ranked = sorted(
+            self.score_labels(roi_image, labels).items(),
+            key=lambda item: item[1],
+            reverse=True,
+        )
+        margin = ranked[0][1] - ranked[1][1] if len(ranked) > 1 else None
+        return RankedMatch(ranked[:k], margin)
+
+    def cache_info(self) -> CacheInfo | None:
+        """识别结果缓存的命中统计，未启用缓存时返回 None。"""
+        return self._cache.info() if self._cache is not None else None
+
+    def recognize_roi(
+        self, roi_image: MatLike, labels: Collection[str] | None = None
+    ) -> tuple[str | None, float]:
+        """
+        识别 ROI 图像中的短语，返回 (标签, 分数)。
+
+        Args:
+            roi_img: ROI 区域的图像（OpenCV 格式）
+            labels: 只在这些标签中匹配（例如某个属性槽位可能出现的标签），为 None 时匹配全部标签
+
+        Returns:
+            (标签, 分数) 元组。如果无法识别，返回 (None, best_score)。
+        """
+
+        if not self._templates:
+            self.load_templates()
+
+        start = time.perf_counter()
+        with tracer.span("recognize_roi", recognizer=self.templates_dir.name) as span:
+            gray = to_gray_image(roi_image)
+            if self._cache is not None:
+                best_label, best_score = self._cache.get_or_compute(
+                    gray,
+                    None if labels is None else frozenset(labels),
+                    lambda: self._find_best(gray, labels),
+                )
+            else:
+                best_label, best_score = self._find_best(gray, labels)
+            span.set(label=best_label, score=round(float(best_score), 4))
+        metrics.observe(
+            "recognize_roi_seconds",
+            time.perf_counter() - start,
+            recognizer=self.templates_dir.name,
+        )
+        best_label_name = "无匹配" if best_label is None else get_label_name(best_label)
 
         if best_score >= self.high_thresh:
             return best_label, float(best_score)
@@ -0,0 +1,402 @@
+"""扫描录像。
+
+录像是一个 zip 文件，记录一次真实扫描中的全部截图、点击、滚动及其时间戳：
+
+- `manifest.json`：格式版本、客户区尺寸、录制时的配置和扫描参数、时长
+- `events.jsonl`：按发生顺序排列的事件，每行一个 JSON 对象
+- `frames/<摘要>.png`：去重后的画面，内容相同的截图只保存一次
+
+`RecordingDriver` 在扫描时写入录像，`ReplayDriver` 把录像中的画面按原来的操作顺序
+回放给扫描器，不需要窗口和输入后端。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import queue
+import threading
+import time
+import zipfile
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import cv2
+import numpy as np
+
+from endfield_essence_recognizer.driver import GameDriver
+from endfield_essence_recognizer.image import Frame, load_image
+from endfield_essence_recognizer.log import logger
+from endfield_essence_recognizer.path import ROOT_DIR
+
+if TYPE_CHECKING:
+    from cv2.typing import MatLike
+
+    from endfield_essence_recognizer.image import Scope
+
+recordings_dir = ROOT_DIR / "recordings"
+"""扫描录像的默认保存目录"""
+RECORDING_FORMAT_VERSION = 1
+"""录像格式版本，格式变化时递增"""
+REPLAY_FRAME_CACHE_SIZE = 64
+"""回放时缓存的已解码画面数量"""
+REPLAY_RESYNC_WINDOW = 8
+"""回放中的操作与录像不一致时，向后查找相同操作的最大步数"""
+
+type RegionKey = tuple[int, int, int, int]
+
+
+def _region_key(region: Scope) -> RegionKey:
+    (left, top), (right, bottom) = region
+    return int(left), int(top), int(right), int(bottom)
+
+
+def _contains(outer: RegionKey, inner: RegionKey) -> bool:
+    return (
+        outer[0] <= inner[0]
+        and outer[1] <= inner[1]
+        and outer[2] >= inner[2]
+        and outer[3] >= inner[3]
+    )
+
+
+def frame_digest(image: MatLike) -> str:
+    """画面摘要，尺寸和像素完全相同的画面摘要相同。"""
+    array = np.ascontiguousarray(image)
+    digest = hashlib.blake2b(str(array.shape).encode(), digest_size=16)
+    digest.update(array.data)
+    return digest.hexdigest()
+
+
+def new_recording_path() -> Path:
+    """按当前时间生成一个新的录像文件路径。"""
+    return recordings_dir / time.strftime("scan-%Y%m%d-%H%M%S.zip")
+
+
+def describe_event(event: dict[str, Any]) -> str:
+    """操作事件的简短描述。"""
+    if event["type"] == "click":
+        return f"点击 ({event['x']}, {event['y']})"
+    if event["type"] == "scroll":
+        return f"在 ({event['x']}, {event['y']}) 滚动 {event['ticks']}"
+    return event["type"]
+
+
+class RecordingWriter:
+    """
+    录像写入器。
+
+    PNG 编码和写入在后台线程中进行，扫描线程只计算摘要并复制新出现的画面，
+    尽量不影响扫描本身的时序。
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path: Path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._zip = zipfile.ZipFile(path, "w")
+        self._frames: queue.Queue[tuple[str, np.ndarray] | None] = queue.Queue()
+        self._digests: set[str] = set()
+        self._thread = threading.Thread(target=self._write_frames, daemon=True)
+        self._thread.start()
+
+    def add_frame(self, image: MatLike) -> str:
+        """添加一帧画面，返回其摘要。已经保存过的画面不会重复保存。"""
+        digest = frame_digest(image)
+        if digest not in self._digests:
+            self._digests.add(digest)
+            self._frames.put((digest, np.array(image, copy=True)))
+        return digest
+
+    def _write_frames(self) -> None:
+        while (item := self._frames.get()) is not None:
+            digest, image = item
+            success, buffer = cv2.imencode(".png", image)
+            if not success:
+                logger.warning(f"录像画面编码失败：{digest}")
+                continue
+            # PNG 已经压缩过，不再用 deflate 压缩
+            self._zip.writestr(f"frames/{digest}.png", buffer.tobytes())
+
+    @property
+    def frame_count(self) -> int:
+        """去重后的画面数量"""
+        return len(self._digests)
+
+    def close(self, manifest: dict[str, Any], events: list[dict[str, Any]]) -> None:
+        """等待所有画面写入完成，写入事件和清单后关闭文件。"""
+        self._frames.put(None)
+        self._thread.join()
+        self._zip.writestr(
+            "events.jsonl",
+            "".join(json.dumps(event, ensure_ascii=False) + "\n" for event in events),
+            compress_type=zipfile.ZIP_DEFLATED,
+        )
+        self._zip.writestr(
+            "manifest.json",
+            json.dumps(manifest, ensure_ascii=False, indent=2),
+            compress_type=zipfile.ZIP_DEFLATED,
+        )
+        self._zip.close()
+
+
+class ScanRecording:
+    """读取扫描录像，画面按需解码并缓存。"""
+
+    def __init__(self, path: Path | str) -> None:
+        self.path: Path = Path(path)
+        self._zip = zipfile.ZipFile(self.path)
+        self.manifest: dict[str, Any] = json.loads(self._zip.read("manifest.json"))
+        if self.manifest.get("version") != RECORDING_FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported recording version: {self.manifest.get('version')}"
+            )
+        self.events: list[dict[str, Any]] = [
+            json.loads(line)
+            for line in self._zip.read("events.jsonl").decode("utf-8").splitlines()
+            if line
+        ]
+        self._cache: OrderedDict[str, MatLike] = OrderedDict()
+
+    @property
+    def duration(self) -> float:
+        """录制时扫描的时长（秒）"""
+        return float(self.manifest.get("duration", 0.0))
+
+    def frame(self, digest: str) -> MatLike:
+        """按摘要取出画面，返回的数组只读。"""
+        image = self._cache.get(digest)
+        if image is not None:
+            self._cache.move_to_end(digest)
+            return image
+        image = load_image(self._zip.read(f"frames/{digest}.png"))
+        image.flags.writeable = False
+        self._cache[digest] = image
+        if len(self._cache) > REPLAY_FRAME_CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return image
+
+    def close(self) -> None:
+        self._zip.close()
+
+
+class RecordingDriver(GameDriver):
+    """包装另一个驱动，把每次截图、点击和滚动连同时间戳写入录像。"""
+
+    def __init__(
+        self, driver: GameDriver, path: Path, metadata: dict[str, Any] | None = None
+    ) -> None:
+        self._driver: GameDriver = driver
+        self._writer = RecordingWriter(path)
+        self._metadata: dict[str, Any] = metadata or {}
+        self._events: list[dict[str, Any]] = []
+        self._screenshot_count = 0
+        self._client_size: tuple[int, int] | None = None
+        self._start = time.perf_counter()
+        self._started_at = time.time()
+
+    def _record(self, event_type: str, **fields: Any) -> None:
+        elapsed = round(time.perf_counter() - self._start, 4)
+        self._events.append({"t": elapsed, "type": event_type, **fields})
+
+    def activate(self) -> bool:
+        return self._driver.activate()
+
+    def is_active(self) -> bool:
+        active = self._driver.is_active()
+        if not active:
+            self._record("inactive")
+        return active
+
+    def client_size(self) -> tuple[int, int]:
+        self._client_size = self._driver.client_size()
+        return self._client_size
+
+    def screenshot(self, relative_region: Scope, copy: bool = True) -> MatLike:
+        image = self._driver.screenshot(relative_region, copy)
+        self._screenshot_count += 1
+        self._record(
+            "screenshot",
+            region=list(_region_key(relative_region)),
+            frame=self._writer.add_frame(image),
+        )
+        return image
+
+    def click(self, x: int, y: int) -> None:
+        self._record("click", x=x, y=y)
+        self._driver.click(x, y)
+
+    def scroll(self, x: int, y: int, ticks: int) -> None:
+        self._record("scroll", x=x, y=y, ticks=ticks)
+        self._driver.scroll(x, y, ticks)
+
+    def close(self) -> None:
+        manifest = {
+            "version": RECORDING_FORMAT_VERSION,
+            "started_at": self._started_at,
+            "duration": round(time.perf_counter() - self._start, 4),
+            "client_size": self._client_size,
+            "screenshots": self._screenshot_count,
+            "frames": self._writer.frame_count,
+            **self._metadata,
+        }
+        self._writer.close(manifest, self._events)
+        self._driver.close()
+        size = self._writer.path.stat().st_size / 1024 / 1024
+        logger.info(
+            f"扫描录像已保存到 {self._writer.path}（{self._screenshot_count} 次截图，"
+            f"去重后 {self._writer.frame_count} 帧，{size:.1f} MB）"
+        )
+
+
+@dataclass
+class _ReplaySegment:
+    """录像中两次操作之间的一段，回放时画面只在同一段内推进。"""
+
+    action: dict[str, Any] | None
+    """开始这一段的操作，第一段为 None"""
+    frames: dict[RegionKey, list[str]] = field(default_factory=dict)
+    """这一段内各区域依次截到的画面摘要"""
+    inactive: bool = False
+    """这一段内窗口是否离开过前台"""
+
+
+class ReplayDriver(GameDriver):
+    """
+    从录像中回放画面的驱动。
+
+    扫描器每执行一次点击或滚动，回放就前进到录像中对应操作之后的一段；
+    同一段内对同一区域的截图依次返回录像中的画面，取完后重复最后一帧（画面已经稳定）。
+    回放中的操作与录像不一致时记录为分歧，并在之后几步内寻找相同的操作重新对齐。
+    """
+
+    def __init__(self, recording: ScanRecording) -> None:
+        self._recording: ScanRecording = recording
+        self._segments: list[_ReplaySegment] = [_ReplaySegment(None)]
+        for event in recording.events:
+            if event["type"] in ("click", "scroll"):
+                self._segments.append(_ReplaySegment(event))
+            elif event["type"] == "screenshot":
+                key: RegionKey = tuple(event["region"])  # type: ignore[assignment]
+                self._segments[-1].frames.setdefault(key, []).append(event["frame"])
+            elif event["type"] == "inactive":
+                self._segments[-1].inactive = True
+        self._index = 0
+        self._cursors: dict[RegionKey, int] = {}
+        self._latest: dict[RegionKey, str] = {}
+        self.exhausted: bool = False
+        """录像中的操作已经全部回放完"""
+        self.divergences: list[str] = []
+        """回放与录像之间的分歧"""
+        self.replayed_actions: list[dict[str, Any]] = []
+        """回放中扫描器执行的全部操作"""
+        self.matched_actions: int = 0
+        """与录像一致的操作数量"""
+        self.frames_served: int = 0
+        """回放的截图次数"""
+        self.frames_repeated: int = 0
+        """录像中的画面取完后重复返回最后一帧的次数"""
+
+    @property
+    def segment(self) -> _ReplaySegment:
+        return self._segments[self._index]
+
+    def activate(self) -> bool:
+        return True
+
+    def is_active(self) -> bool:
+        return not self.exhausted and not self.segment.inactive
+
+    def client_size(self) -> tuple[int, int]:
+        width, height = self._recording.manifest["client_size"]
+        return width, height
+
+    def _next_frame(self, key: RegionKey) -> tuple[RegionKey, str] | None:
+        frames = self.segment.frames.get(key)
+        if frames:
+            cursor = self._cursors.get(key, 0)
+            if cursor >= len(frames):
+                self.frames_repeated += 1
+                return key, frames[-1]
+            self._cursors[key] = cursor + 1
+            return key, frames[cursor]
+        # 这一段内没有单独截图过这个区域，优先从这一段内包含它的更大区域中裁出，
+        # 其次使用之前各段中最后的画面
+        candidates = [
+            (other, frames[max(self._cursors.get(other, 0) - 1, 0)])
+            for other, frames in self.segment.frames.items()
+        ]
+        if key in self._latest:
+            candidates.append((key, self._latest[key]))
+        candidates += self._latest.items()
+        for other, digest in candidates:
+            if _contains(other, key):
+                return other, digest
+        return None
+
+    def screenshot(self, relative_region: Scope, copy: bool = True) -> MatLike:
+        key = _region_key(relative_region)
+        found = self._next_frame(key)
+        if found is None:
+            raise LookupError(f"Region {relative_region} not found in recording")
+        source, digest = found
+        self.frames_served += 1
+        image = self._recording.frame(digest)
+        if source != key:
+            image = Frame(image, ((source[0], source[1]), (source[2], source[3]))).crop(
+                relative_region
+            )
+        return np.array(image, copy=True) if copy else image
+
+    def _advance(self, index: int) -> None:
+        """前进到第 index 段，记住跳过的各段中每个区域最后的画面。"""
+        for segment in self._segments[self._index : index]:
+            for key, frames in segment.frames.items():
+                self._latest[key] = frames[-1]
+        self._index = index
+        self._cursors.clear()
+
+    def _act(self, event: dict[str, Any]) -> None:
+        self.replayed_actions.append(event)
+        if self.exhausted:
+            return
+        step = self._index + 1
+        if step >= len(self._segments):
+            self.exhausted = True
+            self.divergences.append(
+                f"录像已结束，回放中还有后续操作：{describe_event(event)}"
+            )
+            return
+        end = min(step + REPLAY_RESYNC_WINDOW, len(self._segments))
+        for index in range(step, end):
+            action = self._segments[index].action
+            if action is not None and all(action.get(k) == v for k, v in event.items()):
+                for skipped in self._segments[step:index]:
+                    missing = skipped.action or {}
+                    self.divergences.append(
+                        f"{missing['t']:.2f}s 回放中缺少操作：{describe_event(missing)}"
+                    )
+                self._advance(index)
+                self.matched_actions += 1
+                return
+        expected = self._segments[step].action or {}
+        self.divergences.append(
+            f"{expected['t']:.2f}s 回放中多出操作：{describe_event(event)}"
+            f"（录像中为{describe_event(expected)}）"
+        )
+
+    def click(self, x: int, y: int) -> None:
+        self._act({"type": "click", "x": x, "y": y})
+
+    def scroll(self, x: int, y: int, ticks: int) -> None:
+        self._act({"type": "scroll", "x": x, "y": y, "ticks": ticks})
+
+    @property
+    def unreplayed_actions(self) -> list[dict[str, Any]]:
+        """录像中还没有回放到的操作"""
+        return [
+            segment.action
+            for segment in self._segments[self._index + 1 :]
+            if segment.action is not None
+        ]
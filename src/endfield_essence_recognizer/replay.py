@@ -0,0 +1,178 @@
+"""离线回放扫描录像。
+
+用录像驱动 `EssenceScanner` 重新跑一遍扫描（不需要游戏窗口，可在 Linux 上运行），
+报告吞吐量以及扫描器的操作与录像之间的分歧，用于在修改识别、中止判断或翻页逻辑后
+确认决策没有变化并比较速度：
+
+    eer replay recordings/scan-20260101-120000.zip
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from endfield_essence_recognizer.config import config
+from endfield_essence_recognizer.essence_scanner import (
+    EssenceScanner,
+    essence_icon_x_list,
+    essence_icon_y_list,
+)
+from endfield_essence_recognizer.inventory import InventoryStore
+from endfield_essence_recognizer.log import logger
+from endfield_essence_recognizer.recording import (
+    ReplayDriver,
+    ScanRecording,
+    describe_event,
+)
+
+MAX_REPORTED_DIVERGENCES = 20
+"""报告中最多列出的分歧数量"""
+
+
+def _count_essence_clicks(actions: list[dict[str, Any]]) -> int:
+    """操作中点击基质图标的次数。"""
+    xs = {int(x) for x in essence_icon_x_list}
+    ys = {int(y) for y in essence_icon_y_list}
+    return sum(
+        1
+        for action in actions
+        if action["type"] == "click" and action["x"] in xs and action["y"] in ys
+    )
+
+
+@dataclass
+class ReplayReport:
+    recording: Path
+    """录像路径"""
+    recorded_duration: float
+    """录制时扫描的时长（秒）"""
+    replay_duration: float
+    """回放的时长（秒）"""
+    recorded_essences: int
+    """录制时点击基质的次数"""
+    replayed_essences: int
+    """回放时点击基质的次数"""
+    matched_actions: int
+    """与录像一致的操作数量"""
+    frames_served: int
+    """回放的截图次数"""
+    frames_repeated: int
+    """录像中的画面取完后重复返回最后一帧的次数"""
+    divergences: list[str] = field(default_factory=list)
+    """回放与录像之间的分歧"""
+
+    @property
+    def throughput(self) -> float:
+        """回放时每秒扫描的基质数量"""
+        if self.replay_duration <= 0:
+            return 0.0
+        return self.replayed_essences / self.replay_duration
+
+    def format(self) -> str:
+        recorded_throughput = (
+            self.recorded_essences / self.recorded_duration
+            if self.recorded_duration > 0
+            else 0.0
+        )
+        lines = [
+            f"录像: {self.recording}",
+            (
+                f"录制: {self.recorded_essences} 次基质点击，{self.recorded_duration:.1f}s，"
+                f"{recorded_throughput:.2f} 个/秒"
+            ),
+            (
+                f"回放: {self.replayed_essences} 次基质点击，{self.replay_duration:.1f}s，"
+                f"{self.throughput:.2f} 个/秒"
+            ),
+            f"截图: {self.frames_served} 次，其中 {self.frames_repeated} 次重复最后一帧",
+            f"一致的操作: {self.matched_actions}，分歧: {len(self.divergences)}",
+        ]
+        lines += [f"  - {d}" for d in self.divergences[:MAX_REPORTED_DIVERGENCES]]
+        if len(self.divergences) > MAX_REPORTED_DIVERGENCES:
+            lines.append(
+                f"  ...（另有 {len(self.divergences) - MAX_REPORTED_DIVERGENCES} 条）"
+            )
+        return "\n".join(lines)
+
+
+def replay_scan(path: Path | str, scan_mode: str | None = None) -> ReplayReport:
+    """
+    回放一个扫描录像。
+
+    回放使用录制时的配置，但不读写基质库存和扫描断点，因此录制时启用的增量扫描不会重现。
+
+    Args:
+        path: 录像路径
+        scan_mode: 扫描模式，为 None 时使用录制时的扫描模式
+    """
+    from endfield_essence_recognizer import create_recognizers
+
+    recording = ScanRecording(path)
+    manifest = recording.manifest
+    if "config" in manifest:
+        # 只更新内存中的配置，不保存
+        config.update_from_dict(manifest["config"])
+    if manifest.get("incremental"):
+        logger.warning("录制时启用了增量扫描，回放时不使用基质库存，结果可能不同。")
+
+    text_recognizer, icon_recognizer = create_recognizers()
+    text_recognizer.load_templates()
+    icon_recognizer.load_templates()
+
+    driver = ReplayDriver(recording)
+    scanner = EssenceScanner(
+        text_recognizer=text_recognizer,
+        icon_recognizer=icon_recognizer,
+        driver=driver,
+        scan_mode=scan_mode or manifest.get("scan_mode", "serial"),  # type: ignore[arg-type]
+        badge_skip=config.badge_skip,
+        inventory=InventoryStore(":memory:"),
+        checkpoints=False,
+    )
+    start = time.perf_counter()
+    scanner.start()
+    scanner.join()
+    replay_duration = time.perf_counter() - start
+
+    divergences = list(driver.divergences)
+    divergences += [
+        f"{action['t']:.2f}s 回放中缺少操作：{describe_event(action)}"
+        for action in driver.unreplayed_actions
+    ]
+    recorded_actions = [
+        event for event in recording.events if event["type"] in ("click", "scroll")
+    ]
+    recording.close()
+    return ReplayReport(
+        recording=Path(path),
+        recorded_duration=recording.duration,
+        replay_duration=replay_duration,
+        recorded_essences=_count_essence_clicks(recorded_actions),
+        replayed_essences=_count_essence_clicks(driver.replayed_actions),
+        matched_actions=driver.matched_actions,
+        frames_served=driver.frames_served,
+        frames_repeated=driver.frames_repeated,
+        divergences=divergences,
+    )
+
+
+def main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(
+        prog="eer replay", description="离线回放扫描录像，报告吞吐量和与录像的分歧"
+    )
+    parser.add_argument("recording", type=Path, help="扫描录像路径")
+    parser.add_argument(
+        "--scan-mode",
+        choices=["serial", "pipelined"],
+        default=None,
+        help="扫描模式，默认使用录制时的扫描模式",
+    )
+    args = parser.parse_args(argv)
+
+    report = replay_scan(args.recording, args.scan_mode)
+    logger.info(f"回放结果:\n{report.format()}")
+    raise SystemExit(1 if report.divergences else 0)
@@ -9,6 +9,7 @@ import uvicorn
 from dotenv import load_dotenv
 from fastapi import Body, FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 
 from endfield_essence_recognizer import supported_window_titles, toggle_scan
@@ -94,6 +95,34 @@ async def post_config(new_config: dict[str, Any] = Body()) -> dict[str, Any]:
     return config.model_dump()
 
 
+@app.get("/api/inventory")
+async def get_inventory(
+    attribute: str | None = None,
+    secondary: str | None = None,
+    skill: str | None = None,
+    locked: str | None = None,
+    deprecated: str | None = None,
+    limit: int = 100,
+) -> list[dict[str, Any]]:
+    from endfield_essence_recognizer.inventory import get_inventory_store
+
+    return get_inventory_store().query(
+        attribute=attribute,
+        secondary=secondary,
+        skill=skill,
+        locked=locked,
+        deprecated=deprecated,
+        limit=limit,
+    )
+
+
+@app.get("/api/inventory/summary")
+async def get_inventory_summary() -> dict[str, Any]:
+    from endfield_essence_recognizer.inventory import get_inventory_store
+
+    return get_inventory_store().summary()
+
+
 @app.get("/api/screenshot")
 async def get_screenshot(
     width: int = 1920,
@@ -144,6 +173,28 @@ async def get_screenshot(
     return f"data:{mime_type};base64,{base64_string}"
 
 
+@app.get("/api/metrics", response_model=None)
+async def get_metrics(
+    format: Literal["json", "prometheus"] = "json",  # noqa: A002
+) -> dict[str, Any] | PlainTextResponse:
+    """本次扫描各阶段的耗时直方图和计数器，每次开始扫描时清零。"""
+    from endfield_essence_recognizer.metrics import metrics
+
+    if format == "prometheus":
+        return PlainTextResponse(
+            metrics.to_prometheus(), media_type="text/plain; version=0.0.4"
+        )
+    return metrics.snapshot()
+
+
+@app.get("/api/trace")
+async def get_trace() -> dict[str, Any]:
+    """最近一次启用追踪的扫描的时间线（Chrome 追踪事件格式），扫描进行中时返回已记录的部分。"""
+    from endfield_essence_recognizer.tracing import tracer
+
+    return tracer.to_chrome_trace()
+
+
 @app.get("/api/version")
 async def get_version() -> str | None:
     return __version__
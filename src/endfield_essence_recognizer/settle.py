@@ -0,0 +1,151 @@
+"""界面稳定检测。
+
+点击或滚动后不再固定等待，而是反复截取相关区域并计算廉价的图像指纹：
+画面先相对操作前发生变化、随后连续几次保持不变，即认为界面已经稳定；
+画面在一小段时间内始终与操作前相同（例如已经滚动到底部），则认为操作没有引起变化。
+"""
+
+import time
+from collections import defaultdict
+from collections.abc import Callable
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+from cv2.typing import MatLike
+
+from endfield_essence_recognizer.image import to_gray_image
+from endfield_essence_recognizer.metrics import metrics
+from endfield_essence_recognizer.tracing import tracer
+
+FINGERPRINT_SCALE = 0.25
+"""指纹相对原图的缩放比例"""
+FINGERPRINT_PIXEL_DELTA = 16
+"""指纹中单个像素的灰度差超过此值才视为变化"""
+SETTLE_CHANGE_THRESHOLD = 0.002
+"""变化像素比例超过此值认为画面相对操作前发生了变化"""
+SETTLE_STABLE_THRESHOLD = 0.0005
+"""变化像素比例不超过此值认为相邻两次截图相同"""
+SETTLE_STABLE_POLLS = 2
+"""画面需要连续保持不变的截图次数"""
+SETTLE_POLL_INTERVAL = 0.015
+"""两次截图之间的间隔（秒）"""
+
+
+def image_fingerprint(image: MatLike) -> np.ndarray:
+    """计算图像指纹：缩小后的灰度图。"""
+    gray = to_gray_image(image)
+    return cv2.resize(
+        gray,
+        None,
+        fx=FINGERPRINT_SCALE,
+        fy=FINGERPRINT_SCALE,
+        interpolation=cv2.INTER_AREA,
+    )
+
+
+def fingerprint_distance(a: np.ndarray, b: np.ndarray) -> float:
+    """两个指纹之间的距离：变化像素所占比例，尺寸不同时返回 1。"""
+    if a.shape != b.shape:
+        return 1.0
+    changed = cv2.absdiff(a, b) > FINGERPRINT_PIXEL_DELTA
+    return float(np.count_nonzero(changed)) / changed.size
+
+
+@dataclass
+class SettleResult:
+    image: MatLike
+    """最后一次截图"""
+    fingerprint: np.ndarray
+    """最后一次截图的指纹"""
+    latency: float
+    """从开始等待到返回经过的时间（秒）"""
+    changed: bool
+    """画面是否相对操作前发生了变化"""
+    timed_out: bool
+    """是否因超时返回"""
+
+
+@tracer.traced("settle")
+def wait_for_settle(
+    grab: Callable[[], MatLike],
+    baseline: np.ndarray | None,
+    timeout: float,
+    poll_interval: float = SETTLE_POLL_INTERVAL,
+    stable_polls: int = SETTLE_STABLE_POLLS,
+    *,
+    unchanged_window: float,
+) -> SettleResult:
+    """
+    等待界面在操作后稳定下来。
+
+    Args:
+        grab: 截取相关区域的函数
+        baseline: 操作前该区域的指纹，为 None 时只等待画面稳定
+        timeout: 最长等待时间（秒），超时后返回最后一次截图
+        poll_interval: 两次截图之间的间隔（秒）
+        stable_polls: 画面变化后需要连续保持不变的截图次数
+        unchanged_window: 画面持续与 baseline 相同超过此时间（秒）即返回未变化，不等到超时。
+            界面开始响应所需的时间因操作而异，由调用方按操作设置
+
+    Returns:
+        稳定检测结果，其中 `image` 可以直接用于识别，省去一次截图
+    """
+    start = time.perf_counter()
+    changed = baseline is None
+    previous: np.ndarray | None = None
+    stable_count = 0
+    while True:
+        with tracer.span("capture"):
+            image = grab()
+        fingerprint = image_fingerprint(image)
+        elapsed = time.perf_counter() - start
+
+        if not changed:
+            if fingerprint_distance(fingerprint, baseline) > SETTLE_CHANGE_THRESHOLD:  # type: ignore[arg-type]
+                changed = True
+        elif (
+            previous is not None
+            and fingerprint_distance(fingerprint, previous) <= SETTLE_STABLE_THRESHOLD
+        ):
+            stable_count += 1
+        else:
+            stable_count = 0
+
+        if changed and stable_count >= stable_polls:
+            return SettleResult(image, fingerprint, elapsed, True, False)
+        if not changed and elapsed >= unchanged_window:
+            return SettleResult(image, fingerprint, elapsed, False, False)
+        if elapsed >= timeout:
+            return SettleResult(image, fingerprint, elapsed, changed, True)
+
+        previous = fingerprint
+        metrics.sleep(poll_interval, "settle_poll")
+
+
+class SettleStats:
+    """按操作类型汇总界面稳定等待的耗时。"""
+
+    def __init__(self) -> None:
+        self._latencies: defaultdict[str, list[float]] = defaultdict(list)
+        self._timeouts: defaultdict[str, int] = defaultdict(int)
+
+    def record(self, kind: str, result: SettleResult) -> None:
+        self._latencies[kind].append(result.latency)
+        metrics.observe("settle_seconds", result.latency, kind=kind)
+        if result.timed_out:
+            self._timeouts[kind] += 1
+            metrics.increment("settle_timeouts", kind=kind)
+
+    def format_report(self) -> str:
+        """生成各类操作等待耗时的统计文本。"""
+        lines = []
+        for kind, latencies in self._latencies.items():
+            values = np.array(latencies) * 1000
+            p50, p90 = np.percentile(values, [50, 90])
+            lines.append(
+                f"{kind}: 次数={len(values)} 平均={values.mean():.0f}ms "
+                f"P50={p50:.0f}ms P90={p90:.0f}ms 最大={values.max():.0f}ms "
+                f"超时={self._timeouts[kind]}"
+            )
+        return "\n".join(lines)
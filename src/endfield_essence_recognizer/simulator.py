@@ -0,0 +1,528 @@
+"""合成基质库存模拟器。
+
+`SimulatorDriver` 在内存中渲染 1920×1080 的武器基质界面，不需要游戏窗口：
+
+- 基质网格：按现有的图标坐标绘制每个基质的缩略图，缩略图由属性决定，带有锁定和弃用角标
+- 详情面板：在属性截图区域贴上 `templates/generated` 中的属性文字模板，
+  在按钮截图区域贴上 `templates/screenshot` 中的锁定和弃用图标
+- 点击基质、点击按钮和滚动都会在可配置的界面延迟后生效，截图可以叠加随机噪声
+
+`EssenceScanner` 可以借此无头地扫描任意数量的基质，测量吞吐量、中止判断和内存占用：
+
+    eer simulate --count 5000 --scan-mode pipelined
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import time
+import tracemalloc
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import cv2
+import numpy as np
+
+from endfield_essence_recognizer import (
+    generated_template_dir,
+    screenshot_template_dir,
+)
+from endfield_essence_recognizer.decision import get_decision_index, plan_button_actions
+from endfield_essence_recognizer.driver import GameDriver
+from endfield_essence_recognizer.essence_scanner import (
+    AREA,
+    BUTTON_ACTION_POS,
+    DEPRECATE_BUTTON_ROI,
+    ESSENCE_ICON_SIZE,
+    ESSENCE_UI_ROI,
+    LOCK_BUTTON_ROI,
+    RESOLUTION,
+    STATS_SLOTS,
+    EssenceScanner,
+    essence_icon_x_list,
+    essence_icon_y_list,
+)
+from endfield_essence_recognizer.image import load_image
+from endfield_essence_recognizer.inventory import InventoryStore
+from endfield_essence_recognizer.log import logger
+from endfield_essence_recognizer.thumbnail import (
+    THUMBNAIL_DEPRECATE_BADGE_ROI,
+    THUMBNAIL_LOCK_BADGE_ROI,
+)
+
+if TYPE_CHECKING:
+    from importlib.resources.abc import Traversable
+
+    from cv2.typing import MatLike
+
+    from endfield_essence_recognizer.config import ScanMode
+    from endfield_essence_recognizer.image import Scope
+
+SIMULATOR_BACKGROUND_COLOR = (32, 30, 28)
+"""界面背景颜色 (BGR)"""
+SIMULATOR_EMPTY_CELL_COLOR = (48, 46, 44)
+"""空位底板颜色 (BGR)"""
+SIMULATOR_PANEL_COLOR = (24, 24, 24)
+"""详情面板背景颜色 (BGR)"""
+SIMULATOR_SELECTION_COLOR = (80, 200, 240)
+"""选中基质的高亮边框颜色 (BGR)"""
+SIMULATOR_SELECTION_WIDTH = 3
+"""选中高亮边框的宽度（像素）"""
+SIMULATOR_BADGE_COLORS = {
+    "已锁定": (60, 200, 250),
+    "未锁定": (70, 70, 70),
+    "已弃用": (60, 60, 230),
+    "未弃用": (70, 70, 70),
+}
+"""缩略图角标各状态的颜色 (BGR)"""
+DEFAULT_ROWS_PER_SCROLL = 4
+"""默认每次滚动移动的行数"""
+
+
+@dataclass
+class SimulatedEssence:
+    stats: tuple[str, str, str]
+    """三个属性标签"""
+    locked: bool
+    """是否已锁定"""
+    deprecated: bool
+    """是否已弃用"""
+
+    @property
+    def locked_str(self) -> str:
+        return "已锁定" if self.locked else "未锁定"
+
+    @property
+    def deprecated_str(self) -> str:
+        return "已弃用" if self.deprecated else "未弃用"
+
+
+def renderable_stats_labels() -> list[list[str]]:
+    """三个属性槽位中有文字模板、可以渲染的标签。"""
+    available = {
+        entry.name.removesuffix(".png")
+        for entry in generated_template_dir.iterdir()
+        if entry.name.endswith(".png")
+    }
+    return [
+        [label for label in labels if label in available]
+        for _roi, labels in STATS_SLOTS
+    ]
+
+
+def generate_inventory(
+    count: int,
+    seed: int = 0,
+    stats_labels: Sequence[Sequence[str]] | None = None,
+    locked_ratio: float = 0.3,
+    deprecated_ratio: float = 0.1,
+) -> list[SimulatedEssence]:
+    """
+    随机生成基质库存。
+
+    Args:
+        count: 基质数量
+        seed: 随机种子，相同的种子生成相同的库存
+        stats_labels: 三个属性槽位的候选标签，默认使用 `renderable_stats_labels`
+        locked_ratio: 已锁定基质的比例
+        deprecated_ratio: 已弃用基质的比例
+    """
+    if stats_labels is None:
+        stats_labels = renderable_stats_labels()
+    if not all(stats_labels):
+        raise ValueError("Every stats slot needs at least one label")
+    rng = np.random.default_rng(seed)
+    inventory = []
+    for _ in range(count):
+        stats = tuple(str(labels[rng.integers(len(labels))]) for labels in stats_labels)
+        inventory.append(
+            SimulatedEssence(
+                stats,  # type: ignore[arg-type]
+                locked=bool(rng.random() < locked_ratio),
+                deprecated=bool(rng.random() < deprecated_ratio),
+            )
+        )
+    return inventory
+
+
+def _paste(canvas: np.ndarray, image: MatLike, left: int, top: int) -> None:
+    """把图像贴到画布上，灰度图转为 BGR，带透明通道的图像直接使用颜色通道。"""
+    if image.ndim == 2:
+        image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+    height, width = image.shape[:2]
+    canvas[top : top + height, left : left + width] = image[:, :, :3]
+
+
+def _paste_centered(canvas: np.ndarray, image: MatLike, roi: Scope) -> None:
+    (left, top), (right, bottom) = roi
+    height, width = image.shape[:2]
+    _paste(
+        canvas,
+        image,
+        left + (right - left - width) // 2,
+        top + (bottom - top - height) // 2,
+    )
+
+
+class SimulatorDriver(GameDriver):
+    """
+    模拟武器基质界面的驱动。
+
+    界面状态的变化（选中基质、切换锁定和弃用、滚动）在操作后经过对应的延迟才会出现在截图中。
+    整个画面只在界面状态变化时重新渲染。
+    """
+
+    def __init__(
+        self,
+        inventory: list[SimulatedEssence],
+        click_latency: float = 0.03,
+        scroll_latency: float = 0.1,
+        noise: int = 0,
+        rows_per_scroll: int = DEFAULT_ROWS_PER_SCROLL,
+        seed: int = 0,
+    ) -> None:
+        """
+        Args:
+            inventory: 基质库存，扫描中的锁定和弃用操作会直接修改其中的基质
+            click_latency: 点击后界面变化的延迟（秒）
+            scroll_latency: 滚动后网格变化的延迟（秒）
+            noise: 截图中每个像素叠加的均匀随机噪声幅度，为 0 时不加噪声
+            rows_per_scroll: 每次滚动移动的行数
+            seed: 噪声的随机种子
+        """
+        self.inventory: list[SimulatedEssence] = inventory
+        self.click_latency: float = click_latency
+        self.scroll_latency: float = scroll_latency
+        self.noise: int = noise
+        self.rows_per_scroll: int = rows_per_scroll
+        self._rng = np.random.default_rng(seed)
+
+        self._num_rows = len(essence_icon_y_list)
+        self._num_cols = len(essence_icon_x_list)
+        total_rows = -(-len(inventory) // self._num_cols)
+        self.max_row_offset: int = max(total_rows - self._num_rows, 0)
+        """网格最多可以向下滚动的行数"""
+        self.row_offset: int = 0
+        """网格当前向下滚动的行数"""
+        self.selected: int | None = None
+        """当前选中基质在库存中的序号"""
+        self.visited: set[int] = set()
+        """选中过的基质序号"""
+        self.clicks: int = 0
+        """点击次数"""
+        self.scrolls: int = 0
+        """滚动次数"""
+
+        self._pending: list[tuple[float, Callable[[], None]]] = []
+        self._screen = np.empty((RESOLUTION[1], RESOLUTION[0], 3), dtype=np.uint8)
+        self._dirty = True
+        self._thumbnails: dict[tuple[tuple[str, str, str], bool, bool], np.ndarray] = {}
+        self._templates: dict[str, np.ndarray] = {}
+
+    def _template(self, directory: Traversable, label: str) -> np.ndarray:
+        template = self._templates.get(label)
+        if template is None:
+            template = load_image(
+                (directory / f"{label}.png").read_bytes(), cv2.IMREAD_UNCHANGED
+            )
+            self._templates[label] = template
+        return template
+
+    def _thumbnail(self, essence: SimulatedEssence) -> np.ndarray:
+        """基质缩略图：由属性决定的纹理图案加上锁定和弃用角标。"""
+        key = (essence.stats, essence.locked, essence.deprecated)
+        thumbnail = self._thumbnails.get(key)
+        if thumbnail is not None:
+            return thumbnail
+        seed = int.from_bytes(
+            hashlib.blake2b("|".join(essence.stats).encode(), digest_size=8).digest()
+        )
+        rng = np.random.default_rng(seed)
+        width, height = ESSENCE_ICON_SIZE
+        # 平滑插值的随机色块，与真实图标一样以低频纹理为主
+        blocks = rng.integers(40, 230, (6, 6, 3), dtype=np.uint8)
+        thumbnail = cv2.resize(blocks, (width, height), interpolation=cv2.INTER_CUBIC)
+        for ((left, top), (right, bottom)), state in (
+            (THUMBNAIL_LOCK_BADGE_ROI, essence.locked_str),
+            (THUMBNAIL_DEPRECATE_BADGE_ROI, essence.deprecated_str),
+        ):
+            cv2.rectangle(
+                thumbnail,
+                (left + 2, top + 2),
+                (right - 3, bottom - 3),
+                SIMULATOR_BADGE_COLORS[state],
+                thickness=-1,
+            )
+        self._thumbnails[key] = thumbnail
+        return thumbnail
+
+    def _render(self) -> None:
+        screen = self._screen
+        screen[:] = SIMULATOR_BACKGROUND_COLOR
+        _paste_centered(
+            screen, self._template(screenshot_template_dir, "武器基质"), ESSENCE_UI_ROI
+        )
+
+        width, height = ESSENCE_ICON_SIZE
+        for i, y in enumerate(essence_icon_y_list):
+            for j, x in enumerate(essence_icon_x_list):
+                x, y = int(x), int(y)
+                index = self._cell_index(i, j)
+                if index is None:
+                    screen[y : y + height, x : x + width] = SIMULATOR_EMPTY_CELL_COLOR
+                    continue
+                _paste(screen, self._thumbnail(self.inventory[index]), x, y)
+                if index == self.selected:
+                    cv2.rectangle(
+                        screen,
+                        (x, y),
+                        (x + width - 1, y + height - 1),
+                        SIMULATOR_SELECTION_COLOR,
+                        thickness=SIMULATOR_SELECTION_WIDTH,
+                    )
+
+        if self.selected is not None:
+            essence = self.inventory[self.selected]
+            (left, top), (right, bottom) = AREA
+            screen[top:bottom, left:right] = SIMULATOR_PANEL_COLOR
+            for (roi, _labels), label in zip(STATS_SLOTS, essence.stats, strict=True):
+                _paste_centered(
+                    screen, self._template(generated_template_dir, label), roi
+                )
+            _paste_centered(
+                screen,
+                self._template(screenshot_template_dir, essence.deprecated_str),
+                DEPRECATE_BUTTON_ROI,
+            )
+            _paste_centered(
+                screen,
+                self._template(screenshot_template_dir, essence.locked_str),
+                LOCK_BUTTON_ROI,
+            )
+        self._dirty = False
+
+    def _cell_index(self, i: int, j: int) -> int | None:
+        index = (self.row_offset + i) * self._num_cols + j
+        return index if index < len(self.inventory) else None
+
+    def _schedule(self, delay: float, change: Callable[[], None]) -> None:
+        self._pending.append((time.perf_counter() + delay, change))
+
+    def _apply_due(self) -> None:
+        """应用所有已经到期的界面变化。"""
+        if not self._pending:
+            return
+        now = time.perf_counter()
+        due = [change for at, change in self._pending if at <= now]
+        if not due:
+            return
+        self._pending = [(at, change) for at, change in self._pending if at > now]
+        for change in due:
+            change()
+        self._dirty = True
+
+    def activate(self) -> bool:
+        return True
+
+    def is_active(self) -> bool:
+        return True
+
+    def client_size(self) -> tuple[int, int]:
+        return RESOLUTION
+
+    def screenshot(self, relative_region: Scope, copy: bool = True) -> MatLike:
+        self._apply_due()
+        if self._dirty:
+            self._render()
+        (left, top), (right, bottom) = relative_region
+        image = self._screen[top:bottom, left:right]
+        if self.noise > 0:
+            noise = self._rng.integers(
+                -self.noise, self.noise + 1, image.shape, np.int16
+            )
+            return np.clip(image + noise, 0, 255).astype(np.uint8)
+        return image.copy() if copy else image
+
+    def click(self, x: int, y: int) -> None:
+        self._apply_due()
+        self.clicks += 1
+        width, height = ESSENCE_ICON_SIZE
+        for i, top in enumerate(essence_icon_y_list):
+            for j, left in enumerate(essence_icon_x_list):
+                if left <= x < left + width and top <= y < top + height:
+                    index = self._cell_index(i, j)
+                    if index is not None:
+                        self._schedule(
+                            self.click_latency, lambda index=index: self.select(index)
+                        )
+                    return
+
+        if self.selected is None:
+            return
+        essence = self.inventory[self.selected]
+        if (x, y) == BUTTON_ACTION_POS["lock"]:
+            self._schedule(self.click_latency, lambda: self._toggle_lock(essence))
+        elif (x, y) == BUTTON_ACTION_POS["deprecate"]:
+            self._schedule(self.click_latency, lambda: self._toggle_deprecate(essence))
+
+    def select(self, index: int) -> None:
+        """立即选中库存中的第 index 个基质。"""
+        self.selected = index
+        self.visited.add(index)
+        self._dirty = True
+
+    @staticmethod
+    def _toggle_lock(essence: SimulatedEssence) -> None:
+        essence.locked = not essence.locked
+
+    @staticmethod
+    def _toggle_deprecate(essence: SimulatedEssence) -> None:
+        essence.deprecated = not essence.deprecated
+
+    def scroll(self, x: int, y: int, ticks: int) -> None:
+        self._apply_due()
+        self.scrolls += 1
+        rows = self.rows_per_scroll if ticks < 0 else -self.rows_per_scroll
+        self._schedule(self.scroll_latency, lambda: self._scroll_rows(rows))
+
+    def _scroll_rows(self, rows: int) -> None:
+        self.row_offset = min(max(self.row_offset + rows, 0), self.max_row_offset)
+
+
+def expected_final_state(essence: SimulatedEssence) -> tuple[bool, bool]:
+    """按当前配置扫描后这个基质应有的 (锁定, 弃用) 状态。"""
+    quality = get_decision_index().quality(essence.stats)
+    locked, deprecated = essence.locked, essence.deprecated
+    for action in plan_button_actions(
+        quality, essence.locked_str, essence.deprecated_str
+    ):
+        if action in ("lock", "unlock"):
+            locked = action == "lock"
+        else:
+            deprecated = action == "deprecate"
+    return locked, deprecated
+
+
+@dataclass
+class SimulationReport:
+    essences: int
+    """库存中的基质数量"""
+    visited: int
+    """扫描中选中过的基质数量"""
+    clicks: int
+    """点击次数"""
+    scrolls: int
+    """滚动次数"""
+    reached_bottom: bool
+    """扫描结束时网格是否已经滚动到底"""
+    wrong_states: int
+    """扫描后锁定或弃用状态与按配置应有的状态不一致的基质数量"""
+    duration: float
+    """扫描耗时（秒）"""
+    peak_memory: int
+    """扫描期间 Python 分配内存的峰值（字节）"""
+
+    @property
+    def throughput(self) -> float:
+        """每秒扫描的基质数量"""
+        return self.essences / self.duration if self.duration > 0 else 0.0
+
+    def format(self) -> str:
+        return "\n".join(
+            [
+                (
+                    f"基质: {self.essences}，选中过: {self.visited}，"
+                    f"点击: {self.clicks}，滚动: {self.scrolls}"
+                ),
+                (
+                    f"滚动到底: {'是' if self.reached_bottom else '否'}，"
+                    f"状态错误: {self.wrong_states}"
+                ),
+                (
+                    f"耗时: {self.duration:.1f}s，吞吐量: {self.throughput:.2f} 个/秒，"
+                    f"内存峰值: {self.peak_memory / 1024 / 1024:.1f} MB"
+                ),
+            ]
+        )
+
+
+def run_simulation(
+    driver: SimulatorDriver, scan_mode: ScanMode = "serial"
+) -> SimulationReport:
+    """用模拟器驱动完整运行一次扫描，不读写基质库存和扫描断点。"""
+    from endfield_essence_recognizer import create_recognizers
+
+    expected = [expected_final_state(essence) for essence in driver.inventory]
+
+    text_recognizer, icon_recognizer = create_recognizers()
+    text_recognizer.load_templates()
+    icon_recognizer.load_templates()
+    scanner = EssenceScanner(
+        text_recognizer=text_recognizer,
+        icon_recognizer=icon_recognizer,
+        driver=driver,
+        scan_mode=scan_mode,
+        inventory=InventoryStore(":memory:"),
+        checkpoints=False,
+    )
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    scanner.start()
+    scanner.join()
+    duration = time.perf_counter() - start
+    _current, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    wrong_states = sum(
+        (essence.locked, essence.deprecated) != state
+        for essence, state in zip(driver.inventory, expected, strict=True)
+    )
+    return SimulationReport(
+        essences=len(driver.inventory),
+        visited=len(driver.visited),
+        clicks=driver.clicks,
+        scrolls=driver.scrolls,
+        reached_bottom=driver.row_offset == driver.max_row_offset,
+        wrong_states=wrong_states,
+        duration=duration,
+        peak_memory=peak_memory,
+    )
+
+
+def main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(
+        prog="eer simulate", description="在合成的基质库存上无头运行完整扫描"
+    )
+    parser.add_argument("--count", type=int, default=1000, help="基质数量")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    parser.add_argument(
+        "--scan-mode", choices=["serial", "pipelined"], default="serial"
+    )
+    parser.add_argument(
+        "--click-latency", type=float, default=0.03, help="点击后界面变化的延迟（秒）"
+    )
+    parser.add_argument(
+        "--scroll-latency", type=float, default=0.1, help="滚动后网格变化的延迟（秒）"
+    )
+    parser.add_argument("--noise", type=int, default=0, help="截图噪声幅度")
+    parser.add_argument(
+        "--rows-per-scroll",
+        type=int,
+        default=DEFAULT_ROWS_PER_SCROLL,
+        help="每次滚动移动的行数",
+    )
+    args = parser.parse_args(argv)
+
+    driver = SimulatorDriver(
+        generate_inventory(args.count, args.seed),
+        click_latency=args.click_latency,
+        scroll_latency=args.scroll_latency,
+        noise=args.noise,
+        rows_per_scroll=args.rows_per_scroll,
+        seed=args.seed,
+    )
+    report = run_simulation(driver, args.scan_mode)
+    logger.info(f"模拟扫描结果:\n{report.format()}")
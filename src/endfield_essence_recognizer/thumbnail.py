@@ -0,0 +1,155 @@
+"""基质网格缩略图分析。
+
+网格中的缩略图上显示了锁定和弃用角标，不点击基质也能读出它们的状态：
+
+- `BadgeClassifier`：从点击识别过的基质在线学习角标外观（详情面板的按钮识别结果即标签），
+  之后直接从缩略图判断锁定和弃用状态，只有与某一状态明显更接近时才给出结论
+- `ThumbnailMemory`：记住缩略图指纹对应的基质属性，再次扫描时无需点击即可判定品质；
+  同一指纹对应过不同属性的缩略图不再使用
+
+两者都只在判断有把握时给出结果，否则扫描器照常点击识别。
+"""
+
+import cv2
+import numpy as np
+from cv2.typing import MatLike
+
+from endfield_essence_recognizer.image import Scope, to_gray_image
+
+THUMBNAIL_LOCK_BADGE_ROI: Scope = ((76, 2), (100, 26))
+"""锁定角标在缩略图中的区域"""
+THUMBNAIL_DEPRECATE_BADGE_ROI: Scope = ((2, 2), (26, 26))
+"""弃用角标在缩略图中的区域"""
+THUMBNAIL_FINGERPRINT_INSET = 6
+"""计算缩略图指纹时从四周向内收缩的像素数，排除选中高亮边框"""
+THUMBNAIL_FINGERPRINT_SIZE = (16, 16)
+"""缩略图指纹的采样尺寸"""
+THUMBNAIL_FINGERPRINT_LEVELS = 16
+"""缩略图指纹的灰度量化级数"""
+BADGE_MATCH_THRESHOLD = 12.0
+"""角标与某一状态样本的平均灰度差不超过此值才认为匹配"""
+BADGE_MATCH_MARGIN = 8.0
+"""最佳状态的平均灰度差需要比另一状态小至少此值"""
+MAX_BADGE_EXEMPLARS = 16
+"""每种角标状态最多保留的样本数"""
+
+LOCK_STATES = ("已锁定", "未锁定")
+"""锁定角标的状态（与按钮识别标签一致）"""
+DEPRECATE_STATES = ("已弃用", "未弃用")
+"""弃用角标的状态（与按钮识别标签一致）"""
+
+
+def _crop(image: MatLike, scope: Scope) -> np.ndarray:
+    (left, top), (right, bottom) = scope
+    return np.asarray(image[top:bottom, left:right], dtype=np.float32)
+
+
+def thumbnail_fingerprint(thumbnail: MatLike) -> bytes:
+    """缩略图指纹：遮住角标、去掉四周后缩小并量化的灰度图，不受角标和选中高亮影响。"""
+    gray = to_gray_image(thumbnail).copy()
+    for (left, top), (right, bottom) in (
+        THUMBNAIL_LOCK_BADGE_ROI,
+        THUMBNAIL_DEPRECATE_BADGE_ROI,
+    ):
+        gray[top:bottom, left:right] = 0
+    inset = THUMBNAIL_FINGERPRINT_INSET
+    small = cv2.resize(
+        gray[inset:-inset, inset:-inset],
+        THUMBNAIL_FINGERPRINT_SIZE,
+        interpolation=cv2.INTER_AREA,
+    )
+    return (small // (256 // THUMBNAIL_FINGERPRINT_LEVELS)).astype(np.uint8).tobytes()
+
+
+class _BadgeModel:
+    """单个角标的样本集合。"""
+
+    def __init__(self, roi: Scope, states: tuple[str, str]) -> None:
+        self.roi: Scope = roi
+        self.states: tuple[str, str] = states
+        self.exemplars: dict[str, list[np.ndarray]] = {state: [] for state in states}
+
+    def learn(self, gray: MatLike, state: str) -> None:
+        if state not in self.exemplars:
+            return
+        patch = _crop(gray, self.roi)
+        exemplars = self.exemplars[state]
+        # 与已有样本几乎相同的不再重复保存
+        if any(np.abs(patch - e).mean() < BADGE_MATCH_THRESHOLD / 4 for e in exemplars):
+            return
+        exemplars.append(patch)
+        if len(exemplars) > MAX_BADGE_EXEMPLARS:
+            exemplars.pop(0)
+
+    def predict(self, gray: MatLike) -> str | None:
+        if not all(self.exemplars.values()):
+            return None
+        patch = _crop(gray, self.roi)
+        distances = {
+            state: min(float(np.abs(patch - e).mean()) for e in exemplars)
+            for state, exemplars in self.exemplars.items()
+        }
+        best, other = sorted(self.states, key=distances.__getitem__)
+        if (
+            distances[best] <= BADGE_MATCH_THRESHOLD
+            and distances[other] - distances[best] >= BADGE_MATCH_MARGIN
+        ):
+            return best
+        return None
+
+
+class BadgeClassifier:
+    """缩略图角标分类器，两种状态都学到样本后才开始给出结论。"""
+
+    def __init__(self) -> None:
+        self._lock = _BadgeModel(THUMBNAIL_LOCK_BADGE_ROI, LOCK_STATES)
+        self._deprecate = _BadgeModel(THUMBNAIL_DEPRECATE_BADGE_ROI, DEPRECATE_STATES)
+
+    def learn(self, thumbnail: MatLike, locked_str: str, deprecated_str: str) -> None:
+        """用详情面板识别出的状态学习这个缩略图的角标外观。"""
+        gray = to_gray_image(thumbnail)
+        self._lock.learn(gray, locked_str)
+        self._deprecate.learn(gray, deprecated_str)
+
+    def predict(self, thumbnail: MatLike) -> tuple[str | None, str | None]:
+        """
+        从缩略图判断锁定和弃用状态。
+
+        Returns:
+            (锁定状态, 弃用状态)，没有把握的状态为 None
+        """
+        gray = to_gray_image(thumbnail)
+        return self._lock.predict(gray), self._deprecate.predict(gray)
+
+
+class ThumbnailMemory:
+    """缩略图指纹到基质属性的记忆。"""
+
+    def __init__(self) -> None:
+        self._stats: dict[bytes, tuple[str, str, str]] = {}
+        self._ambiguous: set[bytes] = set()
+
+    def remember(self, fingerprint: bytes, stats: tuple[str, str, str]) -> None:
+        """记录一个点击识别过的基质。"""
+        if fingerprint in self._ambiguous:
+            return
+        known = self._stats.get(fingerprint)
+        if known is not None and known != stats:
+            # 不同属性的基质缩略图相同，这个指纹不能用来区分基质
+            del self._stats[fingerprint]
+            self._ambiguous.add(fingerprint)
+            return
+        self._stats[fingerprint] = stats
+
+    def recall(self, fingerprint: bytes) -> tuple[str, str, str] | None:
+        """查找缩略图对应的基质属性，未知或有歧义时返回 None。"""
+        return self._stats.get(fingerprint)
+
+    def __len__(self) -> int:
+        return len(self._stats)
+
+
+badge_classifier = BadgeClassifier()
+"""进程内共享的角标分类器，多次扫描之间持续学习"""
+thumbnail_memory = ThumbnailMemory()
+"""进程内共享的缩略图记忆，多次扫描之间保留"""
@@ -0,0 +1,216 @@
+"""扫描追踪。
+
+记录一次扫描中各阶段（页、基质、点击、等待稳定、截图、识别、判定、按钮操作等）的嵌套时间段，
+导出为 Chrome 追踪事件格式的 JSON，可以在 https://ui.perfetto.dev 或 chrome://tracing 中按时间线查看，
+定位某次扫描中具体卡在了哪里。
+
+追踪默认关闭，关闭时每个时间段只有一次属性判断的开销。
+时间段记录在预先分配的环形缓冲区中，超出容量后覆盖最早的记录。
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections.abc import Callable
+from functools import wraps
+from pathlib import Path
+from typing import Any, Self
+
+from endfield_essence_recognizer.path import ROOT_DIR
+
+traces_dir = ROOT_DIR / "traces"
+"""扫描追踪文件的默认保存目录"""
+TRACE_BUFFER_SIZE = 65536
+"""环形缓冲区能保存的时间段数量"""
+
+
+def new_trace_path() -> Path:
+    """按当前时间生成一个新的追踪文件路径。"""
+    return traces_dir / time.strftime("scan-%Y%m%d-%H%M%S.json")
+
+
+class Span:
+    """一个正在记录的时间段，退出 with 语句时写入追踪缓冲区。"""
+
+    __slots__ = ("_args", "_name", "_start", "_tracer")
+
+    def __init__(self, tracer: Tracer, name: str, args: dict[str, Any]) -> None:
+        self._tracer = tracer
+        self._name = name
+        self._args = args
+        self._start = 0
+
+    def set(self, **args: Any) -> None:
+        """补充时间段的参数，例如识别结果。"""
+        self._args.update(args)
+
+    def __enter__(self) -> Self:
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._tracer.record(
+            self._name, self._start, time.perf_counter_ns(), self._args or None
+        )
+
+
+class _NullSpan:
+    """追踪关闭时使用的空时间段。"""
+
+    __slots__ = ()
+
+    def set(self, **args: Any) -> None:
+        pass
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        pass
+
+
+_null_span = _NullSpan()
+
+
+class Tracer:
+    """把时间段记录到固定容量环形缓冲区中的追踪器。"""
+
+    def __init__(self, capacity: int = TRACE_BUFFER_SIZE) -> None:
+        self.enabled: bool = False
+        self._capacity: int = capacity
+        self._lock = threading.Lock()
+        # 预先分配的环形缓冲区，按列存储
+        self._names: list[str] = [""] * capacity
+        self._starts: list[int] = [0] * capacity
+        self._ends: list[int] = [0] * capacity
+        self._threads: list[int] = [0] * capacity
+        self._args: list[dict[str, Any] | None] = [None] * capacity
+        self._count: int = 0
+        """累计记录的时间段数量（包括已被覆盖的）"""
+        self._thread_names: dict[int, str] = {}
+        self._origin: int = time.perf_counter_ns()
+
+    def start(self) -> None:
+        """清空缓冲区并开始追踪。"""
+        with self._lock:
+            self._count = 0
+            self._thread_names.clear()
+            self._origin = time.perf_counter_ns()
+        self.enabled = True
+
+    def stop(self) -> None:
+        """停止追踪，保留已记录的时间段以便导出。"""
+        self.enabled = False
+
+    def span(self, name: str, **args: Any) -> Span | _NullSpan:
+        """
+        在 with 语句中记录一个时间段，同一线程中的时间段按时间自然嵌套。
+
+        Args:
+            args: 时间段的参数，显示在追踪查看器的详情中，需要可以序列化为 JSON
+        """
+        if not self.enabled:
+            return _null_span
+        return Span(self, name, args)
+
+    def traced[**P, R](self, name: str) -> Callable[[Callable[P, R]], Callable[P, R]]:
+        """把函数的每次调用记录为一个时间段的装饰器。"""
+
+        def decorator(func: Callable[P, R]) -> Callable[P, R]:
+            @wraps(func)
+            def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with Span(self, name, {}):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def record(
+        self, name: str, start: int, end: int, args: dict[str, Any] | None = None
+    ) -> None:
+        """写入一个已结束的时间段（`time.perf_counter_ns` 时间戳）。"""
+        thread = threading.get_ident()
+        with self._lock:
+            if thread not in self._thread_names:
+                self._thread_names[thread] = threading.current_thread().name
+            index = self._count % self._capacity
+            self._names[index] = name
+            self._starts[index] = start
+            self._ends[index] = end
+            self._threads[index] = thread
+            self._args[index] = args
+            self._count += 1
+
+    @property
+    def dropped(self) -> int:
+        """因缓冲区已满被覆盖的时间段数量。"""
+        return max(0, self._count - self._capacity)
+
+    def to_chrome_trace(self) -> dict[str, Any]:
+        """导出为 Chrome 追踪事件格式（时间单位为微秒）。"""
+        with self._lock:
+            count = min(self._count, self._capacity)
+            first = self._count - count
+            indices = [(first + k) % self._capacity for k in range(count)]
+            rows = [
+                (
+                    self._names[i],
+                    self._starts[i],
+                    self._ends[i],
+                    self._threads[i],
+                    self._args[i],
+                )
+                for i in indices
+            ]
+            thread_names = dict(self._thread_names)
+            origin = self._origin
+            dropped = self.dropped
+
+        pid = os.getpid()
+        tids = {thread: tid for tid, thread in enumerate(thread_names, start=1)}
+        events: list[dict[str, Any]] = [
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": pid,
+                "tid": tids[thread],
+                "args": {"name": thread_name},
+            }
+            for thread, thread_name in thread_names.items()
+        ]
+        for name, start, end, thread, args in rows:
+            event: dict[str, Any] = {
+                "name": name,
+                "cat": "scan",
+                "ph": "X",
+                "ts": (start - origin) / 1000,
+                "dur": (end - start) / 1000,
+                "pid": pid,
+                "tid": tids[thread],
+            }
+            if args:
+                event["args"] = args
+            events.append(event)
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {"dropped_spans": dropped},
+        }
+
+    def export(self, path: Path) -> Path:
+        """把追踪写入文件，返回文件路径。"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(
+            json.dumps(self.to_chrome_trace(), ensure_ascii=False), encoding="utf-8"
+        )
+        return path
+
+
+tracer = Tracer()
+"""全局追踪器实例"""
@@ -1,16 +1,16 @@
 """窗口截图和区域捕获工具模块。"""
 
-from collections.abc import Container, Iterable
+from collections.abc import Collection, Container, Iterable
 
-import numpy as np
 import pyautogui
 import pygetwindow
-import win32con
 import win32gui  # ty:ignore[unresolved-import]
-import win32ui  # ty:ignore[unresolved-import]
 from cv2.typing import MatLike
 
-from endfield_essence_recognizer.image import Scope
+from endfield_essence_recognizer.capture import get_capture_backend
+from endfield_essence_recognizer.driver import GameDriver
+from endfield_essence_recognizer.image import Frame, Scope
+from endfield_essence_recognizer.metrics import metrics
 
 
 def _get_window_hwnd(window: pygetwindow.Window) -> int:
@@ -62,66 +62,20 @@ def _get_client_rect(window: pygetwindow.Window) -> Scope:
     return ((left, top), (right, bottom))
 
 
-def _screenshot_by_win32ui(scope: Scope) -> MatLike:
-    """
-    截取屏幕指定区域，返回 BGR 格式的 numpy 图像。
-
-    Args:
-        scope: 屏幕区域，格式为 ((left, top), (right, bottom))
-
-    Returns:
-        numpy 数组（BGR 格式，OpenCV 兼容）
-    """
-    (left, top), (right, bottom) = scope
-    width, height = right - left, bottom - top
-    if width <= 0 or height <= 0:
-        raise ValueError(f"Try to screenshot with invalid rect: {scope}")
-
-    # 创建设备上下文和位图
-    screen_dc = win32gui.GetDC(0)
-    img_dc = win32ui.CreateDCFromHandle(screen_dc)
-    mem_dc = img_dc.CreateCompatibleDC()
-
-    bitmap = win32ui.CreateBitmap()
-    bitmap.CreateCompatibleBitmap(img_dc, width, height)
-    mem_dc.SelectObject(bitmap)
-
-    # 复制屏幕区域到位图
-    mem_dc.BitBlt((0, 0), (width, height), img_dc, (left, top), win32con.SRCCOPY)
-
-    # 读取位图像素数据
-    bmpinfo = bitmap.GetInfo()
-    bpp = bmpinfo["bmBitsPixel"] // 8  # 每像素字节数（通常为3或4）
-    stride = ((width * bpp + 3) // 4) * 4  # 4字节对齐的行宽
-    raw = bitmap.GetBitmapBits(True)
-
-    # 转换为 numpy 数组
-    arr = np.frombuffer(raw, dtype=np.uint8)
-    arr = arr.reshape((height, stride))
-    arr = arr[:, : width * bpp]  # 移除对齐填充
-    arr = arr.reshape((height, width, bpp))
-
-    # 如果是 BGRA 格式，转换为 BGR
-    if bpp == 4:
-        arr = arr[:, :, :3]  # 丢弃 alpha 通道
-
-    # 释放 GDI 资源
-    mem_dc.DeleteDC()
-    img_dc.DeleteDC()
-    win32gui.ReleaseDC(0, screen_dc)
-    win32gui.DeleteObject(bitmap.GetHandle())
-
-    return arr.copy()
-
-
+@metrics.timed("screenshot_seconds")
 def screenshot_window(
-    window: pygetwindow.Window, relative_region: Scope | None = None
+    window: pygetwindow.Window,
+    relative_region: Scope | None = None,
+    copy: bool = True,
 ) -> MatLike:
     """
     截取指定窗口的客户区，返回 BGR 格式的 numpy 图像。
 
     Args:
         window: pygetwindow 窗口对象
+        relative_region: 客户区坐标下的截图区域，为 None 时截取整个客户区
+        copy: 是否复制截图结果。为 False 时直接返回截图后端缓冲区的视图，
+            不分配内存，但会在下一次相同尺寸的截图时被覆盖
 
     Returns:
         numpy 数组（BGR 格式，OpenCV 兼容）
@@ -133,7 +87,27 @@ def screenshot_window(
         scope = ((left + rx1, top + ry1), (left + rx2, top + ry2))
     else:
         scope = client_rect
-    return _screenshot_by_win32ui(scope)
+    return get_capture_backend().grab(scope, copy=copy)
+
+
+def capture_frame(window: pygetwindow.Window, relative_region: Scope) -> Frame:
+    """
+    截取窗口客户区中的一块区域作为一帧画面。
+
+    需要识别同一区域内多个 ROI 时，先截取包含它们的区域，
+    再通过 `Frame.crop` 零拷贝地取出各个 ROI，只需一次截图。
+    画面直接引用截图后端的缓冲区，需要跨越下一次同尺寸截图持有时请复制。
+
+    Args:
+        window: pygetwindow 窗口对象
+        relative_region: 客户区坐标下的截图区域
+
+    Returns:
+        截图画面及其在客户区中的位置
+    """
+    return Frame(
+        screenshot_window(window, relative_region, copy=False), relative_region
+    )
 
 
 def get_active_support_window(
@@ -156,6 +130,7 @@ def get_support_window(
     return None
 
 
+@metrics.timed("click_seconds")
 def click_on_window(
     window: pygetwindow.Window, relative_x: int, relative_y: int
 ) -> None:
@@ -164,3 +139,55 @@ def click_on_window(
     screen_x = left + relative_x
     screen_y = top + relative_y
     pyautogui.click(screen_x, screen_y)
+
+
+class WindowDriver(GameDriver):
+    """操作真实终末地窗口的驱动。"""
+
+    def __init__(self, supported_window_titles: Collection[str]) -> None:
+        self._supported_window_titles: Collection[str] = supported_window_titles
+        self._window: pygetwindow.Window | None = None
+
+    @property
+    def window(self) -> pygetwindow.Window:
+        """当前操作的窗口，尚未找到窗口时按标题查找。"""
+        if self._window is None:
+            self._window = get_support_window(self._supported_window_titles)
+            if self._window is None:
+                raise RuntimeError("Cannot find supported window")
+        return self._window
+
+    def activate(self) -> bool:
+        window = get_support_window(self._supported_window_titles)
+        if window is None:
+            return False
+        self._window = window
+        if window.isMinimized:
+            window.restore()
+            metrics.sleep(0.5, "activate")
+        if not window.isActive:
+            window.activate()
+            metrics.sleep(0.5, "activate")
+        return True
+
+    def is_active(self) -> bool:
+        window = get_active_support_window(self._supported_window_titles)
+        if window is None:
+            return False
+        self._window = window
+        return True
+
+    def client_size(self) -> tuple[int, int]:
+        return get_client_size(self.window)
+
+    def screenshot(self, relative_region: Scope, copy: bool = True) -> MatLike:
+        return screenshot_window(self.window, relative_region, copy)
+
+    def click(self, x: int, y: int) -> None:
+        click_on_window(self.window, x, y)
+
+    @metrics.timed("scroll_seconds")
+    def scroll(self, x: int, y: int, ticks: int) -> None:
+        (left, top), (_right, _bottom) = _get_client_rect(self.window)
+        pyautogui.moveTo(left + x, top + y)
+        pyautogui.scroll(ticks)
@@ -0,0 +1,55 @@
+import cv2
+import numpy as np
+
+from endfield_essence_recognizer.matching import BinaryTemplateBank
+
+
+def _binary_scores(image: np.ndarray, template: np.ndarray) -> np.ndarray:
+    """二值化后逐个调用 `cv2.matchTemplate` 得到的分数图。"""
+
+    def binarize(x: np.ndarray) -> np.ndarray:
+        _threshold, binary = cv2.threshold(x, 0, 1, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        return binary.astype(np.float32)
+
+    return cv2.matchTemplate(binarize(image), binarize(template), cv2.TM_CCOEFF_NORMED)
+
+
+def _text_like(rng: np.random.Generator, height: int, width: int) -> np.ndarray:
+    """高对比度的块状纹理，类似文字。"""
+    blocks = rng.choice(np.array([30, 220], dtype=np.uint8), (height // 4, width // 4))
+    return np.kron(blocks, np.ones((4, 4), dtype=np.uint8))
+
+
+def test_window_scores_match_cv2_on_binarized_images():
+    rng = np.random.default_rng(0)
+    image = _text_like(rng, 32, 192)
+    labels = ["a", "b", "c"]
+    templates = [
+        image[4:28, 20:100].copy(),
+        _text_like(rng, 24, 80),
+        _text_like(rng, 20, 64),
+    ]
+    radius = 3
+    top_left = (18, 5)
+    scores = BinaryTemplateBank(labels, templates).match_window(image, top_left, radius)
+    for label, template in zip(labels, templates):
+        x, y = top_left
+        result = _binary_scores(image, template)
+        expected = result[
+            max(y - radius, 0) : y + radius + 1, max(x - radius, 0) : x + radius + 1
+        ]
+        assert abs(scores[label] - expected.max()) < 1e-5
+
+
+def test_full_search_finds_embedded_template():
+    rng = np.random.default_rng(1)
+    image = _text_like(rng, 32, 192)
+    labels = ["a", "b", "c"]
+    templates = [
+        image[8:32, 96:176].copy(),
+        _text_like(rng, 24, 80),
+        _text_like(rng, 24, 80),
+    ]
+    scores = BinaryTemplateBank(labels, templates).match(image)
+    assert scores["a"] > 0.999
+    assert max(scores, key=scores.__getitem__) == "a"
@@ -0,0 +1,89 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from endfield_essence_recognizer import checkpoint
+from endfield_essence_recognizer.checkpoint import ScanCheckpoint, grid_signature
+
+TREASURE_SUMMARY = {
+    ("agi", "atk", "break"): {
+        "weapons": [
+            {"id": "sword", "name": "剑", "rarity": 6, "weapon_type": "单手剑"}
+        ],
+        "count": 2,
+    },
+    ("will", "magdam", "force"): {"weapons": [], "count": 1},
+}
+SCANNED_STATS = {("agi", "atk", "break"), ("will", "magdam", "force")}
+
+
+def _grid(seed: int) -> np.ndarray:
+    """5 列 4 行随机纹理图标组成的网格截图。"""
+    rng = np.random.default_rng(seed)
+    blocks = rng.integers(0, 256, (4, 5, 3), dtype=np.uint8)
+    return np.kron(blocks, np.ones((100, 100, 1), dtype=np.uint8))
+
+
+def _checkpoint(grid_image: np.ndarray) -> ScanCheckpoint:
+    return ScanCheckpoint.from_summary(
+        3, [2, 3], grid_signature(grid_image), TREASURE_SUMMARY, SCANNED_STATS
+    )
+
+
+@pytest.fixture
+def checkpoint_path(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Path:
+    path = tmp_path / "scan_checkpoint.json"
+    monkeypatch.setattr(checkpoint, "checkpoint_path", path)
+    return path
+
+
+def test_is_done_follows_row_major_order():
+    saved = _checkpoint(_grid(0))
+    assert not saved.is_done(0, 0)
+
+    saved.last_cell = (2, 1)
+    done = [(i, j) for i in range(4) for j in range(5) if saved.is_done(i, j)]
+    # 之前的行全部完成，本行只完成到第 1 列
+    assert done == [(i, j) for i in range(2) for j in range(5)] + [(2, 0), (2, 1)]
+
+
+def test_summary_round_trip(checkpoint_path: Path):
+    saved = _checkpoint(_grid(0))
+    saved.last_cell = (3, 4)
+    saved.save()
+    assert checkpoint_path.is_file()
+
+    loaded = ScanCheckpoint.load()
+    assert loaded is not None
+    assert (loaded.page, loaded.new_rows, loaded.last_cell) == (3, [2, 3], (3, 4))
+    treasure_summary: dict[tuple[str, str, str], dict] = {}
+    scanned_stats: set[tuple[str, str, str]] = set()
+    loaded.restore_summary(treasure_summary, scanned_stats)
+    assert treasure_summary == TREASURE_SUMMARY
+    assert scanned_stats == SCANNED_STATS
+
+    ScanCheckpoint.clear()
+    assert ScanCheckpoint.load() is None
+
+
+def test_unreadable_or_outdated_checkpoint_is_ignored(checkpoint_path: Path):
+    checkpoint_path.write_text("{", encoding="utf-8")
+    assert ScanCheckpoint.load() is None
+
+    outdated = _checkpoint(_grid(0))
+    outdated.version = -1
+    checkpoint_path.write_text(outdated.model_dump_json(), encoding="utf-8")
+    assert ScanCheckpoint.load() is None
+
+
+def test_matches_grid_only_on_the_same_page():
+    grid_image = _grid(0)
+    saved = _checkpoint(grid_image)
+    # 同一页的截图有轻微噪声
+    rng = np.random.default_rng(1)
+    noise = rng.integers(-3, 4, grid_image.shape)
+    noisy = np.clip(grid_image.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+    assert saved.matches_grid(noisy)
+    # 库存变化后断点所在页的内容不同，需要丢弃断点
+    assert not saved.matches_grid(_grid(2))
@@ -0,0 +1,121 @@
+from typing import Literal
+
+import pytest
+
+from endfield_essence_recognizer.config import EssenceStats, config
+from endfield_essence_recognizer.decision import (
+    ButtonAction,
+    DecisionIndex,
+    skip_reason,
+    state_after_actions,
+)
+
+
+def _weapon(attribute: str, secondary: str | None, skill: str) -> dict:
+    return {
+        "name": "",
+        "rarity": 6,
+        "weapon_type": "",
+        "stats": {"attribute": attribute, "secondary": secondary, "skill": skill},
+    }
+
+
+WEAPONS = {
+    "sword": _weapon("agi", "atk", "break"),
+    "wand": _weapon("will", "magdam", "force"),
+    "wand_trash": _weapon("will", "magdam", "force"),
+    "claymore_trash": _weapon("main", "phydam", "break"),
+    "lance": _weapon("agi", None, "force"),
+}
+TRASH_WEAPON_IDS = ["wand_trash", "claymore_trash"]
+TREASURE_ESSENCE_STATS = [
+    EssenceStats(attribute="main", secondary="crirate", skill="magabn"),
+    EssenceStats(attribute="will", secondary="will", skill="break"),
+    EssenceStats(attribute="agi", secondary=None, skill="break"),
+]
+
+
+def baseline_quality(stats: tuple[str, str, str]) -> Literal["treasure", "trash"]:
+    """逐个遍历用户条件和武器的原始判定规则（与 `judge_essence_quality` 一致）。"""
+    for treasure_stat in TREASURE_ESSENCE_STATS:
+        if (
+            treasure_stat.attribute in stats
+            and treasure_stat.secondary in stats
+            and treasure_stat.skill in stats
+        ):
+            return "treasure"
+    matched = [
+        weapon_id
+        for weapon_id, weapon in WEAPONS.items()
+        if (
+            weapon["stats"]["attribute"],
+            weapon["stats"]["secondary"],
+            weapon["stats"]["skill"],
+        )
+        == stats
+    ]
+    if any(weapon_id not in TRASH_WEAPON_IDS for weapon_id in matched):
+        return "treasure"
+    return "trash"
+
+
+@pytest.mark.parametrize(
+    "stats",
+    [
+        ("agi", "atk", "break"),  # 匹配武器
+        ("will", "magdam", "force"),  # 同时匹配宝藏武器和垃圾武器
+        ("main", "phydam", "break"),  # 只匹配垃圾武器
+        ("main", "crirate", "magabn"),  # 符合用户条件
+        ("magabn", "main", "crirate"),  # 符合用户条件（词条顺序不同）
+        ("will", "atk", "break"),  # 符合含重复词条的用户条件
+        ("agi", "atk", "force"),  # 什么都不匹配
+        ("atk", "agi", "break"),  # 词条相同但顺序不同，不匹配武器
+    ],
+)
+def test_quality_matches_baseline(stats: tuple[str, str, str]):
+    index = DecisionIndex(WEAPONS, TRASH_WEAPON_IDS, TREASURE_ESSENCE_STATS)
+    assert index.quality(stats) == baseline_quality(stats)
+
+
+@pytest.mark.parametrize(
+    ("locked", "deprecated", "known_quality", "badge_skip", "expected"),
+    [
+        # 未开启增量扫描或属性未知，且角标跳过关闭时，总是点击
+        ("已锁定", "已弃用", None, False, None),
+        ("未锁定", "已弃用", None, False, None),
+        # 角标跳过开启时，只有无论品质如何都无需操作的基质才跳过
+        ("已锁定", "已弃用", None, True, "badge"),
+        ("未锁定", "已弃用", None, True, None),
+        ("未锁定", "未弃用", None, True, None),
+        # 增量扫描中已知属性时按品质判断，与角标跳过开关无关
+        ("未锁定", "已弃用", "trash", False, "known"),
+        ("未锁定", "已弃用", "trash", True, "known"),
+        ("未锁定", "已弃用", "treasure", False, None),
+        ("已锁定", "未弃用", "treasure", False, "known"),
+        ("已锁定", "未弃用", "trash", True, None),
+    ],
+)
+def test_skip_reason(
+    monkeypatch: pytest.MonkeyPatch,
+    locked: str,
+    deprecated: str,
+    known_quality: Literal["treasure", "trash"] | None,
+    badge_skip: bool,
+    expected: str | None,
+):
+    # 宝藏锁定、垃圾弃用：已锁定且已弃用的基质无论品质如何都无需操作
+    monkeypatch.setattr(config, "treasure_action", "lock")
+    monkeypatch.setattr(config, "trash_action", "deprecate")
+    assert skip_reason(locked, deprecated, known_quality, badge_skip) == expected
+
+
+@pytest.mark.parametrize(
+    ("actions", "expected"),
+    [
+        ([], ("未锁定", "已弃用")),
+        (["lock"], ("已锁定", "已弃用")),
+        (["lock", "undeprecate"], ("已锁定", "未弃用")),
+    ],
+)
+def test_state_after_actions(actions: list[ButtonAction], expected: tuple[str, str]):
+    assert state_after_actions("未锁定", "已弃用", actions) == expected
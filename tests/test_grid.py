@@ -0,0 +1,73 @@
+import numpy as np
+
+from endfield_essence_recognizer.grid import analyze_grid
+
+CELL_SIZE = (60, 60)
+CELL_X_LIST = [10, 90, 170, 250]
+CELL_Y_LIST = [10, 90, 170]
+
+
+def _grid_image(icons: list[np.ndarray | None]) -> np.ndarray:
+    """按行优先顺序放置图标的网格截图，None 表示空位。"""
+    rng = np.random.default_rng(0)
+    image = np.full((250, 330, 3), 40, dtype=np.uint8)
+    width, height = CELL_SIZE
+    for index, icon in enumerate(icons):
+        i, j = divmod(index, len(CELL_X_LIST))
+        x, y = CELL_X_LIST[j], CELL_Y_LIST[i]
+        if icon is None:
+            icon = np.full((height, width, 3), 60, dtype=np.uint8)
+        image[y : y + height, x : x + width] = icon
+    # 空位底板和背景有轻微噪声
+    noise = rng.integers(-2, 3, image.shape)
+    return np.clip(image.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+
+
+def _icon(seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 256, (*CELL_SIZE[::-1], 3), dtype=np.uint8)
+
+
+def test_partial_page_mask():
+    icons = [_icon(k) for k in range(6)] + [None] * 6
+    occupancy = analyze_grid(_grid_image(icons), CELL_X_LIST, CELL_Y_LIST, CELL_SIZE)
+    expected = np.array(
+        [
+            [True, True, True, True],
+            [True, True, False, False],
+            [False, False, False, False],
+        ]
+    )
+    np.testing.assert_array_equal(occupancy.occupied, expected)
+    assert occupancy.occupied_count == 6
+    assert occupancy.is_partial
+    assert occupancy.occupied_cells() == [
+        (0, 0),
+        (0, 1),
+        (0, 2),
+        (0, 3),
+        (1, 0),
+        (1, 1),
+    ]
+
+
+def test_full_page_mask():
+    icons = [_icon(k) for k in range(12)]
+    occupancy = analyze_grid(_grid_image(icons), CELL_X_LIST, CELL_Y_LIST, CELL_SIZE)
+    assert occupancy.occupied.all()
+    assert not occupancy.is_partial
+
+
+def test_plain_icon_before_last_essence_is_occupied():
+    # 颜色单一的图标之后还有基质，不应被判为空位
+    plain = np.full((*CELL_SIZE[::-1], 3), 120, dtype=np.uint8)
+    icons = [_icon(0), plain, _icon(2), None]
+    occupancy = analyze_grid(_grid_image(icons), CELL_X_LIST, CELL_Y_LIST, CELL_SIZE)
+    assert occupancy.occupied_cells() == [(0, 0), (0, 1), (0, 2)]
+
+
+def test_empty_page():
+    occupancy = analyze_grid(
+        _grid_image([None] * 12), CELL_X_LIST, CELL_Y_LIST, CELL_SIZE
+    )
+    assert occupancy.occupied_count == 0
@@ -0,0 +1,75 @@
+import sqlite3
+
+from endfield_essence_recognizer.inventory import InventoryRecord, InventoryStore
+
+
+def _record(
+    fingerprint: bytes, locked: str, page: int = 1, row: int = 0, col: int = 0
+) -> InventoryRecord:
+    return InventoryRecord(
+        fingerprint=fingerprint,
+        attribute="agi",
+        secondary="atk",
+        skill="break",
+        locked=locked,
+        deprecated="未弃用",
+        page=page,
+        row=row,
+        col=col,
+    )
+
+
+def test_rescan_updates_existing_record():
+    store = InventoryStore(":memory:")
+    store.add(_record(b"a", "未锁定"))
+    store.add(_record(b"b", "未锁定", col=1))
+    store.flush()
+    # 第二次扫描：同一位置的同一基质已被锁定
+    store.add(_record(b"a", "已锁定"))
+    store.add(_record(b"b", "未锁定", col=1))
+
+    summary = store.summary()
+    assert summary["records"] == 2
+    assert summary["fingerprints"] == 2
+    rows = store.query(locked="已锁定")
+    assert [row["fingerprint"] for row in rows] == [b"a".hex().upper()]
+    assert store.query(locked="未锁定")[0]["fingerprint"] == b"b".hex().upper()
+
+
+def test_same_fingerprint_at_different_positions_are_separate_essences():
+    store = InventoryStore(":memory:")
+    store.add(_record(b"a", "未锁定", row=0))
+    store.add(_record(b"a", "未锁定", row=1))
+    assert store.summary()["records"] == 2
+    assert store.lookup_stats(b"a") == ("agi", "atk", "break")
+
+
+def test_opening_old_database_keeps_latest_record(tmp_path):
+    path = tmp_path / "inventory.sqlite3"
+    connection = sqlite3.connect(path)
+    connection.executescript(
+        """
+        CREATE TABLE essences (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            fingerprint BLOB NOT NULL,
+            attribute TEXT,
+            secondary TEXT,
+            skill TEXT,
+            locked TEXT,
+            deprecated TEXT,
+            page INTEGER NOT NULL,
+            row INTEGER NOT NULL,
+            col INTEGER NOT NULL,
+            scanned_at REAL NOT NULL
+        );
+        INSERT INTO essences VALUES
+            (1, X'61', 'agi', 'atk', 'break', '未锁定', '未弃用', 1, 0, 0, 1.0),
+            (2, X'61', 'agi', 'atk', 'break', '已锁定', '未弃用', 1, 0, 0, 2.0);
+        """
+    )
+    connection.close()
+
+    store = InventoryStore(path)
+    assert store.summary()["records"] == 1
+    assert store.query()[0]["locked"] == "已锁定"
+    store.close()
@@ -0,0 +1,124 @@
+import cv2
+import numpy as np
+import pytest
+
+from endfield_essence_recognizer.game_data import table_cfg_dir
+from endfield_essence_recognizer.matching import TemplateBank
+from endfield_essence_recognizer.recognizer import MatchEngine
+
+requires_game_data = pytest.mark.skipif(
+    not table_cfg_dir.is_dir(), reason="game data submodule is not checked out"
+)
+
+
+def _textured(rng: np.random.Generator, height: int, width: int) -> np.ndarray:
+    noise = rng.integers(0, 256, (height, width), dtype=np.uint8)
+    return cv2.GaussianBlur(noise, (3, 3), 0)
+
+
+def _make_bank(
+    rng: np.random.Generator,
+) -> tuple[np.ndarray, list[str], list[np.ndarray]]:
+    image = _textured(rng, 40, 200)
+    # 两组不同尺寸的模板，一个取自图像本身，其余为随机纹理
+    labels = ["a", "b", "c", "d"]
+    templates = [
+        image[6:30, 50:130].copy(),
+        _textured(rng, 24, 80),
+        _textured(rng, 24, 80),
+        _textured(rng, 20, 60),
+    ]
+    return image, labels, templates
+
+
+def test_scores_match_cv2():
+    rng = np.random.default_rng(0)
+    image, labels, templates = _make_bank(rng)
+    scores = TemplateBank(labels, templates).match(image)
+    for label, template in zip(labels, templates):
+        expected = cv2.matchTemplate(image, template, cv2.TM_CCOEFF_NORMED).max()
+        assert abs(scores[label] - expected) < 1e-5
+
+
+def test_locate_matches_cv2():
+    rng = np.random.default_rng(1)
+    image, labels, templates = _make_bank(rng)
+    located = TemplateBank(labels, templates).locate(image)
+    for label, template in zip(labels, templates):
+        result = cv2.matchTemplate(image, template, cv2.TM_CCOEFF_NORMED)
+        _min_val, max_val, _min_loc, max_loc = cv2.minMaxLoc(result)
+        score, position = located[label]
+        assert abs(score - max_val) < 1e-5
+        assert position == max_loc
+    assert located["a"][1] == (50, 6)
+
+
+def test_match_window_matches_cv2():
+    rng = np.random.default_rng(2)
+    image, labels, templates = _make_bank(rng)
+    radius = 3
+    scores = TemplateBank(labels, templates).match_window(image, (48, 5), radius)
+    for label, template in zip(labels, templates):
+        result = cv2.matchTemplate(image, template, cv2.TM_CCOEFF_NORMED)
+        expected = result[5 - radius : 5 + radius + 1, 48 - radius : 48 + radius + 1]
+        assert abs(scores[label] - expected.max()) < 1e-5
+
+
+def test_skips_templates_larger_than_image():
+    rng = np.random.default_rng(3)
+    image = _textured(rng, 20, 50)
+    scores = TemplateBank(
+        ["small", "large"], [image[2:12, 5:25], _textured(rng, 30, 30)]
+    ).match(image)
+    assert set(scores) == {"small"}
+    assert scores["small"] > 0.999
+
+
+def _recognize_stats(
+    engine: MatchEngine, track_alignment: bool = False
+) -> list[str | None]:
+    """用指定引擎识别标注集中的全部词条样本两遍，返回识别出的标签。
+
+    第二遍使用第一遍积累的命中次数和对齐位置。
+    """
+    from endfield_essence_recognizer.evaluation import (
+        create_evaluation_recognizers,
+        evaluation_slots,
+        load_corpus,
+    )
+
+    slots = evaluation_slots()
+    recognizer = create_evaluation_recognizers(engine, track_alignment=track_alignment)[
+        "text"
+    ]
+    samples = [sample for sample in load_corpus() if slots[sample.slot][0] == "text"]
+    labels: list[str | None] = []
+    for _pass in range(2):
+        for sample in samples:
+            _kind, _roi, candidates = slots[sample.slot]
+            label, _score = recognizer.recognize_roi(sample.image, candidates)
+            labels.append(label)
+    return labels
+
+
+@pytest.fixture(scope="module")
+def loop_labels() -> list[str | None]:
+    return _recognize_stats("loop")
+
+
+@requires_game_data
+@pytest.mark.parametrize(
+    ("engine", "track_alignment"),
+    [
+        ("batched", False),
+        ("ordered", False),
+        ("pyramid", False),
+        ("binary", False),
+        ("loop", True),
+        ("batched", True),
+    ],
+)
+def test_engines_agree_with_loop_on_corpus(
+    loop_labels: list[str | None], engine: MatchEngine, track_alignment: bool
+):
+    assert _recognize_stats(engine, track_alignment) == loop_labels
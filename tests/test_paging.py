@@ -0,0 +1,58 @@
+import cv2
+import numpy as np
+import pytest
+
+from endfield_essence_recognizer.paging import estimate_scroll_offset
+from endfield_essence_recognizer.settle import image_fingerprint
+
+ROW_PITCH = 118.5
+NUM_ROWS = 4
+ICON_SIZE = 100
+VIEW_HEIGHT = round(ROW_PITCH * (NUM_ROWS - 1)) + ICON_SIZE + 20
+
+
+def _inventory(total_rows: int) -> np.ndarray:
+    """整个基质列表的长图，每行 5 个随机纹理的图标。
+
+    行间距不是整数，相邻两行之间的位移有时不是指纹缩放倍数的整数倍。
+    """
+    rng = np.random.default_rng(0)
+    height = round(ROW_PITCH * total_rows) + VIEW_HEIGHT
+    image = np.full((height, 600, 3), 30, dtype=np.uint8)
+    for row in range(total_rows):
+        y = 10 + round(row * ROW_PITCH)
+        for col in range(5):
+            x = 10 + col * 118
+            blocks = rng.integers(0, 256, (10, 10, 3), dtype=np.uint8)
+            icon = np.kron(blocks, np.ones((10, 10, 1), dtype=np.uint8))
+            image[y : y + ICON_SIZE, x : x + ICON_SIZE] = icon
+    # 游戏画面中的图标边缘有抗锯齿
+    return cv2.GaussianBlur(image, (0, 0), 2)
+
+
+def _view(inventory: np.ndarray, first_row: int) -> np.ndarray:
+    top = round(first_row * ROW_PITCH)
+    return image_fingerprint(inventory[top : top + VIEW_HEIGHT])
+
+
+@pytest.mark.parametrize("rows", range(NUM_ROWS))
+def test_recovers_row_offset(rows: int):
+    inventory = _inventory(NUM_ROWS * 3)
+    for first_row in range(8):
+        offset = estimate_scroll_offset(
+            _view(inventory, first_row),
+            _view(inventory, first_row + rows),
+            ROW_PITCH,
+            NUM_ROWS,
+        )
+        assert offset.rows == rows
+        assert list(offset.new_rows(NUM_ROWS)) == list(range(NUM_ROWS - rows, NUM_ROWS))
+
+
+def test_full_page_scroll_is_unknown():
+    inventory = _inventory(NUM_ROWS * 3)
+    offset = estimate_scroll_offset(
+        _view(inventory, 0), _view(inventory, NUM_ROWS), ROW_PITCH, NUM_ROWS
+    )
+    assert offset.rows is None
+    assert list(offset.new_rows(NUM_ROWS)) == list(range(NUM_ROWS))